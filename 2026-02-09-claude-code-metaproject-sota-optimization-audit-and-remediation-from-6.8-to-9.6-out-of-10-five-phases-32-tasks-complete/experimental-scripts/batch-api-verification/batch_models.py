@@ -0,0 +1,209 @@
+"""
+Pydantic models for Message Batches API requests, statuses and results.
+
+Shared by submit-batch-verification.py and its storage and transport
+modules.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+
+# ============================================================================
+# Pydantic Models (v2)
+# ============================================================================
+
+
+class CacheControl(BaseModel):
+    """Prompt-cache breakpoint marker for a content block."""
+
+    model_config = ConfigDict(strict=True, frozen=True)
+
+    type: str = Field(default="ephemeral", pattern=r"^ephemeral$")
+
+
+class TextBlock(BaseModel):
+    """Text content block, optionally ending a cacheable prefix."""
+
+    model_config = ConfigDict(strict=True, frozen=True)
+
+    type: str = Field(default="text", pattern=r"^text$")
+    text: str
+    cache_control: CacheControl | None = None
+
+
+class MessageRequest(BaseModel):
+    """Single message request for verification agent."""
+
+    model_config = ConfigDict(strict=True, frozen=True)
+
+    role: str = Field(..., pattern=r"^(user|assistant)$")
+    content: str | list[TextBlock]
+
+
+# Largest max_tokens a request may ask for
+MAX_OUTPUT_TOKENS = 8192
+
+
+class BatchRequestParams(BaseModel):
+    """Parameters for a single batch request."""
+
+    model_config = ConfigDict(strict=True)
+
+    model: str = Field(default="claude-sonnet-4-5-20250929")
+    max_tokens: int = Field(default=8000, ge=1, le=MAX_OUTPUT_TOKENS)
+    messages: list[MessageRequest]
+    system: str | list[TextBlock] | None = None
+    temperature: float = Field(default=1.0, ge=0.0, le=1.0)
+    tools: list[dict[str, Any]] | None = None
+    tool_choice: dict[str, Any] | None = None
+
+    @field_validator("model")
+    @classmethod
+    def validate_model(cls, v: str) -> str:
+        """Validate model name."""
+        allowed_models = {
+            "claude-opus-4-6",
+            "claude-opus-4-5",
+            "claude-sonnet-4-5-20250929",
+            "claude-haiku-4-5-20251001",
+        }
+        if v not in allowed_models:
+            raise ValueError(f"model must be one of {allowed_models}")
+        return v
+
+
+class BatchRequest(BaseModel):
+    """Single request in a message batch."""
+
+    model_config = ConfigDict(strict=True)
+
+    custom_id: str
+    params: BatchRequestParams
+
+
+# Per-batch submission limits; larger workloads are sharded into a BatchGroup
+MAX_REQUESTS_PER_BATCH = 10_000
+MAX_BATCH_PAYLOAD_BYTES = 256 * 1024 * 1024
+
+
+class BatchCreateRequest(BaseModel):
+    """Request to create a message batch."""
+
+    model_config = ConfigDict(strict=True)
+
+    requests: list[BatchRequest] = Field(
+        ..., min_length=1, max_length=MAX_REQUESTS_PER_BATCH
+    )
+
+
+class RequestCounts(BaseModel):
+    """Request counts for a batch."""
+
+    model_config = ConfigDict(strict=True, frozen=True)
+
+    processing: int = 0
+    succeeded: int = 0
+    errored: int = 0
+    canceled: int = 0
+    expired: int = 0
+
+
+class BatchStatus(BaseModel):
+    """Status of a message batch."""
+
+    model_config = ConfigDict(strict=True, frozen=True)
+
+    id: str
+    type: str
+    processing_status: str
+    request_counts: RequestCounts
+    ended_at: str | None = None
+    created_at: str
+    expires_at: str
+    cancel_initiated_at: str | None = None
+    results_url: str | None = None
+
+
+class BatchGroup(BaseModel):
+    """Set of batches submitted together and tracked as one logical unit."""
+
+    model_config = ConfigDict(strict=True)
+
+    id: str = Field(..., pattern=r"^bgrp_[0-9a-f]+$")
+    wave: int
+    agents: list[str]
+    created_at: str
+    batch_ids: list[str]  # Empty when every request was served from the findings cache
+    request_count: int = Field(..., ge=0)
+
+
+class BatchResultSucceeded(BaseModel):
+    """Succeeded batch result."""
+
+    model_config = ConfigDict(strict=True, frozen=True)
+
+    type: str = Field(..., pattern=r"^succeeded$")
+    message: dict[str, Any]
+
+
+class BatchResultErrored(BaseModel):
+    """Errored batch result."""
+
+    model_config = ConfigDict(strict=True, frozen=True)
+
+    type: str = Field(..., pattern=r"^errored$")
+    error: dict[str, Any]
+
+
+class BatchResultExpired(BaseModel):
+    """Expired batch result."""
+
+    model_config = ConfigDict(strict=True, frozen=True)
+
+    type: str = Field(..., pattern=r"^expired$")
+
+
+class BatchResultCanceled(BaseModel):
+    """Canceled batch result."""
+
+    model_config = ConfigDict(strict=True, frozen=True)
+
+    type: str = Field(..., pattern=r"^canceled$")
+
+
+class BatchIndividualResult(BaseModel):
+    """Individual result from batch processing."""
+
+    model_config = ConfigDict(strict=True)
+
+    custom_id: str
+    result: dict[str, Any]  # Can be any of the result types above
+
+
+class Finding(BaseModel):
+    """Single finding in an agent response."""
+
+    # Lax on purpose: validates model output, not requests we build
+    model_config = ConfigDict(extra="allow")
+
+    file: str
+    line: int | None = None
+    severity: str
+    finding: str
+    fix: str | None = None
+    cwe: str | None = None
+
+
+class AgentFindings(BaseModel):
+    """Findings object every agent prompt asks for."""
+
+    model_config = ConfigDict(extra="allow")
+
+    findings: list[Finding]
+    summary: dict[str, int | float] = Field(default_factory=dict)
+    score: float | None = None
+    coverage: float | None = None
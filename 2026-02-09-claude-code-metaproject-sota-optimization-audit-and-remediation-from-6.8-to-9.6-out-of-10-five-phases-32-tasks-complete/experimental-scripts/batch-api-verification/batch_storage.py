@@ -0,0 +1,981 @@
+"""
+Durable local state for submit-batch-verification.py.
+
+Holds the SQLite batch registry used to resume submit/poll/results runs,
+the content-addressed findings cache, the usage-based cost ledger and the
+compressed results archive.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import sqlite3
+import zlib
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import structlog
+
+try:
+    import zstandard
+except ImportError:  # Optional; results archive falls back to zlib
+    zstandard = None
+
+from batch_models import BatchGroup, BatchStatus
+
+logger = structlog.get_logger(__name__)
+
+
+# ============================================================================
+# Batch Registry
+# ============================================================================
+
+
+class BatchRegistry:
+    """Durable SQLite record of submitted batch groups, batches and requests.
+
+    Lets submit/poll/results resume after a crash or CI restart and maps
+    every custom_id to its agent, shard and files without parsing.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS groups (
+            id TEXT PRIMARY KEY,
+            wave INTEGER NOT NULL,
+            agents TEXT NOT NULL,
+            files TEXT NOT NULL,
+            request_count INTEGER NOT NULL,
+            created_at TEXT NOT NULL,
+            reported_at TEXT
+        );
+        CREATE TABLE IF NOT EXISTS batches (
+            id TEXT PRIMARY KEY,
+            group_id TEXT NOT NULL REFERENCES groups(id),
+            processing_status TEXT NOT NULL,
+            submitted_at TEXT NOT NULL,
+            ended_at TEXT,
+            results_url TEXT,
+            downloaded_at TEXT
+        );
+        CREATE TABLE IF NOT EXISTS requests (
+            custom_id TEXT PRIMARY KEY,
+            batch_id TEXT NOT NULL REFERENCES batches(id),
+            agent TEXT NOT NULL,
+            shard INTEGER,
+            files TEXT NOT NULL,
+            attempt INTEGER NOT NULL DEFAULT 0,
+            retry_of TEXT,
+            file_hashes TEXT
+        );
+        CREATE TABLE IF NOT EXISTS group_files (
+            group_id TEXT NOT NULL REFERENCES groups(id),
+            file TEXT NOT NULL,
+            content_hash TEXT,
+            PRIMARY KEY (group_id, file)
+        );
+        CREATE TABLE IF NOT EXISTS cached_findings (
+            group_id TEXT NOT NULL REFERENCES groups(id),
+            agent TEXT NOT NULL,
+            file TEXT NOT NULL,
+            findings TEXT NOT NULL,
+            PRIMARY KEY (group_id, agent, file)
+        );
+        CREATE INDEX IF NOT EXISTS idx_batches_group ON batches(group_id);
+    """
+
+    # Columns added after the first schema: (table, column, definition)
+    MIGRATIONS = (
+        ("requests", "attempt", "INTEGER NOT NULL DEFAULT 0"),
+        ("requests", "retry_of", "TEXT"),
+        ("requests", "file_hashes", "TEXT"),
+    )
+
+    def __init__(self, db_path: Path) -> None:
+        """Open (and create if needed) the registry database.
+
+        Args:
+            db_path: Path to the SQLite file
+        """
+        self.db_path = db_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self.SCHEMA)
+        self._migrate()
+
+    def _migrate(self) -> None:
+        with self._conn:
+            for table, column, definition in self.MIGRATIONS:
+                columns = {r["name"] for r in self._conn.execute(f"PRAGMA table_info({table})")}
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now(tz=timezone.utc).isoformat()
+
+    def record_group(
+        self,
+        group_id: str,
+        wave: int,
+        agents: Sequence[str],
+        file_hashes: dict[str, str | None],
+        request_count: int,
+    ) -> None:
+        """Record a batch group before its batches are submitted.
+
+        Args:
+            group_id: New group ID
+            wave: Verification wave
+            agents: Agent names in the group
+            file_hashes: Content hash of each file at submission time
+            request_count: Number of requests submitted for the group
+        """
+        with self._conn:
+            self._conn.execute(
+                "INSERT INTO groups (id, wave, agents, files, request_count, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (group_id, wave, json.dumps(list(agents)), json.dumps(list(file_hashes)),
+                 request_count, self._now()),
+            )
+            self._conn.executemany(
+                "INSERT INTO group_files (group_id, file, content_hash) VALUES (?, ?, ?)",
+                [(group_id, f, h) for f, h in file_hashes.items()],
+            )
+
+    def record_cached_findings(
+        self,
+        group_id: str,
+        hits: Sequence[tuple[str, str, list[dict[str, Any]]]],
+    ) -> None:
+        """Record findings served from the cache instead of the batch API.
+
+        Args:
+            group_id: Owning batch group
+            hits: (agent, file, findings) per cache hit
+        """
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO cached_findings (group_id, agent, file, findings)"
+                " VALUES (?, ?, ?, ?)",
+                [(group_id, agent, f, json.dumps(findings)) for agent, f, findings in hits],
+            )
+
+    def cached_findings(self, group_id: str) -> list[tuple[str, str, list[dict[str, Any]]]]:
+        """Return the (agent, file, findings) cache hits of a group."""
+        return [
+            (r["agent"], r["file"], json.loads(r["findings"]))
+            for r in self._conn.execute(
+                "SELECT agent, file, findings FROM cached_findings"
+                " WHERE group_id = ? ORDER BY rowid",
+                (group_id,),
+            )
+        ]
+
+    def file_hashes(self, group_id: str) -> dict[str, str | None]:
+        """Return the submission-time content hash of each file in a group."""
+        return {
+            r["file"]: r["content_hash"]
+            for r in self._conn.execute(
+                "SELECT file, content_hash FROM group_files WHERE group_id = ?", (group_id,)
+            )
+        }
+
+    def record_batch(
+        self,
+        group_id: str,
+        status: BatchStatus,
+        requests: Sequence[tuple[str, str, int | None, Sequence[str]]],
+        retry_of: dict[str, str] | None = None,
+        file_hashes: dict[str, str | None] | None = None,
+        count_attempt: bool = True,
+    ) -> None:
+        """Record a submitted batch and its custom_id mapping.
+
+        Args:
+            group_id: Owning batch group
+            status: Status returned by the create call
+            requests: (custom_id, agent, shard, files) per request in the batch
+            retry_of: Failed or stale custom_id that each resubmitted custom_id replaces
+            file_hashes: Content hash each request's files were built from
+            count_attempt: Count the resubmissions against the retry budget
+                (False keeps the attempt of the request replaced)
+        """
+        retry_of = retry_of or {}
+        file_hashes = file_hashes or {}
+        rows = []
+        for custom_id, agent, shard, files in requests:
+            original = retry_of.get(custom_id)
+            attempt = self.request_attempt(original) + count_attempt if original else 0
+            hashes = {f: file_hashes[f] for f in files if f in file_hashes}
+            rows.append(
+                (custom_id, status.id, agent, shard, json.dumps(list(files)), attempt, original,
+                 json.dumps(hashes) if hashes else None)
+            )
+
+        with self._conn:
+            self._conn.execute(
+                "INSERT INTO batches (id, group_id, processing_status, submitted_at)"
+                " VALUES (?, ?, ?, ?)",
+                (status.id, group_id, status.processing_status, self._now()),
+            )
+            self._conn.executemany(
+                "INSERT INTO requests"
+                " (custom_id, batch_id, agent, shard, files, attempt, retry_of, file_hashes)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def request_attempt(self, custom_id: str) -> int:
+        """Return how many times a request's work was resubmitted (0 = original)."""
+        row = self._conn.execute(
+            "SELECT attempt FROM requests WHERE custom_id = ?", (custom_id,)
+        ).fetchone()
+        return row["attempt"] if row else 0
+
+    def request_file_hashes(self, custom_id: str) -> dict[str, str | None]:
+        """Return the content hashes a request was built from.
+
+        Falls back to the group's submission-time hashes for requests
+        recorded without their own.
+        """
+        row = self._conn.execute(
+            "SELECT r.files, r.file_hashes, b.group_id FROM requests r"
+            " JOIN batches b ON r.batch_id = b.id WHERE r.custom_id = ?",
+            (custom_id,),
+        ).fetchone()
+        if row is None:
+            return {}
+        if row["file_hashes"]:
+            return json.loads(row["file_hashes"])
+        group_hashes = self.file_hashes(row["group_id"])
+        return {f: group_hashes.get(f) for f in json.loads(row["files"])}
+
+    def group_request_ids(self, group_id: str) -> list[str]:
+        """Return every custom_id submitted in a group."""
+        return [
+            r["custom_id"]
+            for r in self._conn.execute(
+                "SELECT r.custom_id FROM requests r JOIN batches b ON r.batch_id = b.id"
+                " WHERE b.group_id = ? ORDER BY r.rowid",
+                (group_id,),
+            )
+        ]
+
+    def batch_processing_status(self, batch_id: str) -> str | None:
+        """Return the last recorded processing_status of a batch."""
+        row = self._conn.execute(
+            "SELECT processing_status FROM batches WHERE id = ?", (batch_id,)
+        ).fetchone()
+        return row["processing_status"] if row else None
+
+    def superseded_requests(self, group_id: str) -> set[str]:
+        """Return the custom_ids of a group that were resubmitted (failed or stale)."""
+        return {
+            r["retry_of"]
+            for r in self._conn.execute(
+                "SELECT r.retry_of FROM requests r JOIN batches b ON r.batch_id = b.id"
+                " WHERE b.group_id = ? AND r.retry_of IS NOT NULL",
+                (group_id,),
+            )
+        }
+
+    def update_batch(self, status: BatchStatus) -> None:
+        """Store the latest polled status of a batch."""
+        with self._conn:
+            self._conn.execute(
+                "UPDATE batches SET processing_status = ?, ended_at = ?, results_url = ?"
+                " WHERE id = ?",
+                (status.processing_status, status.ended_at, status.results_url, status.id),
+            )
+
+    def mark_downloaded(self, batch_id: str) -> None:
+        """Record that a batch's results were downloaded."""
+        with self._conn:
+            self._conn.execute(
+                "UPDATE batches SET downloaded_at = ? WHERE id = ?",
+                (self._now(), batch_id),
+            )
+
+    def mark_reported(self, group_id: str) -> None:
+        """Record that a report was generated for a group."""
+        with self._conn:
+            self._conn.execute(
+                "UPDATE groups SET reported_at = ? WHERE id = ?",
+                (self._now(), group_id),
+            )
+
+    def get_group(self, group_id: str) -> BatchGroup | None:
+        """Load a batch group by ID."""
+        row = self._conn.execute("SELECT * FROM groups WHERE id = ?", (group_id,)).fetchone()
+        if row is None:
+            return None
+        batch_ids = [
+            r["id"]
+            for r in self._conn.execute(
+                "SELECT id FROM batches WHERE group_id = ? ORDER BY rowid", (group_id,)
+            )
+        ]
+        return BatchGroup(
+            id=row["id"],
+            wave=row["wave"],
+            agents=json.loads(row["agents"]),
+            created_at=row["created_at"],
+            batch_ids=batch_ids,
+            request_count=row["request_count"],
+        )
+
+    def group_for_batch(self, batch_id: str) -> str | None:
+        """Return the group ID a batch belongs to."""
+        row = self._conn.execute(
+            "SELECT group_id FROM batches WHERE id = ?", (batch_id,)
+        ).fetchone()
+        return row["group_id"] if row else None
+
+    def results_url(self, batch_id: str) -> str | None:
+        """Return the stored results_url of an ended batch."""
+        row = self._conn.execute(
+            "SELECT results_url FROM batches WHERE id = ?", (batch_id,)
+        ).fetchone()
+        return row["results_url"] if row else None
+
+    def batch_for_request(self, custom_id: str) -> str | None:
+        """Return the batch ID a custom_id was submitted in."""
+        row = self._conn.execute(
+            "SELECT batch_id FROM requests WHERE custom_id = ?", (custom_id,)
+        ).fetchone()
+        return row["batch_id"] if row else None
+
+    def lookup_request(self, custom_id: str) -> tuple[str, int | None, list[str]] | None:
+        """Return (agent, shard, files) for a custom_id."""
+        row = self._conn.execute(
+            "SELECT agent, shard, files FROM requests WHERE custom_id = ?", (custom_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return row["agent"], row["shard"], json.loads(row["files"])
+
+    def unfinished_group_ids(self) -> list[str]:
+        """Groups with at least one batch that has not ended."""
+        return [
+            r["group_id"]
+            for r in self._conn.execute(
+                "SELECT DISTINCT group_id FROM batches"
+                " WHERE processing_status != 'ended' ORDER BY group_id"
+            )
+        ]
+
+    def unreported_group_ids(self) -> list[str]:
+        """Groups whose batches have all ended but have no report yet."""
+        return [
+            r["id"]
+            for r in self._conn.execute(
+                "SELECT g.id FROM groups g WHERE g.reported_at IS NULL"
+                " AND (g.request_count = 0"
+                " OR EXISTS (SELECT 1 FROM batches b WHERE b.group_id = g.id))"
+                " AND NOT EXISTS (SELECT 1 FROM batches b WHERE b.group_id = g.id"
+                " AND b.processing_status != 'ended') ORDER BY g.created_at"
+            )
+        ]
+
+
+# ============================================================================
+# Findings Cache
+# ============================================================================
+
+
+def hash_file_content(file_path: str) -> str | None:
+    """SHA-256 of a file's bytes.
+
+    Args:
+        file_path: File to hash
+
+    Returns:
+        Hex digest, or None if the file cannot be read
+    """
+    try:
+        return hashlib.sha256(Path(file_path).read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+def summarize_findings(findings: Sequence[dict[str, Any]]) -> dict[str, int]:
+    """Build a findings summary block from individual findings.
+
+    Args:
+        findings: Findings with a "severity" field
+
+    Returns:
+        Summary with total and per-severity counts
+    """
+    summary = {"total": len(findings), "critical": 0, "high": 0, "medium": 0, "low": 0}
+    for finding in findings:
+        severity = str(finding.get("severity", "")).lower()
+        if severity in summary:
+            summary[severity] += 1
+    return summary
+
+
+USAGE_FIELDS = (
+    "input_tokens",
+    "output_tokens",
+    "cache_creation_input_tokens",
+    "cache_read_input_tokens",
+)
+
+
+def extract_usage(message: dict[str, Any]) -> dict[str, int]:
+    """Normalize a message's token usage, including prompt-cache counts.
+
+    Args:
+        message: Message object from a succeeded result
+
+    Returns:
+        Usage dict with every USAGE_FIELDS key (missing counts are 0)
+    """
+    usage = message.get("usage") or {}
+    return {key: int(usage.get(key) or 0) for key in USAGE_FIELDS}
+
+
+def sum_usage(usages: Iterable[dict[str, int] | None]) -> dict[str, int] | None:
+    """Add up usage dicts, ignoring missing ones.
+
+    Args:
+        usages: Usage dicts from extract_usage()
+
+    Returns:
+        Summed usage, or None if no usage was given
+    """
+    present = [u for u in usages if u]
+    if not present:
+        return None
+    return {key: sum(u.get(key, 0) for u in present) for key in USAGE_FIELDS}
+
+
+class FindingsCache:
+    """Content-addressed cache of per-file agent findings.
+
+    Entries are keyed by (agent, prompt hash, model, file content hash),
+    so a file is only re-sent to the batch API when its content, the
+    agent's instructions or the model change. The prompt hash is computed
+    by the caller (see findings_prompt_hash in the batch script).
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS findings (
+            agent TEXT NOT NULL,
+            prompt_hash TEXT NOT NULL,
+            model TEXT NOT NULL,
+            content_hash TEXT NOT NULL,
+            findings TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            PRIMARY KEY (agent, prompt_hash, model, content_hash)
+        );
+    """
+
+    def __init__(self, db_path: Path) -> None:
+        """Open (and create if needed) the cache database.
+
+        Args:
+            db_path: Path to the SQLite file
+        """
+        self.db_path = db_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self.SCHEMA)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+    def get(
+        self, agent: str, prompt_hash: str, model: str, content_hash: str
+    ) -> list[dict[str, Any]] | None:
+        """Return cached findings for a file, or None on a miss."""
+        row = self._conn.execute(
+            "SELECT findings FROM findings"
+            " WHERE agent = ? AND prompt_hash = ? AND model = ? AND content_hash = ?",
+            (agent, prompt_hash, model, content_hash),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(
+        self,
+        agent: str,
+        prompt_hash: str,
+        model: str,
+        content_hash: str,
+        findings: Sequence[dict[str, Any]],
+    ) -> None:
+        """Store the findings an agent reported for one file."""
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO findings"
+                " (agent, prompt_hash, model, content_hash, findings, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    agent,
+                    prompt_hash,
+                    model,
+                    content_hash,
+                    json.dumps(list(findings)),
+                    datetime.now(tz=timezone.utc).isoformat(),
+                ),
+            )
+
+
+# ============================================================================
+# Cost Accounting
+# ============================================================================
+
+# Message Batches are billed at 50% of the synchronous Messages API price
+BATCH_DISCOUNT = 0.5
+
+
+@dataclass(frozen=True)
+class ModelPricing:
+    """Synchronous API pricing for one model, in USD per million tokens."""
+
+    input_per_mtok: float
+    output_per_mtok: float
+    # 5-minute prompt cache writes and cache reads, relative to input price
+    cache_write_multiplier: float = 1.25
+    cache_read_multiplier: float = 0.10
+
+    def cost(self, usage: dict[str, int], discount: float = 1.0) -> float:
+        """Price a usage dict from extract_usage().
+
+        Args:
+            usage: Token counts
+            discount: Price multiplier (BATCH_DISCOUNT for batch requests)
+
+        Returns:
+            Cost in USD
+        """
+        input_cost = self.input_per_mtok * (
+            usage.get("input_tokens", 0)
+            + usage.get("cache_creation_input_tokens", 0) * self.cache_write_multiplier
+            + usage.get("cache_read_input_tokens", 0) * self.cache_read_multiplier
+        )
+        output_cost = self.output_per_mtok * usage.get("output_tokens", 0)
+        return (input_cost + output_cost) / 1_000_000 * discount
+
+
+# Keyed by model alias; dated snapshot IDs resolve to their alias
+MODEL_PRICING: dict[str, ModelPricing] = {
+    "claude-opus-4-5": ModelPricing(input_per_mtok=5.0, output_per_mtok=25.0),
+    "claude-opus-4-1": ModelPricing(input_per_mtok=15.0, output_per_mtok=75.0),
+    "claude-sonnet-4-5": ModelPricing(input_per_mtok=3.0, output_per_mtok=15.0),
+    "claude-sonnet-4": ModelPricing(input_per_mtok=3.0, output_per_mtok=15.0),
+    "claude-haiku-4-5": ModelPricing(input_per_mtok=1.0, output_per_mtok=5.0),
+}
+
+MODEL_SNAPSHOT_SUFFIX = re.compile(r"-\d{8}$")
+
+
+def pricing_for_model(model: str) -> ModelPricing | None:
+    """Look up pricing for a model ID or dated snapshot ID.
+
+    Args:
+        model: Model ID (e.g. "claude-sonnet-4-5-20250929")
+
+    Returns:
+        ModelPricing, or None if the model is not in MODEL_PRICING
+    """
+    return MODEL_PRICING.get(model) or MODEL_PRICING.get(MODEL_SNAPSHOT_SUFFIX.sub("", model))
+
+
+@dataclass
+class CostTracker:
+    """Per-request batch costs, aggregated by agent, model and batch."""
+
+    entries: list[dict[str, Any]] = field(default_factory=list)
+
+    def add(
+        self,
+        batch_id: str,
+        custom_id: str,
+        agent: str,
+        model: str,
+        usage: dict[str, int],
+        synchronous: bool = False,
+    ) -> dict[str, Any]:
+        """Price one result's usage and record it.
+
+        Args:
+            batch_id: Batch the request was submitted in ("sync" for
+                synchronous Messages API calls)
+            custom_id: Request custom_id
+            agent: Agent name
+            model: Model that served the request
+            usage: Token counts from extract_usage()
+            synchronous: The request ran on the synchronous API (full price)
+
+        Returns:
+            The recorded ledger entry
+        """
+        pricing = pricing_for_model(model)
+        if pricing is None:
+            logger.warning("model_pricing_unknown", model=model, custom_id=custom_id)
+
+        batch_cost = pricing.cost(usage, BATCH_DISCOUNT) if pricing else 0.0
+        sync_cost = pricing.cost(usage) if pricing else 0.0
+        entry = {
+            "batch_id": batch_id,
+            "custom_id": custom_id,
+            "agent": agent,
+            "model": model,
+            "mode": "sync" if synchronous else "batch",
+            **{key: usage.get(key, 0) for key in USAGE_FIELDS},
+            "priced": pricing is not None,
+            "batch_cost": batch_cost,
+            "sync_cost": sync_cost,
+            "cost": sync_cost if synchronous else batch_cost,
+        }
+        self.entries.append(entry)
+        return entry
+
+    @property
+    def cost(self) -> float:
+        """Total cost actually incurred (batch or synchronous price per request)."""
+        return sum(e["cost"] for e in self.entries)
+
+    @property
+    def synchronous_requests(self) -> int:
+        """Number of requests that ran on the synchronous API."""
+        return sum(1 for e in self.entries if e["mode"] == "sync")
+
+    @property
+    def batch_cost(self) -> float:
+        """Total cost at batch pricing."""
+        return sum(e["batch_cost"] for e in self.entries)
+
+    @property
+    def sync_cost(self) -> float:
+        """Total cost the same usage would have had on the synchronous API."""
+        return sum(e["sync_cost"] for e in self.entries)
+
+    @property
+    def unpriced_requests(self) -> int:
+        """Number of requests whose model had no pricing entry."""
+        return sum(1 for e in self.entries if not e["priced"])
+
+    def totals_by(self, key: str) -> dict[str, dict[str, Any]]:
+        """Aggregate tokens and costs by an entry field.
+
+        Args:
+            key: "agent", "model" or "batch_id"
+
+        Returns:
+            Mapping of key value to summed requests, token counts and costs
+        """
+        totals: dict[str, dict[str, Any]] = {}
+        for entry in self.entries:
+            bucket = totals.setdefault(
+                entry[key],
+                {
+                    "requests": 0,
+                    **dict.fromkeys(USAGE_FIELDS, 0),
+                    "batch_cost": 0.0,
+                    "sync_cost": 0.0,
+                    "cost": 0.0,
+                },
+            )
+            bucket["requests"] += 1
+            for field_name in (*USAGE_FIELDS, "batch_cost", "sync_cost", "cost"):
+                bucket[field_name] += entry[field_name]
+        return totals
+
+    def write_ledger(self, path: Path, group_id: str | None) -> None:
+        """Append every entry to the JSONL cost ledger.
+
+        Args:
+            path: Ledger file
+            group_id: Batch group the entries belong to, if known
+        """
+        if not self.entries:
+            return
+        recorded_at = datetime.now(tz=timezone.utc).isoformat()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a") as f:
+            for entry in self.entries:
+                f.write(
+                    json.dumps({"recorded_at": recorded_at, "group_id": group_id, **entry})
+                    + "\n"
+                )
+
+
+# ============================================================================
+# Results Archive
+# ============================================================================
+
+# Results per independently compressed frame; one lookup decompresses one frame
+ARCHIVE_FRAME_LINES = 256
+
+
+def compress_frame(data: bytes, codec: str) -> bytes:
+    """Compress one archive frame with the given codec ("zstd" or "zlib")."""
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=6).compress(data)
+    return zlib.compress(data, 6)
+
+
+def decompress_frame(data: bytes, codec: str) -> bytes:
+    """Decompress one archive frame written by compress_frame()."""
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd results archives")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+def frame_lines(data: bytes) -> list[str]:
+    """Split a decompressed frame into its result lines.
+
+    Frames are "\\n"-joined with a trailing "\\n"; splitlines() would also
+    break on U+2028, U+0085 and other separators inside JSON strings.
+    """
+    return data.decode().removesuffix("\n").split("\n")
+
+
+class ResultsArchive:
+    """Compressed on-disk copy of every downloaded results file.
+
+    Each batch's results are stored as independently compressed frames of
+    ARCHIVE_FRAME_LINES lines (zstd when installed, else zlib) in
+    ``{batch_id}.jsonl.{codec}``. A SQLite sidecar index maps every
+    custom_id, with its agent and files, to its frame's byte offset, so a
+    single result is read by decompressing one frame.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS archived_batches (
+            batch_id TEXT PRIMARY KEY,
+            path TEXT NOT NULL,
+            codec TEXT NOT NULL,
+            result_count INTEGER NOT NULL,
+            archived_at TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS archived_results (
+            custom_id TEXT PRIMARY KEY,
+            batch_id TEXT NOT NULL REFERENCES archived_batches(batch_id),
+            agent TEXT NOT NULL,
+            files TEXT NOT NULL,
+            result_type TEXT,
+            frame_offset INTEGER NOT NULL,
+            frame_length INTEGER NOT NULL,
+            line_index INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS archived_files (
+            custom_id TEXT NOT NULL REFERENCES archived_results(custom_id),
+            file TEXT NOT NULL,
+            PRIMARY KEY (custom_id, file)
+        );
+        CREATE INDEX IF NOT EXISTS idx_archived_results_agent ON archived_results(agent);
+        CREATE INDEX IF NOT EXISTS idx_archived_files_file ON archived_files(file);
+    """
+
+    def __init__(self, root: Path) -> None:
+        """Open (and create if needed) the archive directory and index.
+
+        Args:
+            root: Archive directory
+        """
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.codec = "zstd" if zstandard is not None else "zlib"
+        self._conn = sqlite3.connect(self.root / "index.sqlite3")
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self.SCHEMA)
+
+    def close(self) -> None:
+        """Close the index database."""
+        self._conn.close()
+
+    def has_batch(self, batch_id: str) -> bool:
+        """Whether a batch's complete results are archived and readable here."""
+        row = self._conn.execute(
+            "SELECT codec FROM archived_batches WHERE batch_id = ?", (batch_id,)
+        ).fetchone()
+        return row is not None and (row["codec"] != "zstd" or zstandard is not None)
+
+    def writer(self, batch_id: str) -> ArchiveWriter:
+        """Start archiving a batch's results stream."""
+        return ArchiveWriter(self, batch_id)
+
+    def iter_batch(self, batch_id: str) -> Iterable[str]:
+        """Yield an archived batch's result lines in download order, frame by frame."""
+        row = self._conn.execute(
+            "SELECT path, codec FROM archived_batches WHERE batch_id = ?", (batch_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(f"Batch {batch_id} is not archived")
+        with Path(row["path"]).open("rb") as f:
+            for frame in self._conn.execute(
+                "SELECT DISTINCT frame_offset, frame_length FROM archived_results"
+                " WHERE batch_id = ? ORDER BY frame_offset",
+                (batch_id,),
+            ):
+                f.seek(frame["frame_offset"])
+                data = decompress_frame(f.read(frame["frame_length"]), row["codec"])
+                yield from frame_lines(data)
+
+    def get(self, custom_id: str) -> str | None:
+        """Read one archived result line, decompressing only its frame.
+
+        Args:
+            custom_id: Result custom_id
+
+        Returns:
+            The raw JSONL line, or None if not archived
+        """
+        row = self._conn.execute(
+            "SELECT r.frame_offset, r.frame_length, r.line_index, b.path, b.codec"
+            " FROM archived_results r JOIN archived_batches b ON r.batch_id = b.batch_id"
+            " WHERE r.custom_id = ?",
+            (custom_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        with Path(row["path"]).open("rb") as f:
+            f.seek(row["frame_offset"])
+            data = decompress_frame(f.read(row["frame_length"]), row["codec"])
+        return frame_lines(data)[row["line_index"]]
+
+    def find(
+        self,
+        agent: str | None = None,
+        file_path: str | None = None,
+    ) -> list[tuple[str, str, str | None]]:
+        """List archived results by agent and/or file.
+
+        Args:
+            agent: Agent name filter
+            file_path: File filter (exact path as submitted)
+
+        Returns:
+            (custom_id, batch_id, result type) per match, oldest first
+        """
+        query = "SELECT DISTINCT r.custom_id, r.batch_id, r.result_type FROM archived_results r"
+        clauses: list[str] = []
+        params: list[str] = []
+        if file_path is not None:
+            query += " JOIN archived_files f ON f.custom_id = r.custom_id"
+            clauses.append("f.file = ?")
+            params.append(file_path)
+        if agent is not None:
+            clauses.append("r.agent = ?")
+            params.append(agent)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY r.rowid"
+        return [
+            (r["custom_id"], r["batch_id"], r["result_type"])
+            for r in self._conn.execute(query, params)
+        ]
+
+    def commit(
+        self,
+        batch_id: str,
+        path: Path,
+        entries: list[tuple[str, str, list[str], str | None, int, int, int]],
+    ) -> None:
+        """Index a fully written archive file (called by ArchiveWriter)."""
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO archived_batches"
+                " (batch_id, path, codec, result_count, archived_at) VALUES (?, ?, ?, ?, ?)",
+                (batch_id, str(path), self.codec, len(entries),
+                 datetime.now(tz=timezone.utc).isoformat()),
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO archived_results (custom_id, batch_id, agent, files,"
+                " result_type, frame_offset, frame_length, line_index)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (custom_id, batch_id, agent, json.dumps(files), result_type,
+                     offset, length, index)
+                    for custom_id, agent, files, result_type, offset, length, index in entries
+                ],
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO archived_files (custom_id, file) VALUES (?, ?)",
+                [(entry[0], f) for entry in entries for f in entry[2]],
+            )
+
+
+class ArchiveWriter:
+    """Writes one batch's results stream into the archive, frame by frame.
+
+    Nothing is indexed until close(); an aborted download leaves no entry.
+    """
+
+    def __init__(self, archive: ResultsArchive, batch_id: str) -> None:
+        """Open the archive file for a batch.
+
+        Args:
+            archive: Owning archive
+            batch_id: Batch being downloaded
+        """
+        self.archive = archive
+        self.batch_id = batch_id
+        self.path = archive.root / f"{batch_id}.jsonl.{archive.codec}"
+        self._file = self.path.open("wb")
+        self._lines: list[str] = []
+        self._pending: list[tuple[str, str, list[str], str | None]] = []
+        self._entries: list[tuple[str, str, list[str], str | None, int, int, int]] = []
+
+    def add(
+        self,
+        line: str,
+        custom_id: str,
+        agent: str,
+        files: Sequence[str],
+        result_type: str | None,
+    ) -> None:
+        """Buffer one result line, writing a frame when it is full."""
+        self._lines.append(line)
+        self._pending.append((custom_id, agent, list(files), result_type))
+        if len(self._lines) >= ARCHIVE_FRAME_LINES:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._lines:
+            return
+        frame = compress_frame(("\n".join(self._lines) + "\n").encode(), self.archive.codec)
+        offset = self._file.tell()
+        self._file.write(frame)
+        for index, (custom_id, agent, files, result_type) in enumerate(self._pending):
+            self._entries.append((custom_id, agent, files, result_type, offset, len(frame), index))
+        self._lines.clear()
+        self._pending.clear()
+
+    def close(self) -> None:
+        """Write the last frame and index the batch."""
+        self._flush()
+        self._file.close()
+        self.archive.commit(self.batch_id, self.path, self._entries)
+        logger.info(
+            "batch_results_archived",
+            batch_id=self.batch_id,
+            result_count=len(self._entries),
+            archive_bytes=self.path.stat().st_size,
+            codec=self.archive.codec,
+        )
+
+    def abort(self) -> None:
+        """Discard a partially written archive file."""
+        self._file.close()
+        self.path.unlink(missing_ok=True)
@@ -0,0 +1,707 @@
+"""
+HTTP transports for submit-batch-verification.py.
+
+Holds the pooled live transport with its retry policy, the record, replay
+and synthetic transports used for offline runs, and the instrumenting
+transport that records per-request latency and size metrics.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import json
+import random
+import re
+import statistics
+import time
+import uuid
+from collections import Counter
+from collections.abc import AsyncIterator, Callable, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import httpx
+import structlog
+
+from batch_storage import summarize_findings
+
+logger = structlog.get_logger(__name__)
+
+
+# ============================================================================
+# HTTP Connection Configuration
+# ============================================================================
+
+
+@dataclass(frozen=True)
+class HTTPClientConfig:
+    """Connection pool settings for the shared Batch API HTTP client."""
+
+    http2: bool = True
+    timeout_seconds: float = 30.0
+    connect_timeout_seconds: float = 10.0
+    max_connections: int = 10
+    max_keepalive_connections: int = 5
+    keepalive_expiry_seconds: float = 120.0
+    # Retries for 429/5xx responses and transport errors (0 = fail fast)
+    max_retries: int = 4
+
+
+# Rate limiting, overload and transient server errors
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504, 529})
+RETRY_BASE_DELAY_SECONDS = 1.0
+RETRY_MAX_DELAY_SECONDS = 60.0
+
+
+def retry_delay(attempt: int, response: httpx.Response | None = None) -> float:
+    """Backoff before retrying a failed HTTP call.
+
+    Honors a Retry-After header in seconds; otherwise uses exponential
+    backoff with full jitter.
+
+    Args:
+        attempt: Zero-based number of the attempt that just failed
+        response: The failed response, if one was received
+
+    Returns:
+        Seconds to wait
+    """
+    if response is not None:
+        try:
+            retry_after = float(response.headers.get("retry-after", ""))
+        except ValueError:
+            pass
+        else:
+            return min(max(retry_after, 0.0), RETRY_MAX_DELAY_SECONDS)
+    return random.uniform(0, min(RETRY_MAX_DELAY_SECONDS, RETRY_BASE_DELAY_SECONDS * 2**attempt))
+
+
+def live_transport(config: HTTPClientConfig) -> httpx.AsyncHTTPTransport:
+    """Build the pooled network transport for the Batch API.
+
+    Args:
+        config: Connection pool settings
+
+    Returns:
+        AsyncHTTPTransport (HTTP/2 when requested and h2 is installed)
+    """
+    http2 = config.http2
+    if http2 and importlib.util.find_spec("h2") is None:
+        logger.warning("http2_unavailable", fallback="http/1.1")
+        http2 = False
+
+    return httpx.AsyncHTTPTransport(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry_seconds,
+        ),
+    )
+
+
+# ============================================================================
+# Offline Transports (record / replay / synthetic)
+# ============================================================================
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Forward requests to a real transport and append each exchange to a cassette.
+
+    The cassette is JSONL, one exchange per line, in request order. API
+    keys are never written.
+    """
+
+    def __init__(self, cassette_path: Path, inner: httpx.AsyncBaseTransport) -> None:
+        """Open a cassette for recording.
+
+        Args:
+            cassette_path: JSONL file to append exchanges to
+            inner: Transport that performs the real requests
+        """
+        self.cassette_path = cassette_path
+        self.inner = inner
+        self.cassette_path.parent.mkdir(parents=True, exist_ok=True)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Perform the request and record the full response."""
+        response = await self.inner.handle_async_request(request)
+        body = await response.aread()
+        await response.aclose()
+
+        exchange = {
+            "method": request.method,
+            "path": request.url.path,
+            "status": response.status_code,
+            "headers": {
+                k: v
+                for k, v in response.headers.items()
+                if k.lower() in ("content-type", "retry-after")
+            },
+            "body": body.decode("utf-8", errors="replace"),
+        }
+        with self.cassette_path.open("a") as f:
+            f.write(json.dumps(exchange) + "\n")
+
+        return httpx.Response(
+            response.status_code, headers=exchange["headers"], content=body, request=request
+        )
+
+    async def aclose(self) -> None:
+        """Close the wrapped transport."""
+        await self.inner.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Replay a recorded cassette deterministically, without network access.
+
+    Exchanges are matched by (method, path) in recorded order; once a
+    path's recordings are used up its last response repeats, so extra
+    status polls see the final recorded state. Custom IDs in replayed
+    results are the recorded ones, not those of the replayed requests.
+    """
+
+    def __init__(self, cassette_path: Path, latency_seconds: float = 0.0) -> None:
+        """Load a cassette.
+
+        Args:
+            cassette_path: JSONL cassette written by RecordingTransport
+            latency_seconds: Delay added to every response
+        """
+        self.latency_seconds = latency_seconds
+        self._exchanges: dict[tuple[str, str], list[dict[str, Any]]] = {}
+        for line in cassette_path.read_text().splitlines():
+            if line.strip():
+                exchange = json.loads(line)
+                key = (exchange["method"], exchange["path"])
+                self._exchanges.setdefault(key, []).append(exchange)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Return the next recorded response for the request's method and path."""
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+
+        queue = self._exchanges.get((request.method, request.url.path))
+        if not queue:
+            return httpx.Response(
+                404,
+                json={"type": "error", "error": {"type": "not_found_error",
+                                                  "message": "Not in cassette"}},
+                request=request,
+            )
+        exchange = queue.pop(0) if len(queue) > 1 else queue[0]
+        return httpx.Response(
+            exchange["status"],
+            headers=exchange["headers"],
+            content=exchange["body"].encode(),
+            request=request,
+        )
+
+
+class SyntheticTransport(httpx.AsyncBaseTransport):
+    """Fabricate Batch and Messages API responses for offline benchmarking.
+
+    Submitted batches advance through ``in_progress`` over polls_to_complete
+    status polls and then end; their results file has one generated result
+    per submitted custom_id, so result-file size scales with the batch.
+    With a state_path, batches are saved after every change and loaded on
+    start, so a batch submitted by one CLI invocation can be polled and
+    downloaded by the next.
+    """
+
+    # The "- path" list every prompt_template fills in for {files}
+    FILES_BLOCK = re.compile(r"Files to verify:[ \t]*((?:- .+(?:\n|$))+)")
+
+    def __init__(
+        self,
+        polls_to_complete: int = 3,
+        latency_seconds: float = 0.0,
+        error_rate: float = 0.0,
+        findings_per_result: int = 2,
+        seed: int = 0,
+        state_path: Path | None = None,
+    ) -> None:
+        """Configure the simulated API.
+
+        Args:
+            polls_to_complete: Status polls before a batch ends (1 = ends on first poll)
+            latency_seconds: Delay added to every response
+            error_rate: Fraction of results returned as overloaded errors
+            findings_per_result: Findings generated per succeeded result
+            seed: Seed for deterministic error and findings generation
+            state_path: JSON file keeping simulated batches across runs
+                (None = batches live only as long as the transport)
+        """
+        self.polls_to_complete = max(polls_to_complete, 1)
+        self.latency_seconds = latency_seconds
+        self.error_rate = error_rate
+        self.findings_per_result = findings_per_result
+        self.state_path = state_path
+        self._random = random.Random(seed)
+        self._batches: dict[str, dict[str, Any]] = {}
+        if state_path is not None and state_path.exists():
+            self._batches = json.loads(state_path.read_text())
+        # Batch IDs must not repeat across runs sharing one batch registry
+        self._id_prefix = uuid.uuid4().hex[:8]
+
+    def _save(self) -> None:
+        if self.state_path is None:
+            return
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        self.state_path.write_text(json.dumps(self._batches))
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now(tz=timezone.utc).isoformat()
+
+    def _status(self, batch_id: str) -> dict[str, Any]:
+        batch = self._batches[batch_id]
+        total = len(batch["requests"])
+        if batch["ended_at"]:
+            completed = batch["completed"]
+            errored = min(batch["errored"], completed)
+            counts = {
+                "processing": 0,
+                "succeeded": completed - errored,
+                "errored": errored,
+                "canceled": total - completed,
+                "expired": 0,
+            }
+        else:
+            done = total * batch["polls"] // self.polls_to_complete
+            counts = {
+                "processing": total - done,
+                "succeeded": done,
+                "errored": 0,
+                "canceled": 0,
+                "expired": 0,
+            }
+        return {
+            "id": batch_id,
+            "type": "message_batch",
+            "processing_status": "ended" if batch["ended_at"] else "in_progress",
+            "request_counts": counts,
+            "created_at": batch["created_at"],
+            "expires_at": batch["created_at"],
+            "ended_at": batch["ended_at"],
+            "results_url": (
+                f"https://api.anthropic.com/v1/messages/batches/{batch_id}/results"
+                if batch["ended_at"]
+                else None
+            ),
+        }
+
+    def _message(self, params: dict[str, Any]) -> dict[str, Any]:
+        prompt = json.dumps(params)
+        content = (params.get("messages") or [{}])[0].get("content")
+        block = self.FILES_BLOCK.search(content) if isinstance(content, str) else None
+        files = re.findall(r"^- (.+)$", block.group(1), re.MULTILINE) if block else []
+        findings = [
+            {
+                "file": files[i % len(files)],
+                "line": self._random.randint(1, 500),
+                "severity": self._random.choice(["low", "medium", "high"]),
+                "finding": "Synthetic finding",
+                "fix": "Synthetic fix",
+            }
+            for i in range(self.findings_per_result if files else 0)
+        ]
+        output = {
+            "findings": findings,
+            "summary": summarize_findings(findings),
+            "score": 9,
+            "coverage": 95,
+        }
+        text = json.dumps(output)
+        block: dict[str, Any] = {"type": "text", "text": text}
+        tool_choice = params.get("tool_choice") or {}
+        if tool_choice.get("type") == "tool":
+            block = {
+                "type": "tool_use",
+                "id": f"toolu_synth_{self._random.getrandbits(48):012x}",
+                "name": tool_choice["name"],
+                "input": output,
+            }
+        return {
+            "id": f"msg_synth_{self._random.getrandbits(48):012x}",
+            "type": "message",
+            "role": "assistant",
+            "model": params.get("model", "unknown"),
+            "content": [block],
+            "stop_reason": "tool_use" if block["type"] == "tool_use" else "end_turn",
+            "usage": {
+                "input_tokens": len(prompt) // 4,
+                "output_tokens": len(text) // 4,
+                "cache_creation_input_tokens": 0,
+                "cache_read_input_tokens": 0,
+            },
+        }
+
+    def _results(self, batch_id: str) -> bytes:
+        batch = self._batches[batch_id]
+        lines = []
+        for index, request in enumerate(batch["requests"]):
+            if index >= batch["completed"]:
+                result = {"type": "canceled"}
+            elif index < batch["errored"]:
+                result = {
+                    "type": "errored",
+                    "error": {
+                        "type": "error",
+                        "error": {"type": "overloaded_error", "message": "Overloaded"},
+                    },
+                }
+            else:
+                result = {"type": "succeeded", "message": self._message(request["params"])}
+            lines.append(json.dumps({"custom_id": request["custom_id"], "result": result}))
+        return ("\n".join(lines) + "\n").encode()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Serve one simulated API call."""
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+
+        parts = request.url.path.strip("/").split("/")  # v1/messages/batches/{id}/...
+        if request.method == "POST" and parts == ["v1", "messages"]:
+            params = json.loads(await request.aread())
+            return httpx.Response(200, json=self._message(params), request=request)
+
+        if request.method == "POST" and parts == ["v1", "messages", "batches"]:
+            requests = json.loads(await request.aread())["requests"]
+            batch_id = f"msgbatch_synth{self._id_prefix}{len(self._batches):06d}"
+            self._batches[batch_id] = {
+                "requests": requests,
+                "polls": 0,
+                "created_at": self._now(),
+                "ended_at": None,
+                "completed": len(requests),
+                "errored": sum(1 for _ in requests if self._random.random() < self.error_rate),
+            }
+            self._save()
+            return httpx.Response(200, json=self._status(batch_id), request=request)
+
+        batch_id = parts[3] if len(parts) > 3 else ""
+        if batch_id not in self._batches:
+            return httpx.Response(
+                404,
+                json={"type": "error", "error": {"type": "not_found_error",
+                                                  "message": f"Unknown batch {batch_id}"}},
+                request=request,
+            )
+
+        batch = self._batches[batch_id]
+        if request.method == "POST" and parts[4:] == ["cancel"]:
+            if not batch["ended_at"]:
+                total = len(batch["requests"])
+                batch["completed"] = total * batch["polls"] // self.polls_to_complete
+                batch["ended_at"] = self._now()
+                self._save()
+            return httpx.Response(200, json=self._status(batch_id), request=request)
+
+        if parts[4:] == ["results"]:
+            return httpx.Response(
+                200,
+                content=self._results(batch_id),
+                headers={"content-type": "application/x-jsonl"},
+                request=request,
+            )
+
+        batch["polls"] += 1
+        if batch["polls"] >= self.polls_to_complete and not batch["ended_at"]:
+            batch["ended_at"] = self._now()
+        self._save()
+        return httpx.Response(200, json=self._status(batch_id), request=request)
+
+
+def state_dir(project_root: Path, offline: bool) -> Path:
+    """Directory holding the registry, caches, archive and logs of a run.
+
+    Args:
+        project_root: Project the run verifies
+        offline: The run uses a replay or synthetic transport
+
+    Returns:
+        ``.build/``, or ``.build/offline/`` for offline runs
+    """
+    build_dir = project_root / ".build"
+    return build_dir / "offline" if offline else build_dir
+
+
+# ============================================================================
+# Request Instrumentation
+# ============================================================================
+
+
+# Upper bounds (seconds) of the latency histogram buckets in the Prometheus dump
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+METRIC_PERCENTILES = (50, 90, 95, 99)
+TIMING_FIELDS = ("duration_seconds", "ttfb_seconds", "connect_seconds")
+
+
+def endpoint_name(request: httpx.Request) -> str:
+    """Name the Batch API operation a request belongs to.
+
+    Args:
+        request: Outgoing request
+
+    Returns:
+        "create_batch", "get_batch", "download_results", "cancel_batch",
+        "send_message" or "other"
+    """
+    parts = request.url.path.strip("/").split("/")  # v1/messages/batches/{id}/...
+    if parts == ["v1", "messages"]:
+        return "send_message"
+    if parts[:3] != ["v1", "messages", "batches"]:
+        return "other"
+    if len(parts) == 3:
+        return "create_batch" if request.method == "POST" else "other"
+    if len(parts) == 4:
+        return "get_batch"
+    return {"results": "download_results", "cancel": "cancel_batch"}.get(parts[4], "other")
+
+
+@dataclass
+class RequestSample:
+    """Timing and size of one HTTP exchange (each retry is its own sample)."""
+
+    endpoint: str
+    status: int | None  # None when no response arrived (connection error, timeout)
+    duration_seconds: float  # Request start to last body byte
+    ttfb_seconds: float | None  # Request start to response headers
+    connect_seconds: float | None  # TCP + TLS setup; None on a reused connection
+    bytes_sent: int
+    bytes_received: int
+
+
+def percentiles(values: Sequence[float]) -> dict[str, float]:
+    """METRIC_PERCENTILES of a sample, keyed "p50", "p90", ...
+
+    Args:
+        values: Observed values
+
+    Returns:
+        Percentiles (empty for no values)
+    """
+    if not values:
+        return {}
+    if len(values) == 1:
+        return {f"p{pct}": round(values[0], 4) for pct in METRIC_PERCENTILES}
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {f"p{pct}": round(cuts[pct - 1], 4) for pct in METRIC_PERCENTILES}
+
+
+class RequestMetrics:
+    """In-process per-endpoint request samples with JSON/Prometheus export."""
+
+    def __init__(self) -> None:
+        """Start with no samples."""
+        self.samples: list[RequestSample] = []
+
+    def record(self, sample: RequestSample) -> None:
+        """Add one finished exchange."""
+        self.samples.append(sample)
+
+    def by_endpoint(self) -> dict[str, list[RequestSample]]:
+        """Samples grouped by endpoint, in first-seen order."""
+        grouped: dict[str, list[RequestSample]] = {}
+        for sample in self.samples:
+            grouped.setdefault(sample.endpoint, []).append(sample)
+        return grouped
+
+    def summary(self) -> dict[str, dict[str, Any]]:
+        """Per-endpoint counts, status codes, bytes and timing percentiles.
+
+        Returns:
+            Endpoint name to its aggregates
+        """
+        summary: dict[str, dict[str, Any]] = {}
+        for endpoint, samples in self.by_endpoint().items():
+            statuses = Counter(str(s.status) if s.status is not None else "error" for s in samples)
+            entry: dict[str, Any] = {
+                "requests": len(samples),
+                "status_codes": dict(sorted(statuses.items())),
+                "new_connections": sum(1 for s in samples if s.connect_seconds is not None),
+                "bytes_sent": sum(s.bytes_sent for s in samples),
+                "bytes_received": sum(s.bytes_received for s in samples),
+            }
+            for name in TIMING_FIELDS:
+                values = [getattr(s, name) for s in samples if getattr(s, name) is not None]
+                if values:
+                    entry[name] = {
+                        **percentiles(values),
+                        "max": round(max(values), 4),
+                        "sum": round(sum(values), 4),
+                    }
+            summary[endpoint] = entry
+        return summary
+
+    def to_prometheus(self) -> str:
+        """Render the samples in the Prometheus text exposition format.
+
+        Returns:
+            Latency histograms per endpoint plus request and byte counters
+        """
+        lines: list[str] = []
+        grouped = self.by_endpoint()
+
+        for name in TIMING_FIELDS:
+            metric = f"batch_api_request_{name}"
+            lines.append(f"# HELP {metric} Batch API {name.removesuffix('_seconds')} per request")
+            lines.append(f"# TYPE {metric} histogram")
+            for endpoint, samples in grouped.items():
+                values = [getattr(s, name) for s in samples if getattr(s, name) is not None]
+                label = f'endpoint="{endpoint}"'
+                for bound in LATENCY_BUCKETS:
+                    count = sum(1 for v in values if v <= bound)
+                    lines.append(f'{metric}_bucket{{{label},le="{bound}"}} {count}')
+                lines.append(f'{metric}_bucket{{{label},le="+Inf"}} {len(values)}')
+                lines.append(f"{metric}_sum{{{label}}} {sum(values)}")
+                lines.append(f"{metric}_count{{{label}}} {len(values)}")
+
+        lines.append("# HELP batch_api_requests_total Batch API requests by status code")
+        lines.append("# TYPE batch_api_requests_total counter")
+        for endpoint, entry in self.summary().items():
+            for status, count in entry["status_codes"].items():
+                lines.append(
+                    f'batch_api_requests_total{{endpoint="{endpoint}",status="{status}"}} {count}'
+                )
+
+        for direction in ("sent", "received"):
+            metric = f"batch_api_bytes_{direction}_total"
+            lines.append(f"# HELP {metric} Batch API body bytes {direction}")
+            lines.append(f"# TYPE {metric} counter")
+            for endpoint, samples in grouped.items():
+                total = sum(getattr(s, f"bytes_{direction}") for s in samples)
+                lines.append(f'{metric}{{endpoint="{endpoint}"}} {total}')
+
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: Path) -> None:
+        """Dump the metrics; ``.prom`` files get Prometheus text, others JSON.
+
+        Args:
+            path: Output file
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.suffix == ".prom":
+            path.write_text(self.to_prometheus())
+        else:
+            path.write_text(json.dumps(self.summary(), indent=2) + "\n")
+        logger.info("http_metrics_written", path=str(path), requests=len(self.samples))
+
+
+class MeteredStream(httpx.AsyncByteStream):
+    """Response body stream that reports its size and end time when closed."""
+
+    def __init__(
+        self,
+        inner: httpx.AsyncByteStream,
+        on_close: Callable[[int], None],
+    ) -> None:
+        """Wrap a response stream.
+
+        Args:
+            inner: Stream returned by the wrapped transport
+            on_close: Called once with the number of body bytes read
+        """
+        self.inner = inner
+        self.on_close = on_close
+        self.bytes_received = 0
+        self._closed = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        """Yield body chunks, counting bytes."""
+        async for chunk in self.inner:
+            self.bytes_received += len(chunk)
+            yield chunk
+
+    async def aclose(self) -> None:
+        """Close the wrapped stream and report once."""
+        await self.inner.aclose()
+        if not self._closed:
+            self._closed = True
+            self.on_close(self.bytes_received)
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """Wrap a transport and record a RequestSample for every exchange.
+
+    Connection setup time comes from httpcore trace events, so it is only
+    measured on the live transport; offline transports report None.
+    """
+
+    def __init__(self, inner: httpx.AsyncBaseTransport, metrics: RequestMetrics) -> None:
+        """Wrap a transport.
+
+        Args:
+            inner: Transport that performs the requests
+            metrics: Collector the samples are added to
+        """
+        self.inner = inner
+        self.metrics = metrics
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Perform the request, timing headers and body separately."""
+        endpoint = endpoint_name(request)
+        try:
+            bytes_sent = len(request.content)
+        except httpx.RequestNotRead:
+            bytes_sent = 0
+        connect: dict[str, float] = {}
+
+        async def trace(event_name: str, info: dict[str, Any]) -> None:
+            # e.g. connection.connect_tcp.started ... connection.start_tls.complete
+            if event_name == "connection.connect_tcp.started":
+                connect["start"] = time.perf_counter()
+            elif event_name in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+                connect["end"] = time.perf_counter()
+
+        request.extensions["trace"] = trace
+        start = time.perf_counter()
+        try:
+            response = await self.inner.handle_async_request(request)
+        except Exception:
+            self.metrics.record(
+                RequestSample(
+                    endpoint=endpoint,
+                    status=None,
+                    duration_seconds=time.perf_counter() - start,
+                    ttfb_seconds=None,
+                    connect_seconds=None,
+                    bytes_sent=bytes_sent,
+                    bytes_received=0,
+                )
+            )
+            raise
+        ttfb = time.perf_counter() - start
+        connect_seconds = (
+            connect["end"] - connect["start"] if "start" in connect and "end" in connect else None
+        )
+
+        def on_close(bytes_received: int) -> None:
+            self.metrics.record(
+                RequestSample(
+                    endpoint=endpoint,
+                    status=response.status_code,
+                    duration_seconds=time.perf_counter() - start,
+                    ttfb_seconds=ttfb,
+                    connect_seconds=connect_seconds,
+                    bytes_sent=bytes_sent,
+                    bytes_received=bytes_received,
+                )
+            )
+
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            stream=MeteredStream(response.stream, on_close),
+            extensions=response.extensions,
+            request=request,
+        )
+
+    async def aclose(self) -> None:
+        """Close the wrapped transport."""
+        await self.inner.aclose()
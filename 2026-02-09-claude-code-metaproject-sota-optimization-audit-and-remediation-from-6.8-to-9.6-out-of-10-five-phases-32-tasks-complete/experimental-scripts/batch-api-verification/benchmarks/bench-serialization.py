@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Serialization backend benchmark for batch request payloads and results.
+
+Times building, sharding/encoding and results decoding for a synthetic
+10,000-request batch with each available backend (pydantic, orjson).
+Every request embeds one small fixed source file. Runs in a temporary
+directory; nothing is written to .build/.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+SCRIPT_PATH = Path(__file__).resolve().parent.parent / "submit-batch-verification.py"
+
+# Embedded in every request: about 1 KB, so 10,000 requests stay near 20 MB
+FIXTURE_SOURCE = """\
+from dataclasses import dataclass
+
+
+@dataclass
+class Invoice:
+    customer_id: str
+    amount_cents: int
+    currency: str = "EUR"
+
+
+def total_cents(invoices: list[Invoice], currency: str) -> int:
+    \"\"\"Sum invoice amounts in one currency.\"\"\"
+    return sum(i.amount_cents for i in invoices if i.currency == currency)
+
+
+def overdue(invoices: list[Invoice], paid: set[str]) -> list[Invoice]:
+    \"\"\"Invoices whose customer has not paid.\"\"\"
+    return [i for i in invoices if i.customer_id not in paid]
+
+
+def format_amount(amount_cents: int, currency: str) -> str:
+    \"\"\"Format an amount for display.\"\"\"
+    return f"{amount_cents / 100:.2f} {currency}"
+"""
+
+
+def load_batch_module() -> Any:
+    """Import submit-batch-verification.py (hyphenated filename)."""
+    os.environ.setdefault("ANTHROPIC_API_KEY", "benchmark")
+    # The script imports its sibling modules (batch_models, batch_storage, ...)
+    sys.path.insert(0, str(SCRIPT_PATH.parent))
+    spec = importlib.util.spec_from_file_location("submit_batch_verification", SCRIPT_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def synthetic_result_lines(custom_ids: list[str]) -> list[bytes]:
+    """Build one succeeded results JSONL line per custom_id."""
+    findings = json.dumps({"findings": [], "summary": {"total": 0}})
+    return [
+        json.dumps(
+            {
+                "custom_id": custom_id,
+                "result": {
+                    "type": "succeeded",
+                    "message": {
+                        "content": [{"type": "text", "text": findings}],
+                        "usage": {"input_tokens": 1200, "output_tokens": 300},
+                    },
+                },
+            }
+        ).encode()
+        for custom_id in custom_ids
+    ]
+
+
+def bench_backend(module: Any, name: str, request_count: int, file_path: str) -> dict:
+    """Time one serialization backend.
+
+    Args:
+        module: Loaded submit-batch-verification module
+        name: Serializer name
+        request_count: Number of requests to build
+        file_path: File embedded in every request
+
+    Returns:
+        Dict of phase timings in milliseconds plus payload size
+    """
+    client = module.BatchAPIClient(serializer=name)
+    agents = module.ALL_AGENTS
+    shards = [[file_path]]
+
+    try:
+        start = time.perf_counter()
+        requests = []
+        while len(requests) < request_count:
+            requests.extend(client.build_requests(agents, {a.name: shards for a in agents}))
+        requests = requests[:request_count]
+        build_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        batches = client.shard_requests(requests)
+        encode_ms = (time.perf_counter() - start) * 1000
+        payload_bytes = sum(len(encoded) for batch in batches for _, encoded in batch)
+
+        lines = synthetic_result_lines([r.custom_id for r in requests])
+        start = time.perf_counter()
+        for line in lines:
+            client.serializer.decode_result(line)
+        decode_ms = (time.perf_counter() - start) * 1000
+    finally:
+        asyncio.run(client.aclose())
+
+    return {
+        "serializer": client.serializer.name,
+        "requests": len(requests),
+        "payload_bytes": payload_bytes,
+        "build_ms": round(build_ms, 1),
+        "encode_ms": round(encode_ms, 1),
+        "decode_ms": round(decode_ms, 1),
+        "total_ms": round(build_ms + encode_ms + decode_ms, 1),
+    }
+
+
+def main() -> int:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=10_000)
+    parser.add_argument(
+        "--file",
+        type=Path,
+        help="File embedded in each request (default: a small fixed fixture)",
+    )
+    parser.add_argument("--output", type=Path, help="Optional JSON results path")
+    args = parser.parse_args()
+    file_path = args.file.resolve() if args.file else None
+    output = args.output.resolve() if args.output else None
+
+    module = load_batch_module()
+    backends = [module.PydanticSerializer.name]
+    if module.orjson is not None:
+        backends.append(module.OrjsonSerializer.name)
+
+    cwd = Path.cwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            if file_path is None:
+                file_path = Path(workdir) / "fixture.py"
+                file_path.write_text(FIXTURE_SOURCE)
+            results = [
+                bench_backend(module, name, args.requests, str(file_path)) for name in backends
+            ]
+        finally:
+            os.chdir(cwd)
+
+    print(f"\n{'serializer':<10} {'build':>9} {'encode':>9} {'decode':>9} {'total':>9}")
+    for row in results:
+        print(
+            f"{row['serializer']:<10} {row['build_ms']:>7.1f}ms {row['encode_ms']:>7.1f}ms "
+            f"{row['decode_ms']:>7.1f}ms {row['total_ms']:>7.1f}ms"
+        )
+    print()
+
+    if output:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with output.open("w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to: {output}\n")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
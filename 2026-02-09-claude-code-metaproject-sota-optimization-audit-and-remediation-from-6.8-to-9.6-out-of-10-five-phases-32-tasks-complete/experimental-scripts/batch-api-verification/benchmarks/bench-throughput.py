@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Offline throughput benchmark for the batch client.
+
+Runs build, submit, poll and download/parse for a synthetic batch of
+10,000 requests against SyntheticTransport, so it needs no network access
+or API key. Runs in a temporary directory; nothing is written to .build/.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+SCRIPT_PATH = Path(__file__).resolve().parent.parent / "submit-batch-verification.py"
+
+
+def load_batch_module() -> Any:
+    """Import submit-batch-verification.py (hyphenated filename)."""
+    # The script imports its sibling modules (batch_models, batch_storage, ...)
+    sys.path.insert(0, str(SCRIPT_PATH.parent))
+    spec = importlib.util.spec_from_file_location("submit_batch_verification", SCRIPT_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+async def run_benchmark(
+    module: Any,
+    request_count: int,
+    serializer: str,
+    latency_seconds: float,
+    error_rate: float,
+) -> dict:
+    """Time each stage of a synthetic batch run.
+
+    Args:
+        module: Loaded submit-batch-verification module
+        request_count: Number of requests (rounded to a multiple of the agent count)
+        serializer: Serialization backend name
+        latency_seconds: Latency injected per API response
+        error_rate: Fraction of results returned as errors
+
+    Returns:
+        Dict of stage timings and throughput
+    """
+    agents = module.ALL_AGENTS
+    files_per_agent = max(request_count // len(agents), 1)
+
+    # One small source file per request shard
+    src = Path("src")
+    src.mkdir()
+    files = []
+    for i in range(files_per_agent):
+        path = src / f"module_{i:05d}.py"
+        path.write_text(f"def handler_{i}(value: int) -> int:\n    return value * {i}\n")
+        files.append(str(path))
+
+    transport = module.SyntheticTransport(
+        polls_to_complete=1, latency_seconds=latency_seconds, error_rate=error_rate
+    )
+    timings: dict[str, float] = {}
+
+    async with module.BatchAPIClient(serializer=serializer, transport=transport) as client:
+        start = time.perf_counter()
+        requests = client.build_requests(agents, {a.name: [[f] for f in files] for a in agents})
+        shards = client.shard_requests(requests)
+        timings["build_s"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        statuses = await asyncio.gather(*(client.submit_batch(shard) for shard in shards))
+        timings["submit_s"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        await client.poll_group([s.id for s in statuses])
+        timings["poll_s"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        parsed_count = 0
+        failed = 0
+        async for result in client.iter_group_results([s.id for s in statuses]):
+            parsed = client.parse_agent_findings(result)
+            parsed_count += 1
+            failed += parsed["status"] != "PASS"
+        timings["download_parse_s"] = time.perf_counter() - start
+
+    total = sum(timings.values())
+    return {
+        "serializer": client.serializer.name,
+        "requests": len(requests),
+        "batches": len(shards),
+        "results": parsed_count,
+        "failed": failed,
+        **{k: round(v, 3) for k, v in timings.items()},
+        "total_s": round(total, 3),
+        "requests_per_s": round(len(requests) / total, 1) if total else None,
+    }
+
+
+def main() -> int:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=10_000)
+    parser.add_argument("--serializer", default="pydantic", choices=["pydantic", "orjson"])
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per API response")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--output", type=Path, help="Optional JSON results path")
+    args = parser.parse_args()
+    output = args.output.resolve() if args.output else None
+
+    module = load_batch_module()
+    cwd = Path.cwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            results = asyncio.run(
+                run_benchmark(module, args.requests, args.serializer, args.latency, args.error_rate)
+            )
+        finally:
+            os.chdir(cwd)
+
+    print()
+    for key, value in results.items():
+        print(f"{key:<18} {value}")
+    print()
+
+    if output:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with output.open("w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to: {output}\n")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,52 +3,136 @@
 Batch API verification script for Claude Code verification agents.
 
 Submits verification agent requests to Anthropic Batch API for 50% cost reduction.
-Supports polling, exponential backoff, and results parsing.
+Supports adaptive polling, sharded batch groups, and results parsing.
 
 Installation:
-    pip install httpx anthropic structlog pydantic
+    pip install "httpx[http2]" anthropic structlog pydantic
     # OR with uv:
-    uv pip install httpx anthropic structlog pydantic
+    uv pip install "httpx[http2]" anthropic structlog pydantic
 
 Usage:
     python submit-batch-verification.py submit --wave 1  # Submit Wave 1 agents
     python submit-batch-verification.py submit --wave 2  # Submit Wave 2 agents
-    python submit-batch-verification.py poll BATCH_ID    # Poll batch status
-    python submit-batch-verification.py results BATCH_ID # Download results
+    python submit-batch-verification.py poll BATCH_ID    # Poll batch (or bgrp_ group) status
+    python submit-batch-verification.py results BATCH_ID # Download batch (or bgrp_ group) results
+    python submit-batch-verification.py poll             # Resume all unfinished groups
+    python submit-batch-verification.py results          # Report all ended, unreported groups
+    python submit-batch-verification.py run              # Submit, poll and report both waves
+    python submit-batch-verification.py run --deadline 600 --sync security-auditor
+    python submit-batch-verification.py show CUSTOM_ID   # Print one archived result
+    python submit-batch-verification.py --structured-output run  # Findings via tool_use
+    python submit-batch-verification.py --metrics .build/logs/http-metrics.prom run
 
 Features:
 - 50% cost savings vs. synchronous API
 - Batch processing for non-interactive verification tasks
-- Exponential backoff polling
+- Adaptive multi-batch polling scheduled from progress-based ETAs
+- Single pooled HTTP/2 connection shared by submit, poll and download
+- Automatic sharding of oversized submissions into batch groups
+- Optional token-budget bin-packing of files into per-shard agent requests
+- Durable SQLite batch registry (.build/batch-registry.sqlite3) for resume
+- Content-addressed findings cache so unchanged files are never re-sent
+- Prompt-caching request layout (shared system + file-content prefix)
+- End-to-end `run` command scheduling agents as a dependency DAG
+- Optional orjson fast path for batch payload encoding
+- Usage-based cost accounting with a JSONL cost ledger
+- Deadline-aware dispatch of urgent agents to synchronous Messages calls
+- Follow-up batches for errored/expired requests; 429/5xx retry with backoff
+- Record/replay cassettes and a synthetic API transport for offline runs
+  (offline state is kept apart, under .build/offline/)
+- Supersedes in-flight requests whose files changed; stale results are marked
+- Compressed results archive (.build/results-archive) indexed by custom_id
+- Tolerant findings extraction from fenced or prose-wrapped JSON responses
+- Opt-in structured output: findings returned through a forced tool call
+- Per-agent max_tokens learned from logged output sizes; truncated responses retried
+- Per-endpoint HTTP latency/size histograms, dumped as JSON or Prometheus text
 - Structured report generation
 - JSONL logging
 
 Requirements:
 - Python 3.11+
-- httpx>=0.24.0
+- httpx>=0.24.0 (h2 extra optional; falls back to HTTP/1.1 without it)
+- orjson>=3.8 (optional; enables --serializer orjson)
+- zstandard (optional; results archive uses zlib without it)
 - anthropic>=0.18.0
 - structlog>=23.0.0
 - pydantic>=2.0.0
+
+Modules (imported from this script's directory):
+- batch_models.py: Batch API request, status and result models
+- batch_storage.py: SQLite batch registry, findings cache, cost ledger and
+  results archive
+- batch_transports.py: pooled HTTP transport, retry policy, the
+  record/replay/synthetic offline transports and request metrics
 """
 
 from __future__ import annotations
 
 import argparse
 import asyncio
+import hashlib
 import json
+import math
 import os
+import random
+import re
+import statistics
 import sys
-import time
 import uuid
-from collections.abc import Sequence
-from dataclasses import dataclass
+from collections import Counter
+from collections.abc import AsyncIterator, Awaitable, Callable, Collection, Iterable, Sequence
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
 import httpx
 import structlog
-from pydantic import BaseModel, ConfigDict, Field, field_validator
+from pydantic import ValidationError
+
+try:
+    import orjson
+except ImportError:  # Optional fast-path serializer
+    orjson = None
+
+from batch_models import (
+    MAX_BATCH_PAYLOAD_BYTES,
+    MAX_OUTPUT_TOKENS,
+    MAX_REQUESTS_PER_BATCH,
+    AgentFindings,
+    BatchGroup,
+    BatchIndividualResult,
+    BatchRequest,
+    BatchRequestParams,
+    BatchStatus,
+    CacheControl,
+    MessageRequest,
+    TextBlock,
+)
+from batch_storage import (
+    BATCH_DISCOUNT,
+    ArchiveWriter,
+    BatchRegistry,
+    CostTracker,
+    FindingsCache,
+    ResultsArchive,
+    extract_usage,
+    hash_file_content,
+    sum_usage,
+    summarize_findings,
+)
+from batch_transports import (
+    RETRYABLE_STATUS_CODES,
+    HTTPClientConfig,
+    InstrumentedTransport,
+    RecordingTransport,
+    ReplayTransport,
+    RequestMetrics,
+    SyntheticTransport,
+    live_transport,
+    retry_delay,
+    state_dir,
+)
 
 # Configure structlog
 structlog.configure(
@@ -62,147 +146,168 @@ logger = structlog.get_logger(__name__)
 
 
 # ============================================================================
-# Pydantic Models (v2)
+# Agent Configuration
 # ============================================================================
 
 
-class MessageRequest(BaseModel):
-    """Single message request for verification agent."""
-
-    model_config = ConfigDict(strict=True, frozen=True)
-
-    role: str = Field(..., pattern=r"^(user|assistant)$")
-    content: str
-
-
-class BatchRequestParams(BaseModel):
-    """Parameters for a single batch request."""
-
-    model_config = ConfigDict(strict=True)
-
-    model: str = Field(default="claude-sonnet-4-5-20250929")
-    max_tokens: int = Field(default=8000, ge=1, le=8192)
-    messages: list[MessageRequest]
-    system: str | None = None
-    temperature: float = Field(default=1.0, ge=0.0, le=1.0)
-
-    @field_validator("model")
-    @classmethod
-    def validate_model(cls, v: str) -> str:
-        """Validate model name."""
-        allowed_models = {
-            "claude-opus-4-6",
-            "claude-opus-4-5",
-            "claude-sonnet-4-5-20250929",
-            "claude-haiku-4-5-20251001",
-        }
-        if v not in allowed_models:
-            raise ValueError(f"model must be one of {allowed_models}")
-        return v
-
-
-class BatchRequest(BaseModel):
-    """Single request in a message batch."""
-
-    model_config = ConfigDict(strict=True)
-
-    custom_id: str
-    params: BatchRequestParams
-
-
-class BatchCreateRequest(BaseModel):
-    """Request to create a message batch."""
-
-    model_config = ConfigDict(strict=True)
-
-    requests: list[BatchRequest] = Field(..., min_length=1, max_length=10000)
-
-
-class RequestCounts(BaseModel):
-    """Request counts for a batch."""
-
-    model_config = ConfigDict(strict=True, frozen=True)
-
-    processing: int = 0
-    succeeded: int = 0
-    errored: int = 0
-    canceled: int = 0
-    expired: int = 0
-
-
-class BatchStatus(BaseModel):
-    """Status of a message batch."""
-
-    model_config = ConfigDict(strict=True, frozen=True)
-
-    id: str
-    type: str
-    processing_status: str
-    request_counts: RequestCounts
-    ended_at: str | None = None
-    created_at: str
-    expires_at: str
-    cancel_initiated_at: str | None = None
-    results_url: str | None = None
-
-
-class BatchResultSucceeded(BaseModel):
-    """Succeeded batch result."""
-
-    model_config = ConfigDict(strict=True, frozen=True)
+@dataclass
+class AgentConfig:
+    """Configuration for a verification agent."""
 
-    type: str = Field(..., pattern=r"^succeeded$")
-    message: dict[str, Any]
+    name: str
+    wave: int
+    prompt_template: str
+    model: str = "claude-sonnet-4-5-20250929"
+    max_tokens: int = 8000
+    # Agents whose results must be reported before this agent is submitted
+    # by the `run` command. Waves group reports; only depends_on orders them,
+    # so list only agents whose output this agent actually needs.
+    depends_on: tuple[str, ...] = ()
+    # Optional findings-schema fields this agent fills in (cwe, score, coverage)
+    report_fields: tuple[str, ...] = ()
 
 
-class BatchResultErrored(BaseModel):
-    """Errored batch result."""
+# custom_id layout: "{agent}-{nonce}" or "{agent}-shard{NNN}-{nonce}"
+CUSTOM_ID_PATTERN = re.compile(
+    r"^(?P<agent>.+?)(?:-shard(?P<shard>\d{3}))?-(?P<nonce>[0-9a-f]{8})$"
+)
 
-    model_config = ConfigDict(strict=True, frozen=True)
 
-    type: str = Field(..., pattern=r"^errored$")
-    error: dict[str, Any]
+def make_custom_id(agent_name: str, shard_index: int | None = None) -> str:
+    """Build a batch custom_id for an agent request.
 
+    Args:
+        agent_name: Verification agent name
+        shard_index: File shard index when the agent's files are packed
+            into several requests, None for a single request
 
-class BatchResultExpired(BaseModel):
-    """Expired batch result."""
+    Returns:
+        custom_id string (unique per request)
+    """
+    nonce = uuid.uuid4().hex[:8]
+    if shard_index is None:
+        return f"{agent_name}-{nonce}"
+    return f"{agent_name}-shard{shard_index:03d}-{nonce}"
 
-    model_config = ConfigDict(strict=True, frozen=True)
 
-    type: str = Field(..., pattern=r"^expired$")
+def parse_custom_id(custom_id: str) -> tuple[str, int | None]:
+    """Split a batch custom_id into agent name and shard index.
 
+    Args:
+        custom_id: custom_id built by make_custom_id
 
-class BatchResultCanceled(BaseModel):
-    """Canceled batch result."""
+    Returns:
+        (agent name, shard index or None)
+    """
+    match = CUSTOM_ID_PATTERN.match(custom_id)
+    if match is None:
+        return custom_id, None
+    shard = match.group("shard")
+    return match.group("agent"), int(shard) if shard is not None else None
+
+
+# Shared system prompt for the prompt-caching layout; must stay identical
+# across agents so the cached prefix is reused
+VERIFICATION_SYSTEM_PROMPT = """You are a code verification agent for a Python project.
+
+The complete source of every file under review follows in <file> blocks.
+Base every finding on that source, cite the file path and line number, and
+respond only with the JSON object described in the instructions."""
+
+# Structured-output variant, shared by every agent for the same reason
+VERIFICATION_TOOL_SYSTEM_PROMPT = """You are a code verification agent for a Python project.
+
+The complete source of every file under review follows in <file> blocks.
+Base every finding on that source, cite the file path and line number, and
+report your results only through the record_findings tool."""
+
+FINDINGS_TOOL_NAME = "record_findings"
+
+# One tool for all agents: tools precede the system prompt in the cache
+# prefix, so a per-agent schema would stop agents sharing cached file content.
+# Agent-specific fields are optional here and requested in each prompt.
+FINDINGS_TOOL: dict[str, Any] = {
+    "name": FINDINGS_TOOL_NAME,
+    "description": "Record the verification findings for the files under review.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "findings": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "file": {"type": "string"},
+                        "line": {"type": "integer"},
+                        "severity": {
+                            "type": "string",
+                            "enum": ["CRITICAL", "HIGH", "MEDIUM", "LOW"],
+                        },
+                        "finding": {"type": "string"},
+                        "fix": {"type": "string"},
+                        "cwe": {"type": "string", "description": "CWE ID, e.g. CWE-798"},
+                    },
+                    "required": ["file", "line", "severity", "finding", "fix"],
+                },
+            },
+            "summary": {
+                "type": "object",
+                "properties": {
+                    key: {"type": "integer"}
+                    for key in ("total", "critical", "high", "medium", "low")
+                },
+                "required": ["total", "critical", "high", "medium", "low"],
+            },
+            "score": {"type": "number", "minimum": 0, "maximum": 10},
+            "coverage": {"type": "number", "minimum": 0, "maximum": 100},
+        },
+        "required": ["findings", "summary"],
+    },
+}
 
-    model_config = ConfigDict(strict=True, frozen=True)
+# Start of the prose output schema in every prompt_template
+OUTPUT_SCHEMA_HEADING = "Output JSON schema:"
 
-    type: str = Field(..., pattern=r"^canceled$")
 
+def structured_prompt_template(agent: AgentConfig) -> str:
+    """Agent instructions for structured-output mode.
 
-class BatchIndividualResult(BaseModel):
-    """Individual result from batch processing."""
+    The prose JSON schema is replaced by a pointer to the findings tool,
+    naming the optional fields the agent is expected to fill in.
 
-    model_config = ConfigDict(strict=True)
+    Args:
+        agent: Agent configuration
 
-    custom_id: str
-    result: dict[str, Any]  # Can be any of the result types above
+    Returns:
+        Prompt template with the same {files} placeholder
+    """
+    instructions = agent.prompt_template.split(OUTPUT_SCHEMA_HEADING, 1)[0].rstrip()
+    extra = f", including {', '.join(agent.report_fields)}" if agent.report_fields else ""
+    return f"{instructions}\n\nReport all findings with the {FINDINGS_TOOL_NAME} tool{extra}.\n"
 
 
-# ============================================================================
-# Agent Configuration
-# ============================================================================
+def findings_prompt_hash(agent: AgentConfig, structured_output: bool = False) -> str:
+    """Hash of the system prompt, instructions and tool schema sent to an agent.
 
+    Part of the findings cache key, so findings are only reused for
+    requests asking the same thing in the same output mode.
 
-@dataclass
-class AgentConfig:
-    """Configuration for a verification agent."""
+    Args:
+        agent: Agent configuration
+        structured_output: Hash the structured-output request layout
 
-    name: str
-    wave: int
-    prompt_template: str
-    model: str = "claude-sonnet-4-5-20250929"
-    max_tokens: int = 8000
+    Returns:
+        16 hex digit hash
+    """
+    if structured_output:
+        prompt = (
+            VERIFICATION_TOOL_SYSTEM_PROMPT
+            + structured_prompt_template(agent)
+            + json.dumps(FINDINGS_TOOL, sort_keys=True)
+        )
+    else:
+        prompt = VERIFICATION_SYSTEM_PROMPT + agent.prompt_template
+    return hashlib.sha256(prompt.encode()).hexdigest()[:16]
 
 
 # Wave 1: Pattern recognition agents (3 agents, ~7 min)
@@ -211,6 +316,8 @@ WAVE_1_AGENTS = [
         name="best-practices-enforcer",
         wave=1,
         model="claude-sonnet-4-5-20250929",
+        # Reads only the source under review
+        depends_on=(),
         prompt_template="""Verify Python code for modern standards compliance.
 
 Files to verify: {files}
@@ -247,6 +354,9 @@ Output JSON schema:
         name="security-auditor",
         wave=1,
         model="claude-sonnet-4-5-20250929",
+        # Reads only the source under review
+        depends_on=(),
+        report_fields=("cwe",),
         prompt_template="""Audit code for security vulnerabilities.
 
 Files to verify: {files}
@@ -284,6 +394,8 @@ Output JSON schema:
         name="hallucination-detector",
         wave=1,
         model="claude-sonnet-4-5-20250929",
+        # Checks imports and API calls against the source alone
+        depends_on=(),
         prompt_template="""Verify library syntax against official documentation.
 
 Files to verify: {files}
@@ -324,6 +436,9 @@ WAVE_2_AGENTS = [
         name="code-reviewer",
         wave=2,
         model="claude-sonnet-4-5-20250929",
+        # Reviews the source, not wave 1 findings, so it runs alongside wave 1
+        depends_on=(),
+        report_fields=("score",),
         prompt_template="""Review code quality and maintainability.
 
 Files to verify: {files}
@@ -361,6 +476,9 @@ Output JSON schema:
         name="test-generator",
         wave=2,
         model="claude-sonnet-4-5-20250929",
+        # Measures coverage of the source, not of wave 1 findings
+        depends_on=(),
+        report_fields=("coverage",),
         prompt_template="""Analyze test coverage and generate tests.
 
 Files to verify: {files}
@@ -395,330 +513,2261 @@ Output JSON schema:
     ),
 ]
 
+ALL_AGENTS = WAVE_1_AGENTS + WAVE_2_AGENTS
+AGENTS_BY_NAME = {agent.name: agent for agent in ALL_AGENTS}
+
 
 # ============================================================================
-# Batch API Client
+# Serialization Backends
 # ============================================================================
 
 
-class BatchAPIClient:
-    """Client for Anthropic Batch API operations."""
-
-    def __init__(self, api_key: str | None = None) -> None:
-        """Initialize the batch API client.
-
-        Args:
-            api_key: Anthropic API key (defaults to ANTHROPIC_API_KEY env var)
-        """
-        self.api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
-        if not self.api_key:
-            raise ValueError("ANTHROPIC_API_KEY environment variable not set")
+class PydanticSerializer:
+    """Validated model construction with pydantic-core JSON encoding (default)."""
 
-        self.base_url = "https://api.anthropic.com/v1"
-        self.anthropic_version = "2023-06-01"
+    name = "pydantic"
 
-        self.project_root = Path.cwd()
-        self.pending_dir = self.project_root / ".build" / "checkpoints" / "pending"
-        self.reports_dir = self.project_root / ".ignorar" / "production-reports"
-        self.logs_dir = self.project_root / ".build" / "logs" / "agents"
-        self.logs_dir.mkdir(parents=True, exist_ok=True)
+    def build_request(self, custom_id: str, params: dict[str, Any]) -> BatchRequest:
+        """Construct a fully validated batch request.
 
-    async def get_pending_files(self) -> list[str]:
-        """Get list of pending Python files requiring verification.
+        Args:
+            custom_id: Request custom_id
+            params: Keyword arguments for BatchRequestParams
 
         Returns:
-            List of Python file paths marked as pending
+            BatchRequest
         """
-        if not self.pending_dir.exists():
-            return []
-
-        pending_files = []
-        for marker in self.pending_dir.glob("*.pending"):
-            # Extract original file path from marker filename
-            # Format: {hash}.py.pending
-            original_file = marker.stem  # Removes .pending
-            if original_file.endswith(".py"):
-                pending_files.append(str(self.project_root / "src" / original_file))
+        return BatchRequest(custom_id=custom_id, params=BatchRequestParams(**params))
 
-        logger.info("pending_files_detected", count=len(pending_files))
-        return pending_files
+    def encode_request(self, request: BatchRequest) -> bytes:
+        """Serialize one request for the batch payload."""
+        return request.model_dump_json(exclude_none=True).encode()
 
-    async def create_batch(
-        self,
-        agents: Sequence[AgentConfig],
-        pending_files: list[str],
-    ) -> BatchStatus:
-        """Create a message batch for verification agents.
+    def decode_result(self, line: str | bytes) -> BatchIndividualResult:
+        """Parse and validate one results JSONL line."""
+        return BatchIndividualResult.model_validate_json(line)
 
-        Args:
-            agents: List of agent configurations to run
-            pending_files: List of pending files to verify
 
-        Returns:
-            BatchStatus with batch ID and initial status
-        """
-        files_str = "\n".join(f"- {f}" for f in pending_files)
+class OrjsonSerializer(PydanticSerializer):
+    """orjson payload encoding of validated requests. Requires orjson.
 
-        # Build batch requests
-        requests = []
-        for agent in agents:
-            prompt = agent.prompt_template.format(files=files_str)
-            request = BatchRequest(
-                custom_id=f"{agent.name}-{uuid.uuid4().hex[:8]}",
-                params=BatchRequestParams(
-                    model=agent.model,
-                    max_tokens=agent.max_tokens,
-                    messages=[
-                        MessageRequest(
-                            role="user",
-                            content=prompt,
-                        )
-                    ],
-                ),
-            )
-            requests.append(request)
+    Requests are built and results decoded exactly as by
+    PydanticSerializer, so every request and result is still validated;
+    only encoding the batch payload skips pydantic dumping.
+    """
 
-        batch_request = BatchCreateRequest(requests=requests)
+    name = "orjson"
+
+    @staticmethod
+    def _content(content: str | list[TextBlock]) -> str | list[dict[str, Any]]:
+        if isinstance(content, str):
+            return content
+        blocks = []
+        for block in content:
+            data: dict[str, Any] = {"type": block.type, "text": block.text}
+            if block.cache_control is not None:
+                data["cache_control"] = {"type": block.cache_control.type}
+            blocks.append(data)
+        return blocks
+
+    def encode_request(self, request: BatchRequest) -> bytes:
+        """Serialize one request with orjson, skipping pydantic dumping."""
+        params = request.params
+        body: dict[str, Any] = {
+            "model": params.model,
+            "max_tokens": params.max_tokens,
+            "messages": [
+                {"role": m.role, "content": self._content(m.content)}
+                for m in params.messages
+            ],
+            "temperature": params.temperature,
+        }
+        if params.system is not None:
+            body["system"] = self._content(params.system)
+        if params.tools is not None:
+            body["tools"] = params.tools
+        if params.tool_choice is not None:
+            body["tool_choice"] = params.tool_choice
+        return orjson.dumps({"custom_id": request.custom_id, "params": body})
 
-        # Submit batch
-        async with httpx.AsyncClient(timeout=httpx.Timeout(30.0)) as client:
-            response = await client.post(
-                f"{self.base_url}/messages/batches",
-                headers={
-                    "x-api-key": self.api_key,
-                    "anthropic-version": self.anthropic_version,
-                    "content-type": "application/json",
-                },
-                json=batch_request.model_dump(),
-            )
-            response.raise_for_status()
 
-            data = response.json()
-            batch_status = BatchStatus(**data)
+SERIALIZERS: dict[str, type[PydanticSerializer]] = {
+    PydanticSerializer.name: PydanticSerializer,
+    OrjsonSerializer.name: OrjsonSerializer,
+}
 
-            logger.info(
-                "batch_created",
-                batch_id=batch_status.id,
-                agent_count=len(requests),
-                status=batch_status.processing_status,
-            )
 
-            return batch_status
+def get_serializer(name: str) -> PydanticSerializer:
+    """Instantiate a serialization backend by name.
 
-    async def poll_batch(
-        self,
-        batch_id: str,
-        poll_interval: int = 60,
-        max_wait_seconds: int = 3600,
-    ) -> BatchStatus:
-        """Poll batch status until processing completes.
+    Args:
+        name: "pydantic" or "orjson"
 
-        Args:
-            batch_id: Batch ID to poll
-            poll_interval: Seconds between polls (default: 60)
-            max_wait_seconds: Maximum seconds to wait (default: 3600 = 1 hour)
+    Returns:
+        Serializer instance (pydantic if orjson is requested but missing)
+    """
+    if name not in SERIALIZERS:
+        raise ValueError(f"serializer must be one of {sorted(SERIALIZERS)}")
+    if name == OrjsonSerializer.name and orjson is None:
+        logger.warning("orjson_unavailable", fallback=PydanticSerializer.name)
+        name = PydanticSerializer.name
+    return SERIALIZERS[name]()
 
-        Returns:
-            Final BatchStatus
 
-        Raises:
-            TimeoutError: If max_wait_seconds exceeded
-        """
-        start_time = time.time()
-        poll_count = 0
+# ============================================================================
+# Adaptive Polling
+# ============================================================================
 
-        async with httpx.AsyncClient(timeout=httpx.Timeout(30.0)) as client:
-            while True:
-                elapsed = time.time() - start_time
-                if elapsed > max_wait_seconds:
-                    raise TimeoutError(
-                        f"Batch {batch_id} did not complete within {max_wait_seconds}s"
-                    )
+# Poll interval bounds for the adaptive poller (seconds)
+MIN_POLL_INTERVAL = 10.0
+MAX_POLL_INTERVAL = 300.0
+# Fraction of the estimated remaining time to wait before the next poll;
+# the interval shrinks as the predicted completion approaches
+ETA_POLL_FRACTION = 0.5
+# Number of recent batch durations used as the historical prior
+POLL_HISTORY_WINDOW = 50
 
-                response = await client.get(
-                    f"{self.base_url}/messages/batches/{batch_id}",
-                    headers={
-                        "x-api-key": self.api_key,
-                        "anthropic-version": self.anthropic_version,
-                    },
-                )
-                response.raise_for_status()
 
-                data = response.json()
-                batch_status = BatchStatus(**data)
+def parse_api_timestamp(value: str) -> datetime:
+    """Parse an RFC 3339 timestamp returned by the API.
 
-                poll_count += 1
-                logger.info(
-                    "batch_polled",
-                    batch_id=batch_id,
-                    poll_count=poll_count,
-                    status=batch_status.processing_status,
-                    elapsed_seconds=int(elapsed),
-                    request_counts=batch_status.request_counts.model_dump(),
-                )
+    Args:
+        value: Timestamp such as "2026-02-08T12:00:00Z"
 
-                if batch_status.processing_status == "ended":
-                    logger.info(
-                        "batch_completed",
-                        batch_id=batch_id,
-                        total_polls=poll_count,
-                        total_seconds=int(elapsed),
-                    )
-                    return batch_status
+    Returns:
+        Timezone-aware datetime
+    """
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
 
-                # Exponential backoff with jitter
-                backoff = min(poll_interval * (1.5**poll_count), 300)  # Max 5 min
-                jitter = backoff * 0.1
-                await asyncio.sleep(backoff + jitter)
 
-    async def download_results(
-        self,
-        batch_id: str,
-    ) -> list[BatchIndividualResult]:
-        """Download batch results from results_url.
+@dataclass
+class BatchProgress:
+    """Progress observations for one batch under the adaptive poller."""
+
+    batch_id: str
+    created_at: datetime | None = None
+    total: int = 0
+    samples: list[tuple[float, int]] = field(default_factory=list)
+    next_poll_at: float = 0.0
+    poll_count: int = 0
+
+    def observe(self, status: BatchStatus, now: float) -> None:
+        """Record the completed-request count from a status response."""
+        counts = status.request_counts
+        done = counts.succeeded + counts.errored + counts.canceled + counts.expired
+        self.total = done + counts.processing
+        self.created_at = parse_api_timestamp(status.created_at)
+        self.samples.append((now, done))
+        self.poll_count += 1
+
+    def eta_seconds(self, historical_seconds: float | None) -> float | None:
+        """Estimate seconds until this batch ends.
+
+        Uses the observed completion rate once progress has been seen, and
+        otherwise falls back to the historical median duration minus the
+        batch's age.
 
         Args:
-            batch_id: Batch ID to download results for
+            historical_seconds: Median duration of past batches, if known
 
         Returns:
-            List of individual batch results
+            Estimated remaining seconds, or None if nothing is known
         """
-        # First get batch status to retrieve results_url
-        async with httpx.AsyncClient(timeout=httpx.Timeout(30.0)) as client:
-            response = await client.get(
-                f"{self.base_url}/messages/batches/{batch_id}",
-                headers={
-                    "x-api-key": self.api_key,
-                    "anthropic-version": self.anthropic_version,
-                },
-            )
-            response.raise_for_status()
-
-            batch_status = BatchStatus(**response.json())
+        if len(self.samples) >= 2:
+            (t_first, done_first), (t_last, done_last) = self.samples[0], self.samples[-1]
+            if done_last > done_first and t_last > t_first:
+                rate = (done_last - done_first) / (t_last - t_first)
+                return (self.total - done_last) / rate
 
-            if not batch_status.results_url:
-                raise ValueError(f"Batch {batch_id} has no results_url yet")
+        if historical_seconds is not None and self.created_at is not None:
+            age = (datetime.now(tz=timezone.utc) - self.created_at).total_seconds()
+            return max(historical_seconds - age, 0.0)
 
-            # Download results (JSONL format)
-            results_response = await client.get(
-                batch_status.results_url,
-                headers={
-                    "x-api-key": self.api_key,
-                    "anthropic-version": self.anthropic_version,
-                },
-            )
-            results_response.raise_for_status()
+        return None
 
-            # Parse JSONL
-            results = []
-            for line in results_response.text.strip().split("\n"):
-                if line:
-                    result_data = json.loads(line)
-                    results.append(BatchIndividualResult(**result_data))
 
-            logger.info(
-                "batch_results_downloaded",
-                batch_id=batch_id,
-                result_count=len(results),
-            )
+# ============================================================================
+# Findings Extraction
+# ============================================================================
 
-            return results
 
-    def parse_agent_findings(
-        self,
-        result: BatchIndividualResult,
-    ) -> dict[str, Any]:
-        """Parse agent findings from batch result.
+def find_agent_findings(value: Any) -> dict[str, Any] | None:
+    """Return the first object in a decoded JSON value matching AgentFindings.
 
-        Args:
-            result: Individual batch result
+    The value itself is checked first, then nested objects breadth-first,
+    so a findings object wrapped as e.g. {"result": {...}} is still found.
 
-        Returns:
-            Parsed findings dictionary
-        """
-        result_type = result.result.get("type")
+    Args:
+        value: Decoded JSON value
 
-        if result_type == "succeeded":
-            message = result.result.get("message", {})
-            content = message.get("content", [])
+    Returns:
+        Matching object, or None
+    """
+    queue = [value]
+    while queue:
+        candidate = queue.pop(0)
+        if isinstance(candidate, dict):
+            try:
+                AgentFindings.model_validate(candidate)
+            except ValidationError:
+                queue.extend(candidate.values())
+            else:
+                return candidate
+        elif isinstance(candidate, list):
+            queue.extend(candidate)
+    return None
 
-            # Extract text from content blocks
-            text_content = ""
-            for block in content:
-                if block.get("type") == "text":
-                    text_content += block.get("text", "")
 
-            # Attempt to parse JSON from response
-            try:
-                findings = json.loads(text_content)
-                return {
-                    "status": "PASS",
-                    "findings": findings.get("findings", []),
-                    "summary": findings.get("summary", {}),
-                    "score": findings.get("score"),
-                    "coverage": findings.get("coverage"),
-                }
-            except json.JSONDecodeError:
-                logger.warning(
-                    "failed_to_parse_agent_response",
-                    custom_id=result.custom_id,
-                    content_preview=text_content[:200],
-                )
-                return {
-                    "status": "FAIL",
-                    "error": "Failed to parse agent response as JSON",
-                }
+def extract_findings_json(text: str) -> tuple[dict[str, Any] | None, str]:
+    """Locate and decode the findings object in an agent's text response.
 
-        elif result_type == "errored":
-            error = result.result.get("error", {})
-            return {
-                "status": "FAIL",
-                "error": error.get("message", "Unknown error"),
-                "error_type": error.get("type"),
-            }
+    Agents are asked for bare JSON but sometimes wrap it in a markdown
+    fence or add a preamble or closing sentence. The whole text is tried
+    first; otherwise the text is scanned left to right, decoding one JSON
+    value at each "{" with JSONDecoder.raw_decode and skipping past every
+    value that decodes without matching.
 
-        elif result_type in ("expired", "canceled"):
-            return {
-                "status": "FAIL",
-                "error": f"Request {result_type}",
-            }
+    Args:
+        text: Concatenated text blocks of the response
 
+    Returns:
+        (findings object or None, method) where method is "json" (whole
+        text), "fenced" (inside a ``` block), "embedded" (JSON surrounded
+        by prose) or "failed"; parse_agent_findings adds "tool" for
+        structured-output responses
+    """
+    try:
+        found = find_agent_findings(json.loads(text))
+    except json.JSONDecodeError:
+        found = None
+    if found is not None:
+        return found, "json"
+
+    decoder = json.JSONDecoder()
+    start = text.find("{")
+    while start != -1:
+        try:
+            value, end = decoder.raw_decode(text, start)
+        except json.JSONDecodeError:
+            # Not JSON here (or truncated); an inner "{" may still be
+            end = start + 1
         else:
-            return {
-                "status": "FAIL",
-                "error": f"Unknown result type: {result_type}",
-            }
+            found = find_agent_findings(value)
+            if found is not None:
+                fenced = text.count("```", 0, start) % 2 == 1
+                return found, "fenced" if fenced else "embedded"
+        start = text.find("{", end)
+    return None, "failed"
 
-    def generate_report(
-        self,
-        batch_id: str,
-        agents: Sequence[AgentConfig],
-        results: list[BatchIndividualResult],
-        total_cost: float,
-        sync_cost: float,
-    ) -> Path:
-        """Generate detailed report for batch verification.
 
-        Args:
-            batch_id: Batch ID
-            agents: List of agents used
-            results: List of batch results
-            total_cost: Total batch cost
-            sync_cost: Estimated synchronous cost
+# ============================================================================
+# Failed Request Resubmission
+# ============================================================================
 
-        Returns:
-            Path to generated report
+# Result types worth resubmitting in a follow-up batch
+RESUBMIT_RESULT_TYPES = frozenset({"errored", "expired", "canceled"})
+# Errors that would fail again unchanged
+NON_RETRYABLE_ERROR_TYPES = frozenset(
+    {"invalid_request_error", "authentication_error", "permission_error"}
+)
+# Follow-up batches per failed request
+RESUBMIT_MAX_ATTEMPTS = 2
+RESUBMIT_BACKOFF_SECONDS = 30.0
+# Delta batches supersede_stale submits per group; files that keep changing
+# after that are reported as stale instead of being resubmitted again
+SUPERSEDE_MAX_ROUNDS = 3
+
+
+def is_resubmittable(result: BatchIndividualResult) -> bool:
+    """Whether a failed result should be resubmitted in a follow-up batch.
+
+    Args:
+        result: Individual batch result
+
+    Returns:
+        True for expired/canceled results and transient errors
+    """
+    result_type = result.result.get("type")
+    if result_type not in RESUBMIT_RESULT_TYPES:
+        return False
+    if result_type != "errored":
+        return True
+
+    # Batch errors wrap the API error object: {"type": "error", "error": {...}}
+    error = result.result.get("error") or {}
+    error_type = (error.get("error") or {}).get("type") or error.get("type")
+    return error_type not in NON_RETRYABLE_ERROR_TYPES
+
+
+# ============================================================================
+# Output Token Budgets
+# ============================================================================
+
+
+# max_tokens is set to a high percentile of an agent's recent output sizes
+# (from the cost ledger) times a margin, instead of the configured worst
+# case, so each request reserves less output rate limit
+OUTPUT_BUDGET_PERCENTILE = 95
+OUTPUT_BUDGET_MARGIN = 1.25
+OUTPUT_BUDGET_MIN_SAMPLES = 20
+OUTPUT_BUDGET_WINDOW = 200
+OUTPUT_BUDGET_FLOOR = 1024
+OUTPUT_BUDGET_STEP = 256
+# A truncated response is retried with its output size times this
+TRUNCATION_BUDGET_GROWTH = 2
+
+
+def output_token_budget(samples: Sequence[int], ceiling: int) -> int:
+    """max_tokens for an agent from its recent output token counts.
+
+    Args:
+        samples: Output tokens of recent results
+        ceiling: Configured max_tokens, also used without enough history
+
+    Returns:
+        Budget rounded up to OUTPUT_BUDGET_STEP, within [floor, ceiling]
+    """
+    if len(samples) < OUTPUT_BUDGET_MIN_SAMPLES:
+        return ceiling
+    high = statistics.quantiles(samples, n=100, method="inclusive")[OUTPUT_BUDGET_PERCENTILE - 1]
+    budget = math.ceil(high * OUTPUT_BUDGET_MARGIN / OUTPUT_BUDGET_STEP) * OUTPUT_BUDGET_STEP
+    return min(max(budget, OUTPUT_BUDGET_FLOOR), ceiling)
+
+
+def truncated_retry_budget(result: BatchIndividualResult) -> int | None:
+    """Larger max_tokens for a response cut off by its output budget.
+
+    Args:
+        result: Batch or synchronous result
+
+    Returns:
+        New budget, or None if the response was not truncated or the
+        budget cannot grow past MAX_OUTPUT_TOKENS
+    """
+    if result.result.get("type") != "succeeded":
+        return None
+    message = result.result.get("message") or {}
+    if message.get("stop_reason") != "max_tokens":
+        return None
+    used = extract_usage(message)["output_tokens"]
+    budget = min(used * TRUNCATION_BUDGET_GROWTH, MAX_OUTPUT_TOKENS)
+    return budget if budget > used else None
+
+
+# ============================================================================
+# Latency-Aware Dispatch
+# ============================================================================
+
+# Assumed batch turnaround when no poll history exists (the batch API
+# only guarantees completion within 24h; most batches end within an hour)
+ASSUMED_BATCH_LATENCY_SECONDS = 3600
+# Upper bound for a single synchronous Messages call
+SYNC_REQUEST_TIMEOUT_SECONDS = 600.0
+SYNC_MAX_CONCURRENCY = 5
+
+
+def plan_dispatch(
+    agents: Sequence[AgentConfig],
+    urgent_agents: Collection[str],
+    deadline_seconds: float | None,
+    historical_batch_seconds: float | None,
+) -> tuple[list[AgentConfig], list[AgentConfig]]:
+    """Split agents between synchronous calls and the batch API.
+
+    Urgent agents always run synchronously. Every other agent goes to the
+    batch API unless the expected batch turnaround (median of past
+    batches, or ASSUMED_BATCH_LATENCY_SECONDS without history) would
+    miss the deadline.
+
+    Args:
+        agents: Agents to run
+        urgent_agents: Agent names that must run synchronously
+        deadline_seconds: Seconds left in the verification cycle (None = no deadline)
+        historical_batch_seconds: Median duration of past batches, if known
+
+    Returns:
+        (synchronous agents, batch agents)
+    """
+    expected = (
+        historical_batch_seconds
+        if historical_batch_seconds is not None
+        else ASSUMED_BATCH_LATENCY_SECONDS
+    )
+    batch_too_slow = deadline_seconds is not None and expected > deadline_seconds
+
+    sync = [a for a in agents if a.name in urgent_agents or batch_too_slow]
+    batch = [a for a in agents if a not in sync]
+
+    logger.info(
+        "dispatch_planned",
+        sync_agents=[a.name for a in sync],
+        batch_agents=[a.name for a in batch],
+        deadline_seconds=deadline_seconds,
+        expected_batch_seconds=round(expected, 1),
+    )
+    return sync, batch
+
+
+@dataclass
+class SyncRun:
+    """Results of agents run through the synchronous Messages API."""
+
+    results: list[BatchIndividualResult] = field(default_factory=list)
+    files_by_custom_id: dict[str, list[str]] = field(default_factory=dict)
+    file_hashes: dict[str, str | None] = field(default_factory=dict)
+    cache_hits: list[tuple[str, str, list[dict[str, Any]]]] = field(default_factory=list)
+
+
+# ============================================================================
+# Batch API Client
+# ============================================================================
+
+
+async def aiter_jsonl_lines(response: httpx.Response) -> AsyncIterator[str]:
+    """Yield the lines of a streamed JSONL body, split on "\\n" only.
+
+    Response.aiter_lines() also splits on U+2028, U+0085 and the other
+    str.splitlines() separators, which JSON strings may contain raw.
+
+    Args:
+        response: Open streaming response
+
+    Yields:
+        Lines without their newline, as they complete
+    """
+    buffer = ""
+    async for chunk in response.aiter_text():
+        buffer += chunk
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line
+    if buffer:
+        yield buffer
+
+
+class BatchAPIClient:
+    """Client for Anthropic Batch API operations.
+
+    Owns one long-lived ``httpx.AsyncClient`` so that create, poll and
+    download calls reuse the same pooled (HTTP/2 when available) connection
+    instead of paying a TLS handshake per call. Use as an async context
+    manager to bound the connection lifetime:
+
+        async with BatchAPIClient() as client:
+            batch = await client.create_batch(agents, files)
+            await client.poll_batch(batch.id)
+    """
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        http_config: HTTPClientConfig | None = None,
+        serializer: str = "pydantic",
+        transport: httpx.AsyncBaseTransport | None = None,
+        structured_output: bool = False,
+        adaptive_max_tokens: bool = True,
+        metrics_path: Path | None = None,
+    ) -> None:
+        """Initialize the batch API client.
+
+        Args:
+            api_key: Anthropic API key (defaults to ANTHROPIC_API_KEY env var)
+            http_config: Connection pool settings (defaults to HTTPClientConfig())
+            serializer: Request/result serialization backend ("pydantic" or "orjson")
+            transport: Transport override, e.g. ReplayTransport or
+                SyntheticTransport for offline runs (default: live network)
+            structured_output: Force findings through FINDINGS_TOOL instead
+                of asking for free-text JSON
+            adaptive_max_tokens: Size max_tokens from logged output usage
+                (False = always the agent's configured max_tokens)
+            metrics_path: Where to dump per-request HTTP metrics on close
+                (``.prom`` = Prometheus text, otherwise JSON; None = log only)
+        """
+        self.transport = transport
+        self.offline = isinstance(transport, ReplayTransport | SyntheticTransport)
+        self.api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
+        if not self.api_key:
+            if not self.offline:
+                raise ValueError("ANTHROPIC_API_KEY environment variable not set")
+            self.api_key = "offline"
+
+        self.base_url = "https://api.anthropic.com/v1"
+        self.anthropic_version = "2023-06-01"
+        self.http_config = http_config or HTTPClientConfig()
+        self.serializer = get_serializer(serializer)
+        self.structured_output = structured_output
+        self.adaptive_max_tokens = adaptive_max_tokens
+        self.metrics = RequestMetrics()
+        self.metrics_path = metrics_path
+        self._http: httpx.AsyncClient | None = None
+        # Findings extraction method per parsed response (see extract_findings_json)
+        self.parse_stats: Counter[str] = Counter()
+        # Delta batches submitted by supersede_stale, per group
+        self.supersede_rounds: Counter[str] = Counter()
+        # Batches supersede_stale canceled; their other canceled requests are
+        # recovered by resubmit_canceled without using the retry budget
+        self.superseded_batches: set[str] = set()
+
+        self.project_root = Path.cwd()
+        self.pending_dir = self.project_root / ".build" / "checkpoints" / "pending"
+        # Replayed and synthetic results must never reach the real registry,
+        # findings cache, cost ledger, poll history or reports
+        self.state_dir = state_dir(self.project_root, self.offline)
+        if self.offline:
+            self.reports_dir = self.state_dir / "production-reports"
+        else:
+            self.reports_dir = self.project_root / ".ignorar" / "production-reports"
+        self.logs_dir = self.state_dir / "logs" / "agents"
+        self.logs_dir.mkdir(parents=True, exist_ok=True)
+        self.registry = BatchRegistry(self.state_dir / "batch-registry.sqlite3")
+        self.findings_cache = FindingsCache(self.state_dir / "findings-cache.sqlite3")
+        self.poll_history_path = self.state_dir / "logs" / "batch-poll-history.jsonl"
+        self.cost_ledger_path = self.state_dir / "logs" / "batch-cost-ledger.jsonl"
+        self.results_archive = ResultsArchive(self.state_dir / "results-archive")
+
+    async def __aenter__(self) -> BatchAPIClient:
+        """Open the shared HTTP client."""
+        _ = self.http
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        """Close the shared HTTP client."""
+        await self.aclose()
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """Shared HTTP client, created on first use.
+
+        Returns:
+            The pooled AsyncClient used for every Batch API call
+        """
+        if self._http is None or self._http.is_closed:
+            config = self.http_config
+            transport = self.transport or live_transport(config)
+
+            self._http = httpx.AsyncClient(
+                transport=InstrumentedTransport(transport, self.metrics),
+                timeout=httpx.Timeout(
+                    config.timeout_seconds,
+                    connect=config.connect_timeout_seconds,
+                ),
+                headers={
+                    "x-api-key": self.api_key,
+                    "anthropic-version": self.anthropic_version,
+                },
+            )
+            logger.info(
+                "http_client_opened",
+                transport=type(transport).__name__,
+                http2=config.http2,
+                max_connections=config.max_connections,
+                keepalive_expiry_seconds=config.keepalive_expiry_seconds,
+            )
+        return self._http
+
+    async def aclose(self) -> None:
+        """Close the shared HTTP client if it is open, and the registry."""
+        if self._http is not None and not self._http.is_closed:
+            await self._http.aclose()
+            logger.info("http_client_closed")
+        self._http = None
+        if self.parse_stats:
+            logger.info("response_parse_stats", **self.parse_stats)
+        if self.metrics.samples:
+            logger.info(
+                "http_request_metrics",
+                endpoints={
+                    endpoint: {
+                        "requests": entry["requests"],
+                        **entry["duration_seconds"],
+                    }
+                    for endpoint, entry in self.metrics.summary().items()
+                },
+            )
+            if self.metrics_path is not None:
+                self.metrics.write(self.metrics_path)
+        self.registry.close()
+        self.findings_cache.close()
+        self.results_archive.close()
+
+    async def request_with_retry(
+        self,
+        method: str,
+        url: str,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """Send a request, retrying 429/5xx responses and transport errors.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            **kwargs: Passed to httpx.AsyncClient.request()
+
+        Returns:
+            Successful response
+
+        Raises:
+            httpx.HTTPStatusError: On a non-retryable status or after the last retry
+            httpx.TransportError: If the last retry fails to connect or read
+        """
+        max_retries = self.http_config.max_retries
+        for attempt in range(max_retries + 1):
+            try:
+                response = await self.http.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                if attempt >= max_retries:
+                    raise
+                delay = retry_delay(attempt)
+                logger.warning(
+                    "http_retry", method=method, url=url, error=str(e),
+                    attempt=attempt + 1, delay_seconds=round(delay, 2),
+                )
+                await asyncio.sleep(delay)
+                continue
+
+            if response.status_code in RETRYABLE_STATUS_CODES and attempt < max_retries:
+                delay = retry_delay(attempt, response)
+                logger.warning(
+                    "http_retry", method=method, url=url, status_code=response.status_code,
+                    attempt=attempt + 1, delay_seconds=round(delay, 2),
+                )
+                await asyncio.sleep(delay)
+                continue
+
+            response.raise_for_status()
+            return response
+
+        raise AssertionError("unreachable")
+
+    async def get_pending_files(self) -> list[str]:
+        """Get list of pending Python files requiring verification.
+
+        Returns:
+            List of Python file paths marked as pending
+        """
+        if not self.pending_dir.exists():
+            return []
+
+        pending_files = []
+        for marker in self.pending_dir.glob("*.pending"):
+            # Extract original file path from marker filename
+            # Format: {hash}.py.pending
+            original_file = marker.stem  # Removes .pending
+            if original_file.endswith(".py"):
+                pending_files.append(str(self.project_root / "src" / original_file))
+
+        logger.info("pending_files_detected", count=len(pending_files))
+        return pending_files
+
+    def estimate_file_tokens(self, file_path: str) -> int:
+        """Estimate the token size of a file.
+
+        Simple heuristic: ~4 characters (bytes) per token.
+
+        Args:
+            file_path: Path of the file to estimate
+
+        Returns:
+            Estimated token count (0 if the file cannot be read)
+        """
+        try:
+            return Path(file_path).stat().st_size // 4
+        except OSError:
+            logger.warning("file_size_unavailable", file=file_path)
+            return 0
+
+    def pack_files(
+        self,
+        pending_files: list[str],
+        context_budget_tokens: int,
+    ) -> list[list[str]]:
+        """Bin-pack files into balanced shards under a token budget.
+
+        Uses the minimum shard count the total size allows, then places
+        files largest-first into the least-loaded shard that still has
+        room, opening a new shard only when none does. A file larger than
+        the budget gets a shard of its own.
+
+        Args:
+            pending_files: Files to pack
+            context_budget_tokens: Maximum estimated tokens per shard
+
+        Returns:
+            List of file shards (each non-empty), in stable order
+        """
+        if context_budget_tokens < 1:
+            raise ValueError("context_budget_tokens must be positive")
+        if not pending_files:
+            return []
+
+        sizes = {f: self.estimate_file_tokens(f) for f in pending_files}
+        total = sum(sizes.values())
+        shard_count = max(1, -(-total // context_budget_tokens))
+
+        shards: list[list[str]] = [[] for _ in range(shard_count)]
+        loads = [0] * shard_count
+
+        for file_path in sorted(pending_files, key=lambda f: sizes[f], reverse=True):
+            size = sizes[file_path]
+            candidates = [
+                i for i, load in enumerate(loads) if load + size <= context_budget_tokens
+            ]
+            if candidates:
+                target = min(candidates, key=lambda i: loads[i])
+            elif not shards[-1]:
+                target = len(shards) - 1
+            else:
+                shards.append([])
+                loads.append(0)
+                target = len(shards) - 1
+            shards[target].append(file_path)
+            loads[target] += size
+
+        packed = [shard for shard in shards if shard]
+        logger.info(
+            "files_packed",
+            file_count=len(pending_files),
+            shard_count=len(packed),
+            budget_tokens=context_budget_tokens,
+            shard_tokens=[loads[i] for i, shard in enumerate(shards) if shard],
+        )
+        return packed
+
+    def plan_file_shards(
+        self,
+        pending_files: list[str],
+        context_budget_tokens: int | None = None,
+    ) -> list[list[str]]:
+        """Split pending files into the shards each agent will be asked about.
+
+        Args:
+            pending_files: List of pending files to verify
+            context_budget_tokens: Per-request file token budget (None = no packing)
+
+        Returns:
+            List of file shards (a single shard without a budget)
+        """
+        if context_budget_tokens is None:
+            return [pending_files]
+        return self.pack_files(pending_files, context_budget_tokens)
+
+    def file_content_block(self, files: Sequence[str]) -> TextBlock:
+        """Build the cacheable block holding the source of the given files.
+
+        Args:
+            files: Files to include, in order
+
+        Returns:
+            TextBlock ending a prompt-cache breakpoint
+        """
+        parts = []
+        for file_path in files:
+            try:
+                source = Path(file_path).read_text()
+            except (OSError, UnicodeDecodeError) as e:
+                logger.warning("file_unreadable", file=file_path, error=str(e))
+                source = "<unreadable>"
+            parts.append(f'<file path="{file_path}">\n{source}\n</file>')
+
+        return TextBlock(text="\n\n".join(parts), cache_control=CacheControl())
+
+    def load_output_token_history(self) -> dict[str, list[int]]:
+        """Recent output token counts per agent from the cost ledger.
+
+        Returns:
+            Agent name to its last OUTPUT_BUDGET_WINDOW output token counts
+        """
+        if not self.cost_ledger_path.exists():
+            return {}
+
+        history: dict[str, list[int]] = {}
+        for line in self.cost_ledger_path.read_text().splitlines():
+            try:
+                entry = json.loads(line)
+                output_tokens = int(entry["output_tokens"])
+                agent_name = entry["agent"]
+            except (ValueError, KeyError, TypeError):
+                continue
+            if output_tokens > 0:
+                history.setdefault(agent_name, []).append(output_tokens)
+        return {name: counts[-OUTPUT_BUDGET_WINDOW:] for name, counts in history.items()}
+
+    def output_budgets(self, agents: Sequence[AgentConfig]) -> dict[str, int]:
+        """max_tokens to request per agent.
+
+        Args:
+            agents: Agents about to be built
+
+        Returns:
+            Agent name to max_tokens (the configured value unless
+            adaptive_max_tokens and enough history)
+        """
+        if not self.adaptive_max_tokens:
+            return {agent.name: agent.max_tokens for agent in agents}
+
+        history = self.load_output_token_history()
+        budgets = {}
+        for agent in agents:
+            samples = history.get(agent.name, [])
+            budgets[agent.name] = output_token_budget(samples, agent.max_tokens)
+            if budgets[agent.name] != agent.max_tokens:
+                logger.info(
+                    "output_budget_adapted",
+                    agent=agent.name,
+                    max_tokens=budgets[agent.name],
+                    configured=agent.max_tokens,
+                    samples=len(samples),
+                )
+        return budgets
+
+    def build_requests(
+        self,
+        agents: Sequence[AgentConfig],
+        file_shards_by_agent: dict[str, list[list[str]]],
+        prompt_caching: bool = True,
+        max_tokens: int | None = None,
+    ) -> list[BatchRequest]:
+        """Build batch requests for the planned file shards.
+
+        Each agent gets one request per shard; with more than one shard
+        the custom_id is tagged ``-shardNNN``. Agents with no shards (all
+        files served from the cache) get no request.
+
+        With prompt caching, every request starts with the same static
+        system prompt followed by a file-content block, each marked as a
+        cache breakpoint, and only the agent instructions follow in the
+        user message. Agents verifying the same shard therefore share one
+        cached prefix. Without it, the instructions and file list are sent
+        as a single user message.
+
+        In structured-output mode every request also carries FINDINGS_TOOL
+        with a forced tool_choice, and the prose output schema is dropped
+        from the instructions.
+
+        Args:
+            agents: List of agent configurations to run
+            file_shards_by_agent: File shards from plan_file_shards(), per agent name
+            prompt_caching: Use the cache-friendly layout (default: True)
+            max_tokens: Output budget for every request (default: output_budgets())
+
+        Returns:
+            List of batch requests
+        """
+        system_prompt = (
+            VERIFICATION_TOOL_SYSTEM_PROMPT if self.structured_output else VERIFICATION_SYSTEM_PROMPT
+        )
+        system_block = TextBlock(text=system_prompt, cache_control=CacheControl())
+        budgets = self.output_budgets(agents) if max_tokens is None else {}
+        tool_params: dict[str, Any] = {}
+        if self.structured_output:
+            tool_params = {
+                "tools": [FINDINGS_TOOL],
+                "tool_choice": {"type": "tool", "name": FINDINGS_TOOL_NAME},
+            }
+        # One content block per distinct shard, shared by every agent
+        content_blocks: dict[tuple[str, ...], TextBlock] = {}
+
+        requests = []
+        for agent in agents:
+            file_shards = file_shards_by_agent.get(agent.name, [])
+            sharded = len(file_shards) > 1
+            for shard_index, shard_files in enumerate(file_shards):
+                files_str = "\n".join(f"- {f}" for f in shard_files)
+                template = (
+                    structured_prompt_template(agent)
+                    if self.structured_output
+                    else agent.prompt_template
+                )
+                prompt = template.format(files=files_str)
+
+                system: list[TextBlock] | None = None
+                if prompt_caching:
+                    key = tuple(shard_files)
+                    if key not in content_blocks:
+                        content_blocks[key] = self.file_content_block(shard_files)
+                    system = [system_block, content_blocks[key]]
+
+                request = self.serializer.build_request(
+                    make_custom_id(agent.name, shard_index if sharded else None),
+                    {
+                        "model": agent.model,
+                        "max_tokens": max_tokens or budgets[agent.name],
+                        "messages": [
+                            MessageRequest(
+                                role="user",
+                                content=prompt,
+                            )
+                        ],
+                        "system": system,
+                        **tool_params,
+                    },
+                )
+                requests.append(request)
+
+        return requests
+
+    def shard_requests(
+        self,
+        requests: list[BatchRequest],
+        max_requests: int = MAX_REQUESTS_PER_BATCH,
+        max_payload_bytes: int = MAX_BATCH_PAYLOAD_BYTES,
+    ) -> list[list[tuple[BatchRequest, bytes]]]:
+        """Encode requests and split them into shards that each fit one batch.
+
+        Each request is serialized exactly once; the encoded bytes are both
+        measured here and sent by submit_batch(). Requests are packed
+        greedily in order; a new shard starts whenever adding the next
+        request would exceed either the request-count or the serialized
+        payload-size limit.
+
+        Args:
+            requests: Requests to split
+            max_requests: Maximum requests per batch
+            max_payload_bytes: Maximum serialized payload bytes per batch
+
+        Returns:
+            List of shards (each non-empty) of (request, encoded request) pairs
+
+        Raises:
+            ValueError: If a single request exceeds max_payload_bytes
+        """
+        envelope_bytes = len(b'{"requests":[]}')
+        shards: list[list[tuple[BatchRequest, bytes]]] = []
+        current: list[tuple[BatchRequest, bytes]] = []
+        current_bytes = envelope_bytes
+
+        for request in requests:
+            encoded = self.serializer.encode_request(request)
+            # +1 for the separating comma
+            request_bytes = len(encoded) + 1
+            if request_bytes + envelope_bytes > max_payload_bytes:
+                raise ValueError(
+                    f"Request {request.custom_id} is {request_bytes} bytes, "
+                    f"over the {max_payload_bytes} byte batch limit"
+                )
+
+            if current and (
+                len(current) >= max_requests
+                or current_bytes + request_bytes > max_payload_bytes
+            ):
+                shards.append(current)
+                current = []
+                current_bytes = envelope_bytes
+
+            current.append((request, encoded))
+            current_bytes += request_bytes
+
+        if current:
+            shards.append(current)
+
+        return shards
+
+    async def submit_batch(self, shard: list[tuple[BatchRequest, bytes]]) -> BatchStatus:
+        """Submit a single message batch.
+
+        Args:
+            shard: (request, encoded request) pairs from shard_requests()
+
+        Returns:
+            BatchStatus with batch ID and initial status
+        """
+        if not 1 <= len(shard) <= MAX_REQUESTS_PER_BATCH:
+            raise ValueError(
+                f"A batch needs 1-{MAX_REQUESTS_PER_BATCH} requests, got {len(shard)}"
+            )
+        body = b'{"requests":[' + b",".join(encoded for _, encoded in shard) + b"]}"
+
+        response = await self.request_with_retry(
+            "POST",
+            f"{self.base_url}/messages/batches",
+            content=body,
+            headers={"content-type": "application/json"},
+        )
+
+        data = response.json()
+        batch_status = BatchStatus(**data)
+
+        logger.info(
+            "batch_created",
+            batch_id=batch_status.id,
+            request_count=len(shard),
+            payload_bytes=len(body),
+            serializer=self.serializer.name,
+            status=batch_status.processing_status,
+        )
+
+        return batch_status
+
+    def split_cached(
+        self,
+        agents: Sequence[AgentConfig],
+        file_hashes: dict[str, str | None],
+    ) -> tuple[dict[str, list[str]], list[tuple[str, str, list[dict[str, Any]]]]]:
+        """Separate files already verified by each agent from those to send.
+
+        Args:
+            agents: Agents to run
+            file_hashes: Content hash per pending file (None = unreadable)
+
+        Returns:
+            (uncached files per agent name, (agent, file, findings) cache hits)
+        """
+        uncached: dict[str, list[str]] = {}
+        hits: list[tuple[str, str, list[dict[str, Any]]]] = []
+        for agent in agents:
+            uncached[agent.name] = []
+            prompt_hash = findings_prompt_hash(agent, self.structured_output)
+            for file_path, content_hash in file_hashes.items():
+                cached = (
+                    self.findings_cache.get(agent.name, prompt_hash, agent.model, content_hash)
+                    if content_hash
+                    else None
+                )
+                if cached is None:
+                    uncached[agent.name].append(file_path)
+                else:
+                    hits.append((agent.name, file_path, cached))
+
+        logger.info(
+            "findings_cache_checked",
+            hits=len(hits),
+            misses=sum(len(files) for files in uncached.values()),
+        )
+        return uncached, hits
+
+    async def create_batch(
+        self,
+        agents: Sequence[AgentConfig],
+        pending_files: list[str],
+        context_budget_tokens: int | None = None,
+        use_cache: bool = True,
+        prompt_caching: bool = True,
+    ) -> BatchGroup:
+        """Create message batches for verification agents.
+
+        Files whose (agent, prompt, model, content) findings are already
+        cached are dropped per agent and their findings recorded on the
+        group. The remaining requests are sharded to respect the per-batch
+        request-count and payload-size limits, the shards are submitted
+        concurrently, and the resulting batches are recorded in the
+        registry as one BatchGroup. Each batch is recorded as soon as it is
+        created, so a crash mid-submission never loses track of a paid batch.
+
+        Args:
+            agents: List of agent configurations to run
+            pending_files: List of pending files to verify
+            context_budget_tokens: Per-request file token budget for packing
+                files into several requests per agent (None = no packing)
+            use_cache: Skip files with cached findings (default: True)
+            prompt_caching: Lay requests out as a cacheable shared prefix (default: True)
+
+        Returns:
+            BatchGroup referencing every submitted batch (none if all cached)
+        """
+        file_hashes = {f: hash_file_content(f) for f in pending_files}
+        if use_cache:
+            agent_files, hits = self.split_cached(agents, file_hashes)
+        else:
+            agent_files, hits = {agent.name: pending_files for agent in agents}, []
+
+        file_shards_by_agent = {
+            name: self.plan_file_shards(files, context_budget_tokens)
+            for name, files in agent_files.items()
+            if files
+        }
+        requests = self.build_requests(agents, file_shards_by_agent, prompt_caching)
+        batches = self.shard_requests(requests)
+
+        group_id = f"bgrp_{uuid.uuid4().hex[:12]}"
+        wave = agents[0].wave if agents else 0
+        self.registry.record_group(
+            group_id,
+            wave,
+            [agent.name for agent in agents],
+            file_hashes,
+            len(requests),
+        )
+        self.registry.record_cached_findings(group_id, hits)
+
+        async def submit_and_record(shard: list[tuple[BatchRequest, bytes]]) -> BatchStatus:
+            status = await self.submit_batch(shard)
+            mapping = []
+            for request, _ in shard:
+                agent_name, shard_index = parse_custom_id(request.custom_id)
+                mapping.append(
+                    (
+                        request.custom_id,
+                        agent_name,
+                        shard_index,
+                        file_shards_by_agent[agent_name][shard_index or 0],
+                    )
+                )
+            self.registry.record_batch(group_id, status, mapping, file_hashes=file_hashes)
+            return status
+
+        await asyncio.gather(*(submit_and_record(batch) for batch in batches))
+
+        group = self.registry.get_group(group_id)
+        assert group is not None
+
+        logger.info(
+            "batch_group_created",
+            group_id=group.id,
+            batch_count=len(group.batch_ids),
+            request_count=group.request_count,
+            cached_files=len(hits),
+        )
+
+        return group
+
+    def cache_result_findings(self, custom_id: str, parsed: dict[str, Any]) -> int:
+        """Store per-file findings from a successful result in the cache.
+
+        A result is only cached when every finding names one of the files
+        the request covered, so a cached empty list always means "clean".
+
+        Args:
+            custom_id: Result custom_id (must be in the registry)
+            parsed: Parsed findings from parse_agent_findings()
+
+        Returns:
+            Number of files cached
+        """
+        entry = self.registry.lookup_request(custom_id)
+        batch_id = self.registry.batch_for_request(custom_id)
+        group_id = self.registry.group_for_batch(batch_id) if batch_id else None
+        if parsed["status"] != "PASS" or entry is None or group_id is None:
+            return 0
+
+        agent_name, _, files = entry
+        return self.cache_file_findings(
+            custom_id, agent_name, files, self.registry.request_file_hashes(custom_id), parsed
+        )
+
+    def repo_path(self, file_path: str) -> str:
+        """Normalize a file path to a POSIX path relative to the project root.
+
+        Args:
+            file_path: Absolute or relative path, as packed or as reported
+
+        Returns:
+            Normalized path (left absolute if outside the project)
+        """
+        path = Path(os.path.normpath(file_path))
+        if path.is_absolute() and path.is_relative_to(self.project_root):
+            path = path.relative_to(self.project_root)
+        return path.as_posix()
+
+    def cache_file_findings(
+        self,
+        custom_id: str,
+        agent_name: str,
+        files: Sequence[str],
+        hashes: dict[str, str | None],
+        parsed: dict[str, Any],
+    ) -> int:
+        """Split a result's findings per file and store them in the cache.
+
+        A finding belongs to the file whose repo-relative path equals the
+        one it reports. Nothing is cached unless every finding belongs to
+        exactly one of the request's files.
+
+        Args:
+            custom_id: Result custom_id (for logging)
+            agent_name: Agent that produced the result
+            files: Files the request covered
+            hashes: Content hash of each file at submission time
+            parsed: Parsed findings from parse_agent_findings()
+
+        Returns:
+            Number of files cached
+        """
+        agent = AGENTS_BY_NAME.get(agent_name)
+        if parsed["status"] != "PASS" or agent is None:
+            return 0
+
+        files_by_path: dict[str, list[str]] = {}
+        for file_path in files:
+            files_by_path.setdefault(self.repo_path(file_path), []).append(file_path)
+
+        def owner(finding: dict[str, Any]) -> str | None:
+            reported = str(finding.get("file", "")).strip()
+            matches = files_by_path.get(self.repo_path(reported), []) if reported else []
+            return matches[0] if len(matches) == 1 else None
+
+        # One unattributable finding would leave some file cached as cleaner
+        # than it is, so the whole result is skipped
+        findings = parsed.get("findings", [])
+        owners = [owner(finding) for finding in findings]
+        if any(o is None for o in owners):
+            logger.info(
+                "findings_not_cached", custom_id=custom_id, reason="unmatched or ambiguous file"
+            )
+            return 0
+
+        cached = 0
+        prompt_hash = findings_prompt_hash(agent, self.structured_output)
+        for file_path in files:
+            content_hash = hashes.get(file_path)
+            if not content_hash:
+                continue
+            per_file = [f for f, o in zip(findings, owners, strict=True) if o == file_path]
+            self.findings_cache.put(agent.name, prompt_hash, agent.model, content_hash, per_file)
+            cached += 1
+        return cached
+
+    async def send_message(
+        self,
+        request: BatchRequest,
+        timeout_seconds: float = SYNC_REQUEST_TIMEOUT_SECONDS,
+    ) -> BatchIndividualResult:
+        """Run one request through the synchronous Messages API.
+
+        The response is wrapped in the batch result shape, so synchronous
+        and batch results share parse_agent_findings() and reporting.
+
+        Args:
+            request: Request to send (custom_id is kept for the result)
+            timeout_seconds: Timeout for the whole call
+
+        Returns:
+            A "succeeded" or "errored" BatchIndividualResult
+        """
+        try:
+            response = await self.request_with_retry(
+                "POST",
+                f"{self.base_url}/messages",
+                json=request.params.model_dump(exclude_none=True),
+                timeout=timeout_seconds,
+            )
+        except httpx.HTTPStatusError as e:
+            logger.warning(
+                "sync_request_failed",
+                custom_id=request.custom_id,
+                status_code=e.response.status_code,
+            )
+            try:
+                error = e.response.json().get("error", {})
+            except ValueError:
+                error = {}
+            return BatchIndividualResult(
+                custom_id=request.custom_id,
+                result={
+                    "type": "errored",
+                    "error": {
+                        "type": error.get("type", "api_error"),
+                        "message": error.get("message", f"HTTP {e.response.status_code}"),
+                    },
+                },
+            )
+        except httpx.TimeoutException:
+            logger.warning("sync_request_timeout", custom_id=request.custom_id)
+            return BatchIndividualResult(
+                custom_id=request.custom_id,
+                result={
+                    "type": "errored",
+                    "error": {
+                        "type": "timeout_error",
+                        "message": f"No response within {timeout_seconds:.0f}s",
+                    },
+                },
+            )
+
+        return BatchIndividualResult(
+            custom_id=request.custom_id,
+            result={"type": "succeeded", "message": response.json()},
+        )
+
+    async def run_synchronous(
+        self,
+        agents: Sequence[AgentConfig],
+        pending_files: list[str],
+        timeout_seconds: float = SYNC_REQUEST_TIMEOUT_SECONDS,
+        context_budget_tokens: int | None = None,
+        use_cache: bool = True,
+        prompt_caching: bool = True,
+        max_concurrency: int = SYNC_MAX_CONCURRENCY,
+    ) -> SyncRun:
+        """Run agents through concurrent synchronous Messages API calls.
+
+        Requests are planned exactly as for create_batch() (findings cache,
+        file packing, prompt-caching layout) and sent with at most
+        max_concurrency calls in flight.
+
+        Args:
+            agents: Agents to run
+            pending_files: Files to verify
+            timeout_seconds: Timeout for each call
+            context_budget_tokens: Per-request file token budget (None = no packing)
+            use_cache: Skip files with cached findings
+            prompt_caching: Use the cache-friendly request layout
+            max_concurrency: Maximum concurrent calls
+
+        Returns:
+            SyncRun with one result per request
+        """
+        file_hashes = {f: hash_file_content(f) for f in pending_files}
+        if use_cache:
+            agent_files, hits = self.split_cached(agents, file_hashes)
+        else:
+            agent_files, hits = {agent.name: pending_files for agent in agents}, []
+
+        file_shards_by_agent = {
+            name: self.plan_file_shards(files, context_budget_tokens)
+            for name, files in agent_files.items()
+            if files
+        }
+        requests = self.build_requests(agents, file_shards_by_agent, prompt_caching)
+
+        run = SyncRun(file_hashes=file_hashes, cache_hits=hits)
+        for request in requests:
+            agent_name, shard_index = parse_custom_id(request.custom_id)
+            run.files_by_custom_id[request.custom_id] = file_shards_by_agent[agent_name][
+                shard_index or 0
+            ]
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def send(request: BatchRequest) -> BatchIndividualResult:
+            async with semaphore:
+                result = await self.send_message(request, timeout_seconds)
+                # Truncated: send again at once with a larger output budget
+                for _ in range(RESUBMIT_MAX_ATTEMPTS):
+                    budget = truncated_retry_budget(result)
+                    if budget is None:
+                        break
+                    logger.info(
+                        "sync_request_truncated",
+                        custom_id=request.custom_id,
+                        max_tokens=budget,
+                    )
+                    params = request.params.model_copy(update={"max_tokens": budget})
+                    request = request.model_copy(update={"params": params})
+                    result = await self.send_message(request, timeout_seconds)
+                return result
+
+        run.results = list(await asyncio.gather(*(send(r) for r in requests)))
+
+        logger.info(
+            "sync_requests_completed",
+            request_count=len(requests),
+            succeeded=sum(1 for r in run.results if r.result.get("type") == "succeeded"),
+            cached_files=len(hits),
+        )
+        return run
+
+    def resolve_batch_ids(self, batch_or_group_id: str) -> list[str]:
+        """Resolve a batch ID or batch group ID to the batch IDs it covers.
+
+        Args:
+            batch_or_group_id: A single batch ID or a ``bgrp_`` group ID
+
+        Returns:
+            List of batch IDs
+
+        Raises:
+            ValueError: If a group ID is not in the registry
+        """
+        if not batch_or_group_id.startswith("bgrp_"):
+            return [batch_or_group_id]
+
+        group = self.registry.get_group(batch_or_group_id)
+        if group is None:
+            raise ValueError(f"Unknown batch group {batch_or_group_id}")
+        return group.batch_ids
+
+    def agent_for_result(self, custom_id: str) -> tuple[str, int | None]:
+        """Look up the agent and shard a result belongs to.
+
+        Uses the registry mapping, falling back to parsing the custom_id for
+        batches submitted outside this registry.
+
+        Args:
+            custom_id: Result custom_id
+
+        Returns:
+            (agent name, shard index or None)
+        """
+        entry = self.registry.lookup_request(custom_id)
+        if entry is not None:
+            return entry[0], entry[1]
+        return parse_custom_id(custom_id)
+
+    async def get_batch_status(self, batch_id: str) -> BatchStatus:
+        """Fetch the current status of a batch.
+
+        Args:
+            batch_id: Batch ID to look up
+
+        Returns:
+            Current BatchStatus
+        """
+        response = await self.request_with_retry(
+            "GET", f"{self.base_url}/messages/batches/{batch_id}"
+        )
+        return BatchStatus(**response.json())
+
+    async def poll_batch(
+        self,
+        batch_id: str,
+        poll_interval: int = 60,
+        max_wait_seconds: int = 3600,
+    ) -> BatchStatus:
+        """Poll batch status until processing completes.
+
+        Args:
+            batch_id: Batch ID to poll
+            poll_interval: Initial seconds between polls before an ETA is known (default: 60)
+            max_wait_seconds: Maximum seconds to wait (default: 3600 = 1 hour)
+
+        Returns:
+            Final BatchStatus
+
+        Raises:
+            TimeoutError: If max_wait_seconds exceeded
+        """
+        statuses = await self.poll_group([batch_id], poll_interval, max_wait_seconds)
+        return statuses[0]
+
+    def load_poll_history(self) -> float | None:
+        """Median duration of recently completed batches.
+
+        Returns:
+            Median seconds from creation to end, or None without history
+        """
+        if not self.poll_history_path.exists():
+            return None
+
+        durations = []
+        for line in self.poll_history_path.read_text().splitlines()[-POLL_HISTORY_WINDOW:]:
+            try:
+                durations.append(float(json.loads(line)["duration_seconds"]))
+            except (ValueError, KeyError, TypeError):
+                continue
+
+        return statistics.median(durations) if durations else None
+
+    def record_poll_history(self, status: BatchStatus) -> None:
+        """Append a completed batch's duration to the poll history log.
+
+        Args:
+            status: Final status of an ended batch
+        """
+        if not status.ended_at:
+            return
+
+        duration = (
+            parse_api_timestamp(status.ended_at) - parse_api_timestamp(status.created_at)
+        ).total_seconds()
+        entry = {
+            "batch_id": status.id,
+            "ended_at": status.ended_at,
+            "duration_seconds": round(duration, 1),
+            "request_count": sum(status.request_counts.model_dump().values()),
+        }
+        self.poll_history_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.poll_history_path.open("a") as f:
+            f.write(json.dumps(entry) + "\n")
+
+    def next_poll_delay(
+        self,
+        progress: BatchProgress,
+        poll_interval: float,
+        historical_seconds: float | None,
+    ) -> float:
+        """Choose the delay before polling a batch again.
+
+        Args:
+            progress: Observations for the batch
+            poll_interval: Fallback interval when no ETA can be estimated
+            historical_seconds: Median duration of past batches, if known
+
+        Returns:
+            Seconds to wait (with +/-10% jitter), within the poll bounds
+        """
+        eta = progress.eta_seconds(historical_seconds)
+        delay = poll_interval if eta is None else eta * ETA_POLL_FRACTION
+        delay = min(max(delay, MIN_POLL_INTERVAL), MAX_POLL_INTERVAL)
+        return delay * random.uniform(0.9, 1.1)
+
+    async def iter_results(
+        self,
+        batch_id: str,
+    ) -> AsyncIterator[BatchIndividualResult]:
+        """Stream batch results from results_url one JSONL line at a time.
+
+        Results are yielded as soon as each line arrives, so callers can
+        start parsing findings before the download completes and never hold
+        the full results file in memory. The results_url is taken from the
+        registry when the batch was already polled to completion. Failures
+        before the first line are retried like any other call; a stream
+        that breaks mid-file is not, since lines were already yielded.
+
+        Every completed download is written to the local results archive;
+        batches already archived are read from it instead of the network,
+        so results stay available after results_url expires.
+
+        Args:
+            batch_id: Batch ID to download results for
+
+        Yields:
+            Individual batch results in file order
+        """
+        if self.results_archive.has_batch(batch_id):
+            for line in self.results_archive.iter_batch(batch_id):
+                if line.strip():
+                    yield self.serializer.decode_result(line)
+            logger.info("batch_results_read_from_archive", batch_id=batch_id)
+            return
+
+        results_url = self.registry.results_url(batch_id)
+        if not results_url:
+            # Not polled to completion by this registry; fetch status
+            batch_status = await self.get_batch_status(batch_id)
+            self.registry.update_batch(batch_status)
+            results_url = batch_status.results_url
+
+        if not results_url:
+            raise ValueError(f"Batch {batch_id} has no results_url yet")
+
+        result_count = 0
+        max_retries = self.http_config.max_retries
+        archive = self.results_archive.writer(batch_id)
+        for attempt in range(max_retries + 1):
+            delay = None
+            try:
+                async with self.http.stream("GET", results_url) as response:
+                    if response.status_code in RETRYABLE_STATUS_CODES and attempt < max_retries:
+                        delay = retry_delay(attempt, response)
+                    else:
+                        response.raise_for_status()
+                        async for line in aiter_jsonl_lines(response):
+                            if not line.strip():
+                                continue
+                            result_count += 1
+                            result = self.serializer.decode_result(line)
+                            self.archive_result(archive, line, result)
+                            yield result
+            except httpx.TransportError:
+                if result_count or attempt >= max_retries:
+                    archive.abort()
+                    raise
+                delay = retry_delay(attempt)
+            except BaseException:
+                # Includes the consumer closing the generator early
+                archive.abort()
+                raise
+
+            if delay is None:
+                break
+            logger.warning(
+                "results_download_retry",
+                batch_id=batch_id,
+                attempt=attempt + 1,
+                delay_seconds=round(delay, 2),
+            )
+            await asyncio.sleep(delay)
+
+        archive.close()
+        self.registry.mark_downloaded(batch_id)
+        logger.info(
+            "batch_results_downloaded",
+            batch_id=batch_id,
+            result_count=result_count,
+        )
+
+    def archive_result(
+        self,
+        archive: ArchiveWriter,
+        line: str,
+        result: BatchIndividualResult,
+    ) -> None:
+        """Add one downloaded result line to the archive with its index keys.
+
+        Args:
+            archive: Writer for the batch being downloaded
+            line: Raw JSONL line
+            result: Decoded result
+        """
+        entry = self.registry.lookup_request(result.custom_id)
+        if entry is not None:
+            agent_name, files = entry[0], entry[2]
+        else:
+            agent_name, files = parse_custom_id(result.custom_id)[0], []
+        archive.add(line, result.custom_id, agent_name, files, result.result.get("type"))
+
+    async def download_results(
+        self,
+        batch_id: str,
+    ) -> list[BatchIndividualResult]:
+        """Download all batch results from results_url.
+
+        Prefer iter_results() for large batches; this collects the stream.
+
+        Args:
+            batch_id: Batch ID to download results for
+
+        Returns:
+            List of individual batch results
+        """
+        return [result async for result in self.iter_results(batch_id)]
+
+    async def poll_group(
+        self,
+        batch_ids: Sequence[str],
+        poll_interval: int = 60,
+        max_wait_seconds: int = 3600,
+        refresh: Callable[[], Awaitable[list[str]]] | None = None,
+    ) -> list[BatchStatus]:
+        """Poll many batches in one loop until all have ended.
+
+        Each batch is polled on its own schedule: the next poll is set from
+        an ETA derived from how fast its request_counts advance (or from
+        historical batch durations before any progress is seen), so polls
+        tighten as completion nears. Batches that are due together are
+        polled concurrently over the shared connection.
+
+        Args:
+            batch_ids: Batch IDs to watch
+            poll_interval: Initial seconds between polls before an ETA is known (default: 60)
+            max_wait_seconds: Maximum seconds to wait (default: 3600 = 1 hour)
+            refresh: Called before each round of polls; returns new batch IDs
+                to watch as well (e.g. delta batches from supersede_stale)
+
+        Returns:
+            Final BatchStatus per batch, in batch_ids order, then any
+            batches added by refresh
+
+        Raises:
+            TimeoutError: If max_wait_seconds exceeded
+        """
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
+        historical_seconds = self.load_poll_history()
+
+        batch_ids = list(batch_ids)
+        pending = {batch_id: BatchProgress(batch_id=batch_id) for batch_id in batch_ids}
+        final: dict[str, BatchStatus] = {}
+
+        while pending:
+            now = loop.time()
+            elapsed = now - start_time
+            if elapsed > max_wait_seconds:
+                raise TimeoutError(
+                    f"Batches {sorted(pending)} did not complete within {max_wait_seconds}s"
+                )
+
+            due = [p for p in pending.values() if p.next_poll_at <= now]
+            if due and refresh is not None:
+                for batch_id in await refresh():
+                    batch_ids.append(batch_id)
+                    pending[batch_id] = BatchProgress(batch_id=batch_id)
+                    due.append(pending[batch_id])
+
+            if not due:
+                next_due = min(p.next_poll_at for p in pending.values())
+                await asyncio.sleep(min(next_due, start_time + max_wait_seconds) - now)
+                continue
+
+            statuses = await asyncio.gather(
+                *(self.get_batch_status(p.batch_id) for p in due)
+            )
+
+            polled_at = loop.time()
+            for progress, batch_status in zip(due, statuses, strict=True):
+                progress.observe(batch_status, polled_at)
+                self.registry.update_batch(batch_status)
+                eta = progress.eta_seconds(historical_seconds)
+                logger.info(
+                    "batch_polled",
+                    batch_id=progress.batch_id,
+                    poll_count=progress.poll_count,
+                    status=batch_status.processing_status,
+                    elapsed_seconds=int(elapsed),
+                    eta_seconds=None if eta is None else int(eta),
+                    request_counts=batch_status.request_counts.model_dump(),
+                )
+
+                if batch_status.processing_status == "ended":
+                    logger.info(
+                        "batch_completed",
+                        batch_id=progress.batch_id,
+                        total_polls=progress.poll_count,
+                        total_seconds=int(elapsed),
+                    )
+                    self.record_poll_history(batch_status)
+                    final[progress.batch_id] = batch_status
+                    del pending[progress.batch_id]
+                    continue
+
+                progress.next_poll_at = polled_at + self.next_poll_delay(
+                    progress, poll_interval, historical_seconds
+                )
+
+        return [final[batch_id] for batch_id in batch_ids]
+
+    async def resubmit_failed(
+        self,
+        group_id: str,
+        statuses: Sequence[BatchStatus],
+        max_attempts: int = RESUBMIT_MAX_ATTEMPTS,
+        backoff_seconds: float = 0.0,
+    ) -> list[str]:
+        """Resubmit the failed requests of ended batches as a follow-up batch.
+
+        Only errored (transient), expired and canceled requests, and
+        responses truncated at max_tokens (with a larger budget), are sent
+        again, each under a new custom_id linked to the one it replaces, so
+        agents that succeeded are never paid for twice. Requests already
+        resubmitted max_attempts times are left as they are.
+
+        Args:
+            group_id: Group the batches belong to
+            statuses: Final statuses of ended batches in the group
+            max_attempts: Maximum follow-up submissions per request
+            backoff_seconds: Delay before submitting, if any request errored
+
+        Returns:
+            IDs of the follow-up batches (empty if nothing to resubmit)
+        """
+        superseded = self.registry.superseded_requests(group_id)
+        failed: list[str] = []
+        budgets: dict[str, int] = {}
+        for status in statuses:
+            # Truncated responses count as succeeded, so every batch is read
+            async for result in self.iter_results(status.id):
+                if result.custom_id in superseded:
+                    continue
+                budget = truncated_retry_budget(result)
+                if not is_resubmittable(result) and budget is None:
+                    continue
+                if self.registry.request_attempt(result.custom_id) >= max_attempts:
+                    continue
+                failed.append(result.custom_id)
+                if budget is not None:
+                    budgets[result.custom_id] = budget
+
+        if not failed:
+            return []
+        if budgets:
+            logger.info("truncated_requests_found", group_id=group_id, count=len(budgets))
+        if len(budgets) < len(failed):
+            await asyncio.sleep(backoff_seconds)
+        return await self.resubmit_requests(group_id, failed, reason="failed", max_tokens=budgets)
+
+    async def resubmit_requests(
+        self,
+        group_id: str,
+        custom_ids: Sequence[str],
+        reason: str,
+        max_tokens: dict[str, int] | None = None,
+        current_hashes: dict[str, str | None] | None = None,
+        count_attempt: bool = True,
+    ) -> list[str]:
+        """Rebuild requests from current file content and submit them again.
+
+        Each new request replaces one custom_id (same agent, shard and
+        files) and records the content hashes it was built from.
+
+        Args:
+            group_id: Group the new batches are added to
+            custom_ids: Requests to replace
+            reason: Why they are resubmitted, for logging ("failed", "stale"
+                or "canceled")
+            max_tokens: Output budgets by replaced custom_id (e.g. for
+                truncated responses); others use output_budgets()
+            current_hashes: Content hashes already computed this round
+            count_attempt: Count the new requests against the retry budget
+
+        Returns:
+            IDs of the new batches
+        """
+        retry_of: dict[str, str] = {}
+        files_by_custom_id: dict[str, list[str]] = {}
+        file_hashes = current_hashes if current_hashes is not None else {}
+        requests: list[BatchRequest] = []
+        for custom_id in custom_ids:
+            entry = self.registry.lookup_request(custom_id)
+            agent = AGENTS_BY_NAME.get(entry[0]) if entry else None
+            if entry is None or agent is None:
+                continue
+            _, shard_index, files = entry
+            for file_path in files:
+                if file_path not in file_hashes:
+                    file_hashes[file_path] = hash_file_content(file_path)
+            (request,) = self.build_requests(
+                [agent], {agent.name: [files]}, max_tokens=(max_tokens or {}).get(custom_id)
+            )
+            request = request.model_copy(
+                update={"custom_id": make_custom_id(agent.name, shard_index)}
+            )
+            requests.append(request)
+            retry_of[request.custom_id] = custom_id
+            files_by_custom_id[request.custom_id] = files
+
+        batch_ids = []
+        for shard in self.shard_requests(requests):
+            status = await self.submit_batch(shard)
+            mapping = []
+            for request, _ in shard:
+                agent_name, shard_index = parse_custom_id(request.custom_id)
+                mapping.append(
+                    (request.custom_id, agent_name, shard_index, files_by_custom_id[request.custom_id])
+                )
+            self.registry.record_batch(
+                group_id,
+                status,
+                mapping,
+                retry_of=retry_of,
+                file_hashes=file_hashes,
+                count_attempt=count_attempt,
+            )
+            batch_ids.append(status.id)
+
+        logger.info(
+            "requests_resubmitted",
+            group_id=group_id,
+            reason=reason,
+            request_count=len(requests),
+            batch_ids=batch_ids,
+        )
+        return batch_ids
+
+    def stale_files(
+        self,
+        custom_id: str,
+        current_hashes: dict[str, str | None] | None = None,
+    ) -> list[str]:
+        """Files whose content changed since a request was built.
+
+        Args:
+            custom_id: Request custom_id
+            current_hashes: Memo of current content hashes, shared across calls
+
+        Returns:
+            Changed (or now unreadable) files, empty if the request is current
+        """
+        current_hashes = current_hashes if current_hashes is not None else {}
+        stale = []
+        for file_path, built_from in self.registry.request_file_hashes(custom_id).items():
+            if file_path not in current_hashes:
+                current_hashes[file_path] = hash_file_content(file_path)
+            if current_hashes[file_path] != built_from:
+                stale.append(file_path)
+        return stale
+
+    async def cancel_batch(self, batch_id: str) -> BatchStatus:
+        """Ask the API to cancel an in-flight batch.
+
+        Requests already processed keep their results; the rest end as
+        ``canceled``.
+
+        Args:
+            batch_id: Batch to cancel
+
+        Returns:
+            Status after the cancel call (usually ``canceling``)
+        """
+        response = await self.request_with_retry(
+            "POST", f"{self.base_url}/messages/batches/{batch_id}/cancel"
+        )
+        status = BatchStatus(**response.json())
+        self.registry.update_batch(status)
+        logger.info("batch_canceled", batch_id=batch_id, status=status.processing_status)
+        return status
+
+    async def supersede_stale(self, group_id: str) -> list[str]:
+        """Replace requests of a group whose files changed since submission.
+
+        In-flight batches holding a stale request are canceled (the API
+        cancels whole batches; their other unfinished requests come back
+        ``canceled`` and are recovered by resubmit_canceled()). Stale
+        requests are rebuilt from current content and submitted as a delta
+        batch, superseding the old results in reports; neither counts
+        against the retry budget. Each file is hashed once per call. After
+        SUPERSEDE_MAX_ROUNDS delta batches for the group, stale requests
+        are left for reports to mark as stale.
+
+        Args:
+            group_id: Batch group ID
+
+        Returns:
+            IDs of the delta batches (empty if nothing is stale)
+        """
+        if self.supersede_rounds[group_id] >= SUPERSEDE_MAX_ROUNDS:
+            return []
+
+        superseded = self.registry.superseded_requests(group_id)
+        current_hashes: dict[str, str | None] = {}
+        stale = [
+            custom_id
+            for custom_id in self.registry.group_request_ids(group_id)
+            if custom_id not in superseded and self.stale_files(custom_id, current_hashes)
+        ]
+        if not stale:
+            return []
+
+        in_flight = {
+            batch_id
+            for batch_id in (self.registry.batch_for_request(c) for c in stale)
+            if batch_id and self.registry.batch_processing_status(batch_id) == "in_progress"
+        }
+        await asyncio.gather(*(self.cancel_batch(batch_id) for batch_id in sorted(in_flight)))
+        self.superseded_batches.update(in_flight)
+
+        self.supersede_rounds[group_id] += 1
+        logger.info(
+            "stale_requests_superseded",
+            group_id=group_id,
+            request_count=len(stale),
+            canceled_batches=sorted(in_flight),
+            supersede_round=self.supersede_rounds[group_id],
+        )
+        if self.supersede_rounds[group_id] == SUPERSEDE_MAX_ROUNDS:
+            logger.warning(
+                "supersede_limit_reached",
+                group_id=group_id,
+                max_rounds=SUPERSEDE_MAX_ROUNDS,
+            )
+        return await self.resubmit_requests(
+            group_id, stale, reason="stale", current_hashes=current_hashes, count_attempt=False
+        )
+
+    async def resubmit_canceled(
+        self,
+        group_id: str,
+        statuses: Sequence[BatchStatus],
+    ) -> list[str]:
+        """Resubmit requests canceled only because supersede_stale canceled their batch.
+
+        Their files did not change and nothing failed, so they are sent
+        again whatever the retry budget, and keep their attempt count.
+
+        Args:
+            group_id: Group the batches belong to
+            statuses: Final statuses of ended batches in the group
+
+        Returns:
+            IDs of the follow-up batches (empty if nothing was canceled)
+        """
+        superseded = self.registry.superseded_requests(group_id)
+        canceled = [
+            result.custom_id
+            for status in statuses
+            if status.id in self.superseded_batches
+            async for result in self.iter_results(status.id)
+            if result.result.get("type") == "canceled" and result.custom_id not in superseded
+        ]
+        if not canceled:
+            return []
+        return await self.resubmit_requests(
+            group_id, canceled, reason="canceled", count_attempt=False
+        )
+
+    async def complete_group(
+        self,
+        group_id: str,
+        poll_interval: int = 60,
+        max_wait_seconds: int = 3600,
+        max_attempts: int = RESUBMIT_MAX_ATTEMPTS,
+        supersede: bool = True,
+    ) -> list[BatchStatus]:
+        """Poll a group to completion, resubmitting failed requests.
+
+        After the group's batches end, failed requests are resubmitted in
+        follow-up batches (after a jittered exponential backoff) until they
+        succeed, hit max_attempts, or fail permanently. With supersede,
+        each polling round first replaces requests whose files changed
+        (see supersede_stale); requests canceled along with them are
+        always resubmitted, even with max_attempts 0. All waiting shares
+        one max_wait_seconds budget.
+
+        Args:
+            group_id: Batch group ID
+            poll_interval: Initial seconds between polls before an ETA is known
+            max_wait_seconds: Maximum seconds to wait overall
+            max_attempts: Maximum follow-up submissions per request
+            supersede: Cancel and resubmit requests built from stale files
+
+        Returns:
+            Final BatchStatus of every batch polled, follow-ups included
+
+        Raises:
+            TimeoutError: If max_wait_seconds is exceeded
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max_wait_seconds
+        batch_ids = self.resolve_batch_ids(group_id)
+        statuses: list[BatchStatus] = []
+
+        round_number = 0
+        while batch_ids:
+            ended = await self.poll_group(
+                batch_ids,
+                poll_interval,
+                max(int(deadline - loop.time()), 0),
+                refresh=(lambda: self.supersede_stale(group_id)) if supersede else None,
+            )
+            statuses.extend(ended)
+            batch_ids = await self.resubmit_canceled(group_id, ended)
+            if round_number == max_attempts:
+                continue
+
+            backoff = RESUBMIT_BACKOFF_SECONDS * 2**round_number * random.uniform(0.5, 1.5)
+            batch_ids += await self.resubmit_failed(
+                group_id, ended, max_attempts, min(backoff, max(deadline - loop.time(), 0))
+            )
+            round_number += 1
+
+        return statuses
+
+    async def iter_group_results(
+        self,
+        batch_ids: Sequence[str],
+    ) -> AsyncIterator[BatchIndividualResult]:
+        """Stream results from every batch in a group as one sequence.
+
+        Args:
+            batch_ids: Batch IDs in the group
+
+        Yields:
+            Individual batch results, batch by batch
+        """
+        for batch_id in batch_ids:
+            async for result in self.iter_results(batch_id):
+                yield result
+
+    def parse_agent_findings(
+        self,
+        result: BatchIndividualResult,
+    ) -> dict[str, Any]:
+        """Parse agent findings from batch result.
+
+        Args:
+            result: Individual batch result
+
+        Returns:
+            Parsed findings dictionary
+        """
+        result_type = result.result.get("type")
+
+        if result_type == "succeeded":
+            message = result.result.get("message", {})
+            content = message.get("content", [])
+            usage = extract_usage(message)
+
+            # Structured-output requests answer with a findings tool call
+            findings, method = None, "tool"
+            for block in content:
+                if block.get("type") == "tool_use" and block.get("name") == FINDINGS_TOOL_NAME:
+                    findings = find_agent_findings(block.get("input"))
+                    if findings is not None:
+                        break
+
+            # Extract text from content blocks
+            text_content = ""
+            for block in content:
+                if block.get("type") == "text":
+                    text_content += block.get("text", "")
+
+            # A fence or a sentence around the JSON must not fail a paid response
+            if findings is None:
+                findings, method = extract_findings_json(text_content)
+            self.parse_stats[method] += 1
+            if findings is None:
+                logger.warning(
+                    "failed_to_parse_agent_response",
+                    custom_id=result.custom_id,
+                    content_preview=text_content[:200],
+                )
+                truncated = message.get("stop_reason") == "max_tokens"
+                return {
+                    "status": "FAIL",
+                    "error": (
+                        f"Response truncated at max_tokens ({usage['output_tokens']} tokens)"
+                        if truncated
+                        else "No findings JSON matching the agent schema in response"
+                    ),
+                    "usage": usage,
+                }
+
+            recovered = method not in ("json", "tool")
+            if recovered:
+                logger.info(
+                    "agent_response_recovered",
+                    custom_id=result.custom_id,
+                    method=method,
+                )
+            return {
+                "status": "PASS",
+                "findings": findings["findings"],
+                "summary": findings.get("summary", {}),
+                "score": findings.get("score"),
+                "coverage": findings.get("coverage"),
+                "usage": usage,
+                "recovered": int(recovered),
+            }
+
+        elif result_type == "errored":
+            error = result.result.get("error", {})
+            # Batch errors wrap the API error object: {"type": "error", "error": {...}}
+            error = error.get("error") or error
+            return {
+                "status": "FAIL",
+                "error": error.get("message", "Unknown error"),
+                "error_type": error.get("type"),
+            }
+
+        elif result_type in ("expired", "canceled"):
+            return {
+                "status": "FAIL",
+                "error": f"Request {result_type}",
+            }
+
+        else:
+            return {
+                "status": "FAIL",
+                "error": f"Unknown result type: {result_type}",
+            }
+
+    def record_result_cost(
+        self,
+        costs: CostTracker,
+        result: BatchIndividualResult,
+        agent_name: str,
+        usage: dict[str, int] | None,
+        synchronous: bool = False,
+    ) -> None:
+        """Add a result's token usage to a cost tracker.
+
+        The model is taken from the response message, falling back to the
+        agent's configured model.
+
+        Args:
+            costs: Tracker to update
+            result: Individual batch result
+            agent_name: Agent that produced the result
+            usage: Usage from parse_agent_findings (None for failed requests)
+            synchronous: The result came from the synchronous Messages API
+        """
+        if not usage:
+            return
+        message = result.result.get("message") or {}
+        agent = AGENTS_BY_NAME.get(agent_name)
+        model = message.get("model") or (agent.model if agent else "unknown")
+        if synchronous:
+            batch_id = "sync"
+        else:
+            batch_id = self.registry.batch_for_request(result.custom_id) or "unknown"
+        costs.add(batch_id, result.custom_id, agent_name, model, usage, synchronous)
+
+    def merge_agent_findings(
+        self,
+        findings: Sequence[tuple[str, dict[str, Any]]],
+    ) -> list[tuple[str, dict[str, Any]]]:
+        """Merge parsed shard findings back into one entry per agent.
+
+        Status is FAIL if any shard failed; findings are concatenated and
+        summary counts summed. The merged score is the lowest shard score
+        and coverage is the mean of shard coverages.
+
+        Args:
+            findings: (agent name, parsed findings) pairs, possibly several per agent
+
+        Returns:
+            (agent name, merged findings) pairs in first-seen agent order
+        """
+        grouped: dict[str, list[dict[str, Any]]] = {}
+        for agent_name, parsed in findings:
+            grouped.setdefault(agent_name, []).append(parsed)
+
+        merged: list[tuple[str, dict[str, Any]]] = []
+        for agent_name, shards in grouped.items():
+            if len(shards) == 1:
+                merged.append((agent_name, shards[0]))
+                continue
+
+            usage = sum_usage(p.get("usage") for p in shards)
+            stale_files = sorted({f for p in shards for f in p.get("stale_files", [])})
+            failed = [p for p in shards if p["status"] != "PASS"]
+            if failed:
+                merged.append(
+                    (
+                        agent_name,
+                        {
+                            "status": "FAIL",
+                            "error": f"{len(failed)}/{len(shards)} shards failed: "
+                            + "; ".join(str(p.get("error", "Unknown")) for p in failed),
+                            "usage": usage,
+                            "stale_files": stale_files,
+                        },
+                    )
+                )
+                continue
+
+            summary: dict[str, int] = {}
+            for parsed in shards:
+                for key, value in parsed.get("summary", {}).items():
+                    if isinstance(value, int | float):
+                        summary[key] = summary.get(key, 0) + value
+            scores = [p["score"] for p in shards if p.get("score") is not None]
+            coverages = [p["coverage"] for p in shards if p.get("coverage") is not None]
+
+            merged.append(
+                (
+                    agent_name,
+                    {
+                        "status": "PASS",
+                        "findings": [f for p in shards for f in p.get("findings", [])],
+                        "summary": summary,
+                        "score": min(scores) if scores else None,
+                        "coverage": sum(coverages) / len(coverages) if coverages else None,
+                        "shards": len(shards),
+                        "recovered": sum(p.get("recovered", 0) for p in shards),
+                        "usage": usage,
+                        "stale_files": stale_files,
+                    },
+                )
+            )
+
+        return merged
+
+    def generate_report(
+        self,
+        batch_id: str,
+        agents: Sequence[AgentConfig],
+        findings: Sequence[tuple[str, dict[str, Any]]],
+        costs: CostTracker,
+    ) -> Path:
+        """Generate detailed report for batch verification.
+
+        Args:
+            batch_id: Batch ID
+            agents: List of agents used
+            findings: (agent name, parsed findings) pairs from parse_agent_findings
+            costs: Usage-based costs of the results
+
+        Returns:
+            Path to generated report
         """
         timestamp = datetime.now(tz=timezone.utc).strftime("%Y-%m-%d-%H%M%S")
         wave_num = agents[0].wave if agents else 0
         report_dir = self.reports_dir / "batch-verification" / f"phase-{wave_num}"
         report_dir.mkdir(parents=True, exist_ok=True)
 
+        # Suffix with the batch/group ID: the run command can finish several
+        # groups of the same wave within one second
         report_path = (
             report_dir
-            / f"{timestamp}-phase4-task41-batch-verification-wave{wave_num}.md"
+            / f"{timestamp}-phase4-task41-batch-verification-wave{wave_num}-{batch_id[-8:]}.md"
         )
 
+        batch_cost = costs.batch_cost
+        sync_cost = costs.sync_cost
+        # Savings are what was actually paid versus running everything synchronously
+        savings = sync_cost - costs.cost
+        savings_pct = savings / sync_cost * 100 if sync_cost else 0.0
+
         # Build report content
         report_lines = [
             f"# Batch Verification Report - Wave {wave_num}",
@@ -726,26 +2775,45 @@ class BatchAPIClient:
             f"**Date:** {datetime.now(tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S')} UTC",
             f"**Batch ID:** {batch_id}",
             f"**Agents:** {len(agents)}",
-            f"**Results:** {len(results)}",
+            f"**Results:** {len(findings)}",
             "",
             "---",
             "",
             "## Cost Comparison",
             "",
-            f"- **Batch API Cost:** ${total_cost:.4f} (50% discount)",
+            f"- **Batch API Cost:** ${batch_cost:.4f} ({BATCH_DISCOUNT:.0%} of synchronous price)",
             f"- **Synchronous API Cost:** ${sync_cost:.4f}",
-            f"- **Savings:** ${sync_cost - total_cost:.4f} ({((sync_cost - total_cost) / sync_cost * 100):.1f}%)",
-            "",
-            "---",
-            "",
-            "## Agent Results",
-            "",
+            f"- **Savings:** ${savings:.4f} ({savings_pct:.1f}%)",
         ]
+        if costs.synchronous_requests:
+            report_lines.append(
+                f"- **Actual Cost:** ${costs.cost:.4f} "
+                f"({costs.synchronous_requests} synchronous request(s) at full price)"
+            )
+        if costs.unpriced_requests:
+            report_lines.append(
+                f"- **Unpriced Requests:** {costs.unpriced_requests} (model missing from MODEL_PRICING)"
+            )
+
+        for title, key in (("Model", "model"), ("Batch", "batch_id")):
+            report_lines.extend(
+                [
+                    "",
+                    f"| {title} | Requests | Input | Output | Cache Read | Cache Write | Batch Cost | Sync Cost |",
+                    "|---|---:|---:|---:|---:|---:|---:|---:|",
+                ]
+            )
+            for name, t in costs.totals_by(key).items():
+                report_lines.append(
+                    f"| {name} | {t['requests']} | {t['input_tokens']} | {t['output_tokens']}"
+                    f" | {t['cache_read_input_tokens']} | {t['cache_creation_input_tokens']}"
+                    f" | ${t['batch_cost']:.4f} | ${t['sync_cost']:.4f} |"
+                )
 
-        for result in results:
-            parsed = self.parse_agent_findings(result)
-            agent_name = result.custom_id.rsplit("-", 1)[0]
+        report_lines.extend(["", "---", "", "## Agent Results", ""])
+        agent_costs = costs.totals_by("agent")
 
+        for agent_name, parsed in findings:
             report_lines.extend(
                 [
                     f"### {agent_name}",
@@ -772,9 +2840,35 @@ class BatchAPIClient:
                 if parsed.get("coverage") is not None:
                     report_lines.append(f"- **Coverage:** {parsed['coverage']}%")
 
+                if parsed.get("recovered"):
+                    report_lines.append(
+                        f"- **Recovered Responses:** {parsed['recovered']} "
+                        "(findings JSON extracted from surrounding text)"
+                    )
+
             else:
                 report_lines.append(f"- **Error:** {parsed.get('error', 'Unknown')}")
 
+            if parsed.get("stale_files"):
+                report_lines.append(
+                    "- **Stale:** built from files changed since submission: "
+                    + ", ".join(parsed["stale_files"])
+                )
+
+            usage = parsed.get("usage")
+            if usage:
+                report_lines.extend(
+                    [
+                        f"- **Input Tokens:** {usage['input_tokens']}",
+                        f"- **Output Tokens:** {usage['output_tokens']}",
+                        f"- **Cache Read Tokens:** {usage['cache_read_input_tokens']}",
+                        f"- **Cache Write Tokens:** {usage['cache_creation_input_tokens']}",
+                    ]
+                )
+
+            if agent_name in agent_costs:
+                report_lines.append(f"- **Cost:** ${agent_costs[agent_name]['cost']:.4f}")
+
             report_lines.append("")
 
         report_content = "\n".join(report_lines)
@@ -794,139 +2888,662 @@ class BatchAPIClient:
 # ============================================================================
 
 
-async def cmd_submit(args: argparse.Namespace) -> int:
-    """Submit batch verification for a wave.
+def transport_from_args(
+    args: argparse.Namespace, config: HTTPClientConfig
+) -> httpx.AsyncBaseTransport | None:
+    """Build the record, replay or synthetic transport requested on the CLI.
 
     Args:
         args: CLI arguments
+        config: HTTP settings for the live transport being recorded
 
     Returns:
-        Exit code (0 = success, 1 = failure)
+        Transport override, or None for the live network
     """
-    client = BatchAPIClient()
+    if args.record:
+        return RecordingTransport(args.record, live_transport(config))
+    if args.replay:
+        return ReplayTransport(args.replay, latency_seconds=args.latency)
+    if args.synthetic:
+        return SyntheticTransport(
+            polls_to_complete=args.synthetic_polls,
+            latency_seconds=args.latency,
+            error_rate=args.synthetic_error_rate,
+            state_path=state_dir(Path.cwd(), offline=True) / "synthetic-batches.json",
+        )
+    return None
 
-    # Get pending files
-    pending_files = await client.get_pending_files()
-    if not pending_files:
-        logger.info("no_pending_files")
-        print("No pending files to verify.")
-        return 0
 
-    # Select agents for wave
-    agents = WAVE_1_AGENTS if args.wave == 1 else WAVE_2_AGENTS
+def client_from_args(args: argparse.Namespace) -> BatchAPIClient:
+    """Create the batch API client configured by the global CLI options.
+
+    Args:
+        args: CLI arguments
+
+    Returns:
+        BatchAPIClient (use as an async context manager)
+    """
+    config = http_config_from_args(args)
+    return BatchAPIClient(
+        http_config=config,
+        serializer=args.serializer,
+        transport=transport_from_args(args, config),
+        structured_output=args.structured_output,
+        adaptive_max_tokens=not args.fixed_max_tokens,
+        metrics_path=args.metrics,
+    )
+
+
+def http_config_from_args(args: argparse.Namespace) -> HTTPClientConfig:
+    """Build the shared HTTP client configuration from CLI arguments.
+
+    Args:
+        args: CLI arguments
+
+    Returns:
+        HTTPClientConfig for BatchAPIClient
+    """
+    return HTTPClientConfig(
+        http2=not args.no_http2,
+        timeout_seconds=args.timeout,
+        max_connections=args.max_connections,
+        max_keepalive_connections=args.max_keepalive_connections,
+        keepalive_expiry_seconds=args.keepalive_expiry,
+        max_retries=args.max_retries,
+    )
+
+
+async def cmd_submit(args: argparse.Namespace) -> int:
+    """Submit batch verification for a wave.
+
+    Args:
+        args: CLI arguments
 
-    print(f"Submitting Wave {args.wave} batch verification...")
-    print(f"Agents: {', '.join(a.name for a in agents)}")
-    print(f"Pending files: {len(pending_files)}")
+    Returns:
+        Exit code (0 = success, 1 = failure)
+    """
+    async with client_from_args(args) as client:
+        # Get pending files
+        pending_files = await client.get_pending_files()
+        if not pending_files:
+            logger.info("no_pending_files")
+            print("No pending files to verify.")
+            return 0
+
+        # Select agents for wave
+        agents = WAVE_1_AGENTS if args.wave == 1 else WAVE_2_AGENTS
+
+        print(f"Submitting Wave {args.wave} batch verification...")
+        print(f"Agents: {', '.join(a.name for a in agents)}")
+        print(f"Pending files: {len(pending_files)}")
+
+        # Create batch group (sharded into several batches when oversized)
+        group = await client.create_batch(
+            agents,
+            pending_files,
+            context_budget_tokens=args.context_budget,
+            use_cache=not args.no_cache,
+            prompt_caching=not args.no_prompt_cache,
+        )
 
-    # Create batch
-    batch_status = await client.create_batch(agents, pending_files)
+        print(f"\nBatch group created: {group.id}")
+        print(f"Requests: {group.request_count}")
+        print(f"Batches: {len(group.batch_ids)}")
+        for batch_id in group.batch_ids:
+            print(f"  - {batch_id}")
 
-    print(f"\nBatch created: {batch_status.id}")
-    print(f"Status: {batch_status.processing_status}")
-    print(f"Expires at: {batch_status.expires_at}")
-    print(f"\nPoll with: python {__file__} --poll {batch_status.id}")
+        if not group.batch_ids:
+            print("\nAll files served from the findings cache.")
+            print(f"Report with: python {__file__} results {group.id}")
+        else:
+            print(f"\nPoll with: python {__file__} poll {group.id}")
 
-    return 0
+        return 0
 
 
 async def cmd_poll(args: argparse.Namespace) -> int:
     """Poll batch status until completion.
 
+    Without a batch ID, resumes every unfinished group in the registry.
+
     Args:
         args: CLI arguments
 
     Returns:
         Exit code (0 = success, 1 = failure)
     """
-    client = BatchAPIClient()
+    async with client_from_args(args) as client:
+        targets = [args.batch_id] if args.batch_id else client.registry.unfinished_group_ids()
+        if not targets:
+            print("No unfinished batches in the registry.")
+            return 0
+
+        try:
+            batch_ids = [b for target in targets for b in client.resolve_batch_ids(target)]
+        except ValueError as e:
+            print(f"ERROR: {e}")
+            return 1
+
+        print(f"Polling {', '.join(targets)} ({len(batch_ids)} batch(es))...")
+
+        try:
+            polled = await asyncio.gather(
+                *(
+                    client.complete_group(target, max_attempts=args.resubmit_attempts)
+                    if target.startswith("bgrp_")
+                    else client.poll_group([target])
+                    for target in targets
+                )
+            )
+            statuses = [status for group_statuses in polled for status in group_statuses]
 
-    print(f"Polling batch {args.batch_id}...")
+            print(f"\nBatch completed!")
+            print(f"Status: {', '.join(sorted({s.processing_status for s in statuses}))}")
+            print(f"Request counts:")
+            print(f"  Succeeded: {sum(s.request_counts.succeeded for s in statuses)}")
+            print(f"  Errored: {sum(s.request_counts.errored for s in statuses)}")
+            print(f"  Expired: {sum(s.request_counts.expired for s in statuses)}")
+            print(f"  Canceled: {sum(s.request_counts.canceled for s in statuses)}")
 
-    try:
-        batch_status = await client.poll_batch(
-            args.batch_id,
-            poll_interval=60,
-            max_wait_seconds=3600,
+            if all(s.results_url for s in statuses):
+                for target in targets:
+                    print(f"\nDownload with: python {__file__} results {target}")
+
+            return 0
+
+        except TimeoutError as e:
+            logger.error("poll_timeout", error=str(e))
+            print(f"ERROR: {e}")
+            return 1
+
+        except httpx.HTTPError as e:
+            logger.error("poll_failed", error=str(e))
+            print(f"ERROR: {e}")
+            print(f"Resume with: python {__file__} poll")
+            return 1
+
+
+def cached_findings_entries(
+    cache_hits: Iterable[tuple[str, str, list[dict[str, Any]]]],
+) -> list[tuple[str, dict[str, Any]]]:
+    """Turn (agent, file, findings) cache hits into parsed findings entries.
+
+    Args:
+        cache_hits: Findings served from the cache
+
+    Returns:
+        (agent name, parsed findings) pairs
+    """
+    return [
+        (
+            agent_name,
+            {
+                "status": "PASS",
+                "findings": cached,
+                "summary": summarize_findings(cached),
+                "score": None,
+                "coverage": None,
+            },
+        )
+        for agent_name, _file_path, cached in cache_hits
+    ]
+
+
+def collect_result(
+    client: BatchAPIClient,
+    result: BatchIndividualResult,
+    findings: list[tuple[str, dict[str, Any]]],
+    costs: CostTracker,
+    synchronous: bool = False,
+    stale_files: Sequence[str] = (),
+) -> dict[str, Any]:
+    """Parse one result, record its findings and cost, and print a summary.
+
+    Args:
+        client: Open batch API client
+        result: Batch or synchronous result
+        findings: (agent name, parsed findings) list to append to
+        costs: Cost tracker to update
+        synchronous: The result came from the synchronous Messages API
+        stale_files: Files changed since the request was built
+
+    Returns:
+        Parsed findings
+    """
+    parsed = client.parse_agent_findings(result)
+    agent_name, shard_index = client.agent_for_result(result.custom_id)
+    findings.append((agent_name, parsed))
+    client.record_result_cost(costs, result, agent_name, parsed.get("usage"), synchronous)
+    if stale_files:
+        parsed["stale_files"] = stale_files
+
+    label = agent_name if shard_index is None else f"{agent_name} [shard {shard_index}]"
+    if synchronous:
+        label += " (sync)"
+    print(f"\n{label}:")
+    print(f"  Status: {parsed['status']}")
+
+    if parsed["status"] == "PASS":
+        summary = parsed.get("summary", {})
+        print(f"  Total findings: {summary.get('total', 0)}")
+        print(f"  Critical: {summary.get('critical', 0)}")
+        print(f"  High: {summary.get('high', 0)}")
+    else:
+        print(f"  Error: {parsed.get('error', 'Unknown')}")
+
+    if stale_files:
+        print(f"  Stale: {len(stale_files)} file(s) changed since submission")
+
+    usage = parsed.get("usage")
+    if usage:
+        print(
+            f"  Cache read/write tokens: {usage['cache_read_input_tokens']}"
+            f"/{usage['cache_creation_input_tokens']}"
         )
 
-        print(f"\nBatch completed!")
-        print(f"Status: {batch_status.processing_status}")
-        print(f"Request counts:")
-        print(f"  Succeeded: {batch_status.request_counts.succeeded}")
-        print(f"  Errored: {batch_status.request_counts.errored}")
-        print(f"  Expired: {batch_status.request_counts.expired}")
-        print(f"  Canceled: {batch_status.request_counts.canceled}")
+    return parsed
 
-        if batch_status.results_url:
-            print(f"\nResults URL: {batch_status.results_url}")
-            print(f"Download with: python {__file__} --results {args.batch_id}")
 
-        return 0
+async def report_target(
+    client: BatchAPIClient,
+    target: str | None,
+    findings: list[tuple[str, dict[str, Any]]] | None = None,
+    costs: CostTracker | None = None,
+    agents: Sequence[AgentConfig] | None = None,
+) -> Path:
+    """Stream, parse and report the results of one batch or batch group.
 
-    except TimeoutError as e:
-        logger.error("poll_timeout", error=str(e))
-        print(f"ERROR: {e}")
-        return 1
+    Findings already collected elsewhere (e.g. from synchronous calls in
+    the same verification cycle) can be passed in and are reported
+    together with the batch results.
+
+    Args:
+        client: Open batch API client
+        target: Batch ID or ``bgrp_`` group ID (None = only the given findings)
+        findings: Findings collected before the batch results
+        costs: Cost tracker holding those findings' costs
+        agents: Agents covered by the report (default: from the registry)
+
+    Returns:
+        Path to the generated report
+
+    Raises:
+        ValueError: If the target is unknown or returned no results
+    """
+    findings = findings if findings is not None else []
+    costs = costs if costs is not None else CostTracker()
+    group = None
+
+    if target is not None:
+        print(f"Downloading results for {target}...")
+        batch_ids = client.resolve_batch_ids(target)
+        group_id = (
+            target if target.startswith("bgrp_") else client.registry.group_for_batch(target)
+        )
+        group = client.registry.get_group(group_id) if group_id else None
+        # Failed or stale requests replaced by a follow-up batch are not reported
+        superseded = client.registry.superseded_requests(group.id) if group else set()
+        current_hashes: dict[str, str | None] = {}
+
+        # Parse and display results as they stream in; only the parsed
+        # findings are kept, never the raw agent messages
+        downloaded = 0
+        async for result in client.iter_group_results(batch_ids):
+            if result.custom_id in superseded:
+                continue
+            stale = client.stale_files(result.custom_id, current_hashes)
+            parsed = collect_result(client, result, findings, costs, stale_files=stale)
+            client.cache_result_findings(result.custom_id, parsed)
+            downloaded += 1
+
+        print(f"\nResults downloaded: {downloaded}")
+
+    # Merge findings served from the cache at submission time
+    if group is not None:
+        cache_hits = client.registry.cached_findings(group.id)
+        findings.extend(cached_findings_entries(cache_hits))
+        if cache_hits:
+            print(f"Cached file findings merged: {len(cache_hits)}")
+
+    if not findings:
+        raise ValueError(f"{target or 'Verification cycle'} returned no results")
+
+    if agents is None:
+        # Agents come from the registry; fall back to the agents seen in results
+        agent_names = set(group.agents) if group else {name for name, _ in findings}
+        agents = [a for a in ALL_AGENTS if a.name in agent_names]
+
+    report_id = target or f"sync_{uuid.uuid4().hex[:12]}"
+    report_path = client.generate_report(
+        report_id,
+        agents,
+        client.merge_agent_findings(findings),
+        costs,
+    )
+    costs.write_ledger(client.cost_ledger_path, group.id if group else None)
+    if group is not None:
+        client.registry.mark_reported(group.id)
+
+    print(
+        f"\nCost: ${costs.cost:.4f} (batch ${costs.batch_cost:.4f}, "
+        f"synchronous equivalent ${costs.sync_cost:.4f})"
+    )
+
+    print(f"\nReport saved to: {report_path}")
+    return report_path
 
 
 async def cmd_results(args: argparse.Namespace) -> int:
     """Download and parse batch results.
 
+    Without a batch ID, reports every ended-but-unreported group in the
+    registry.
+
     Args:
         args: CLI arguments
 
     Returns:
         Exit code (0 = success, 1 = failure)
     """
-    client = BatchAPIClient()
+    async with client_from_args(args) as client:
+        targets = [args.batch_id] if args.batch_id else client.registry.unreported_group_ids()
+        if not targets:
+            print("No ended, unreported batches in the registry.")
+            return 0
+
+        try:
+            for target in targets:
+                await report_target(client, target)
+            return 0
+
+        except Exception as e:
+            logger.error("download_failed", error=str(e))
+            print(f"ERROR: {e}")
+            return 1
+
 
-    print(f"Downloading results for batch {args.batch_id}...")
+async def cmd_show(args: argparse.Namespace) -> int:
+    """Print one archived result, or list archived results by agent/file.
 
+    Args:
+        args: CLI arguments
+
+    Returns:
+        Exit code (0 = success, 1 = not found)
+    """
+    # Reads only the local archive: no API key or connection needed
+    offline = bool(args.replay or args.synthetic)
+    archive = ResultsArchive(state_dir(Path.cwd(), offline) / "results-archive")
     try:
-        results = await client.download_results(args.batch_id)
+        if args.custom_id:
+            line = archive.get(args.custom_id)
+            if line is None:
+                print(f"ERROR: {args.custom_id} is not in the results archive")
+                return 1
+            print(json.dumps(json.loads(line), indent=2))
+            return 0
+
+        matches = archive.find(agent=args.agent, file_path=args.file)
+        if not matches:
+            print("No archived results match.")
+            return 1
+        for custom_id, batch_id, result_type in matches:
+            print(f"{custom_id}  {batch_id}  {result_type}")
+        return 0
+    finally:
+        archive.close()
 
-        print(f"\nResults downloaded: {len(results)}")
 
-        # Parse and display results
-        for result in results:
-            parsed = client.parse_agent_findings(result)
-            agent_name = result.custom_id.rsplit("-", 1)[0]
+def validate_agent_dag(agents: Sequence[AgentConfig]) -> None:
+    """Check that agent dependencies are known and acyclic.
 
-            print(f"\n{agent_name}:")
-            print(f"  Status: {parsed['status']}")
+    Args:
+        agents: Agents to schedule
 
-            if parsed["status"] == "PASS":
-                summary = parsed.get("summary", {})
-                print(f"  Total findings: {summary.get('total', 0)}")
-                print(f"  Critical: {summary.get('critical', 0)}")
-                print(f"  High: {summary.get('high', 0)}")
-            else:
-                print(f"  Error: {parsed.get('error', 'Unknown')}")
+    Raises:
+        ValueError: On an unknown dependency or a dependency cycle
+    """
+    names = {agent.name for agent in agents}
+    for agent in agents:
+        unknown = set(agent.depends_on) - names
+        if unknown:
+            raise ValueError(f"{agent.name} depends on unknown agents {sorted(unknown)}")
+
+    done: set[str] = set()
+    remaining = list(agents)
+    while remaining:
+        ready = [a for a in remaining if set(a.depends_on) <= done]
+        if not ready:
+            raise ValueError(
+                f"Dependency cycle among {sorted(a.name for a in remaining)}"
+            )
+        done.update(a.name for a in ready)
+        remaining = [a for a in remaining if a.name not in done]
+
+
+async def run_verification_dag(
+    client: BatchAPIClient,
+    agents: Sequence[AgentConfig],
+    pending_files: list[str],
+    context_budget_tokens: int | None = None,
+    use_cache: bool = True,
+    prompt_caching: bool = True,
+    max_wait_seconds: int = 3600,
+    deadline_seconds: float | None = None,
+    urgent_agents: Collection[str] = (),
+    sync_concurrency: int = SYNC_MAX_CONCURRENCY,
+    resubmit_attempts: int = RESUBMIT_MAX_ATTEMPTS,
+) -> list[Path]:
+    """Submit, poll and report agents as a dependency DAG.
+
+    Every agent whose dependencies are reported is started immediately,
+    one stage per wave among the ready agents. Within a stage, urgent
+    agents (and every agent, if batch turnaround would miss the deadline)
+    run as concurrent synchronous Messages calls while the rest go to one
+    batch group; both halves are merged into a single report. Stages run
+    concurrently, and each is reported as soon as it ends, which may
+    release dependent agents.
 
-        # Generate report
-        agents = WAVE_1_AGENTS if "best-practices" in results[0].custom_id else WAVE_2_AGENTS
+    Args:
+        client: Open batch API client
+        agents: Agents to run
+        pending_files: Files to verify
+        context_budget_tokens: Per-request file token budget (None = no packing)
+        use_cache: Skip files with cached findings
+        prompt_caching: Use the cache-friendly request layout
+        max_wait_seconds: Maximum seconds to wait for each group
+        deadline_seconds: Seconds allowed for the whole cycle (None = no deadline)
+        urgent_agents: Agent names that always run synchronously
+        sync_concurrency: Maximum concurrent synchronous calls per stage
+        resubmit_attempts: Follow-up batches per failed request
 
-        # Estimate costs (placeholder - actual costs from API response)
-        total_cost = 0.50  # Placeholder
-        sync_cost = 1.00  # Placeholder
+    Returns:
+        Report paths in completion order
 
-        report_path = client.generate_report(
-            args.batch_id,
-            agents,
-            results,
-            total_cost,
-            sync_cost,
+    Raises:
+        TimeoutError: If a batch group misses max_wait_seconds or the deadline
+    """
+    validate_agent_dag(agents)
+    loop = asyncio.get_running_loop()
+    deadline_at = None if deadline_seconds is None else loop.time() + deadline_seconds
+    historical_seconds = client.load_poll_history()
+
+    async def run_batch(stage: list[AgentConfig]) -> str | None:
+        if not stage:
+            return None
+        group = await client.create_batch(
+            stage,
+            pending_files,
+            context_budget_tokens=context_budget_tokens,
+            use_cache=use_cache,
+            prompt_caching=prompt_caching,
+        )
+        print(
+            f"Submitted {group.id} ({', '.join(a.name for a in stage)}): "
+            f"{len(group.batch_ids)} batch(es)"
+        )
+        wait = max_wait_seconds
+        if deadline_at is not None:
+            wait = min(wait, max(deadline_at - loop.time(), 0))
+        await client.complete_group(
+            group.id, max_wait_seconds=wait, max_attempts=resubmit_attempts
+        )
+        return group.id
+
+    async def run_sync(stage: list[AgentConfig]) -> SyncRun:
+        if not stage:
+            return SyncRun()
+        timeout = SYNC_REQUEST_TIMEOUT_SECONDS
+        if deadline_at is not None:
+            timeout = min(timeout, max(deadline_at - loop.time(), 1.0))
+        print(f"Running synchronously: {', '.join(a.name for a in stage)}")
+        return await client.run_synchronous(
+            stage,
+            pending_files,
+            timeout_seconds=timeout,
+            context_budget_tokens=context_budget_tokens,
+            use_cache=use_cache,
+            prompt_caching=prompt_caching,
+            max_concurrency=sync_concurrency,
+        )
+
+    async def run_group(stage: list[AgentConfig]) -> Path:
+        remaining = None if deadline_at is None else deadline_at - loop.time()
+        sync_agents, batch_agents = plan_dispatch(
+            stage, urgent_agents, remaining, historical_seconds
+        )
+        sync_run, group_id = await asyncio.gather(
+            run_sync(sync_agents), run_batch(batch_agents)
         )
 
-        print(f"\nReport saved to: {report_path}")
+        findings: list[tuple[str, dict[str, Any]]] = []
+        costs = CostTracker()
+        for result in sync_run.results:
+            parsed = collect_result(client, result, findings, costs, synchronous=True)
+            agent_name, _ = parse_custom_id(result.custom_id)
+            client.cache_file_findings(
+                result.custom_id,
+                agent_name,
+                sync_run.files_by_custom_id[result.custom_id],
+                sync_run.file_hashes,
+                parsed,
+            )
+        findings.extend(cached_findings_entries(sync_run.cache_hits))
+
+        return await report_target(client, group_id, findings, costs, agents=stage)
+
+    remaining = {agent.name: agent for agent in agents}
+    done: set[str] = set()
+    running: dict[asyncio.Task[Path], list[str]] = {}
+    reports: list[Path] = []
+
+    try:
+        while remaining or running:
+            ready = [a for a in remaining.values() if set(a.depends_on) <= done]
+            for wave in sorted({a.wave for a in ready}):
+                stage = [a for a in ready if a.wave == wave]
+                for agent in stage:
+                    del remaining[agent.name]
+                task = asyncio.create_task(run_group(stage))
+                running[task] = [a.name for a in stage]
+
+            finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in finished:
+                names = running.pop(task)
+                reports.append(task.result())
+                done.update(names)
+                logger.info("dag_stage_completed", agents=names)
+    finally:
+        for task in running:
+            task.cancel()
+
+    return reports
+
+
+async def cmd_run(args: argparse.Namespace) -> int:
+    """Run both verification waves end to end as a dependency DAG.
+
+    Args:
+        args: CLI arguments
+
+    Returns:
+        Exit code (0 = success, 1 = failure)
+    """
+    async with client_from_args(args) as client:
+        pending_files = await client.get_pending_files()
+        if not pending_files:
+            logger.info("no_pending_files")
+            print("No pending files to verify.")
+            return 0
+
+        print(f"Running verification for {len(pending_files)} pending file(s)...")
+
+        try:
+            reports = await run_verification_dag(
+                client,
+                ALL_AGENTS,
+                pending_files,
+                context_budget_tokens=args.context_budget,
+                use_cache=not args.no_cache,
+                prompt_caching=not args.no_prompt_cache,
+                max_wait_seconds=args.max_wait,
+                deadline_seconds=args.deadline,
+                urgent_agents=set(args.sync_agents),
+                sync_concurrency=args.sync_concurrency,
+                resubmit_attempts=args.resubmit_attempts,
+            )
+        except (TimeoutError, ValueError, httpx.HTTPError) as e:
+            logger.error("run_failed", error=str(e))
+            print(f"ERROR: {e}")
+            print(f"Resume with: python {__file__} poll && python {__file__} results")
+            return 1
+
+        print(f"\nVerification complete: {len(reports)} report(s)")
+        for report_path in reports:
+            print(f"  - {report_path}")
 
         return 0
 
-    except Exception as e:
-        logger.error("download_failed", error=str(e))
-        print(f"ERROR: {e}")
-        return 1
+
+def add_submission_options(parser: argparse.ArgumentParser) -> None:
+    """Add the request-building options shared by submit and run.
+
+    Args:
+        parser: Subcommand parser
+    """
+    parser.add_argument(
+        "--context-budget",
+        type=int,
+        default=None,
+        metavar="TOKENS",
+        help="Bin-pack files into several requests per agent, each under TOKENS",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-verify every file even if its findings are cached",
+    )
+    parser.add_argument(
+        "--no-prompt-cache",
+        action="store_true",
+        help="Send instructions and file list as one user message (no cached prefix)",
+    )
+
+
+def add_resubmit_option(parser: argparse.ArgumentParser) -> None:
+    """Add the failed-request resubmission option shared by poll and run.
+
+    Args:
+        parser: Subcommand parser
+    """
+    parser.add_argument(
+        "--resubmit-attempts",
+        type=int,
+        default=RESUBMIT_MAX_ATTEMPTS,
+        metavar="N",
+        help="Follow-up batches per errored/expired/canceled request "
+        f"(0 = never resubmit, default: {RESUBMIT_MAX_ATTEMPTS})",
+    )
 
 
 # ============================================================================
@@ -939,6 +3556,104 @@ def main() -> int:
     parser = argparse.ArgumentParser(
         description="Batch API verification for Claude Code agents"
     )
+    parser.add_argument(
+        "--no-http2",
+        action="store_true",
+        help="Disable HTTP/2 and use HTTP/1.1 for the shared connection",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=30.0,
+        help="Per-request timeout in seconds (default: 30)",
+    )
+    parser.add_argument(
+        "--max-connections",
+        type=int,
+        default=10,
+        help="Maximum pooled connections (default: 10)",
+    )
+    parser.add_argument(
+        "--max-keepalive-connections",
+        type=int,
+        default=5,
+        help="Maximum idle keep-alive connections (default: 5)",
+    )
+    parser.add_argument(
+        "--keepalive-expiry",
+        type=float,
+        default=120.0,
+        help="Seconds an idle connection is kept open (default: 120)",
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=4,
+        help="Retries for 429/5xx responses and connection errors (default: 4)",
+    )
+    parser.add_argument(
+        "--serializer",
+        choices=sorted(SERIALIZERS),
+        default=os.getenv("BATCH_SERIALIZER", PydanticSerializer.name),
+        help="Request/result serialization backend (default: $BATCH_SERIALIZER or pydantic)",
+    )
+    parser.add_argument(
+        "--structured-output",
+        action="store_true",
+        help="Return findings through a forced tool call instead of free-text JSON",
+    )
+    parser.add_argument(
+        "--fixed-max-tokens",
+        action="store_true",
+        help="Always request each agent's configured max_tokens (no adaptive budget)",
+    )
+    parser.add_argument(
+        "--metrics",
+        type=Path,
+        metavar="PATH",
+        help="Write per-endpoint HTTP latency/size metrics on exit (.prom = Prometheus text, else JSON)",
+    )
+    offline = parser.add_mutually_exclusive_group()
+    offline.add_argument(
+        "--record",
+        type=Path,
+        metavar="CASSETTE",
+        help="Record every API exchange to a JSONL cassette",
+    )
+    offline.add_argument(
+        "--replay",
+        type=Path,
+        metavar="CASSETTE",
+        help="Replay a recorded cassette instead of calling the API "
+        "(state kept under .build/offline/)",
+    )
+    offline.add_argument(
+        "--synthetic",
+        action="store_true",
+        help="Serve fabricated API responses for offline benchmarking "
+        "(state kept under .build/offline/)",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        metavar="SECONDS",
+        help="Latency injected per response in --replay/--synthetic mode",
+    )
+    parser.add_argument(
+        "--synthetic-polls",
+        type=int,
+        default=3,
+        metavar="N",
+        help="Status polls before a --synthetic batch ends (default: 3)",
+    )
+    parser.add_argument(
+        "--synthetic-error-rate",
+        type=float,
+        default=0.0,
+        metavar="FRACTION",
+        help="Fraction of --synthetic results returned as errors (default: 0.0)",
+    )
     subparsers = parser.add_subparsers(dest="command", required=True)
 
     # Submit command
@@ -950,14 +3665,69 @@ def main() -> int:
         required=True,
         help="Wave number (1 or 2)",
     )
+    add_submission_options(submit_parser)
 
     # Poll command
     poll_parser = subparsers.add_parser("poll", help="Poll batch status")
-    poll_parser.add_argument("batch_id", help="Batch ID to poll")
+    poll_parser.add_argument(
+        "batch_id",
+        nargs="?",
+        help="Batch ID or batch group ID to poll (omit to resume unfinished groups)",
+    )
+    add_resubmit_option(poll_parser)
 
     # Results command
     results_parser = subparsers.add_parser("results", help="Download batch results")
-    results_parser.add_argument("batch_id", help="Batch ID to download results for")
+    results_parser.add_argument(
+        "batch_id",
+        nargs="?",
+        help="Batch ID or batch group ID to download (omit to report ended groups)",
+    )
+
+    # Show command
+    show_parser = subparsers.add_parser(
+        "show", help="Read archived results without re-downloading"
+    )
+    show_parser.add_argument("custom_id", nargs="?", help="Print this result")
+    show_parser.add_argument("--agent", help="List archived results of this agent")
+    show_parser.add_argument("--file", help="List archived results covering this file")
+
+    # Run command
+    run_parser = subparsers.add_parser(
+        "run", help="Submit, poll and report both waves end to end"
+    )
+    add_submission_options(run_parser)
+    add_resubmit_option(run_parser)
+    run_parser.add_argument(
+        "--max-wait",
+        type=int,
+        default=3600,
+        metavar="SECONDS",
+        help="Maximum seconds to wait for each batch group (default: 3600)",
+    )
+    run_parser.add_argument(
+        "--deadline",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="Deadline for the whole cycle; agents whose batch turnaround "
+        "would miss it run synchronously",
+    )
+    run_parser.add_argument(
+        "--sync",
+        dest="sync_agents",
+        action="append",
+        default=[],
+        choices=sorted(AGENTS_BY_NAME),
+        metavar="AGENT",
+        help="Always run AGENT through synchronous Messages calls (repeatable)",
+    )
+    run_parser.add_argument(
+        "--sync-concurrency",
+        type=int,
+        default=SYNC_MAX_CONCURRENCY,
+        help=f"Maximum concurrent synchronous calls (default: {SYNC_MAX_CONCURRENCY})",
+    )
 
     args = parser.parse_args()
 
@@ -968,6 +3738,10 @@ def main() -> int:
         return asyncio.run(cmd_poll(args))
     elif args.command == "results":
         return asyncio.run(cmd_results(args))
+    elif args.command == "show":
+        return asyncio.run(cmd_show(args))
+    elif args.command == "run":
+        return asyncio.run(cmd_run(args))
     else:
         parser.print_help()
         return 1
@@ -0,0 +1,126 @@
+"""
+Pytest configuration for submit-batch-verification.py unit tests.
+
+The script name is not a valid module name, so it is loaded from its path
+once and registered as ``submit_batch_verification`` for the test modules;
+its directory is put on sys.path for the modules it imports. Every test
+runs in its own project directory, since the client keeps its registry,
+caches and logs under the working directory.
+"""
+
+import asyncio
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPT_PATH = Path(__file__).resolve().parent.parent / "submit-batch-verification.py"
+
+# The script imports its sibling modules (batch_models, batch_storage, ...)
+sys.path.insert(0, str(SCRIPT_PATH.parent))
+
+if "submit_batch_verification" not in sys.modules:
+    spec = importlib.util.spec_from_file_location("submit_batch_verification", SCRIPT_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["submit_batch_verification"] = module
+    spec.loader.exec_module(module)
+
+
+@pytest.fixture
+def project(tmp_path: Path, monkeypatch) -> Path:
+    """Empty project directory, made the working directory."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+    return tmp_path
+
+
+@pytest.fixture
+def make_sources(project: Path):
+    """Return a factory writing source files under the project.
+
+    The factory takes {relative path: content} and returns the written
+    paths as strings, in the same order.
+    """
+
+    def factory(sources: dict[str, str]) -> list[str]:
+        paths = []
+        for name, content in sources.items():
+            path = project / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+            paths.append(str(path))
+        return paths
+
+    return factory
+
+
+@pytest.fixture
+def mark_pending(project: Path):
+    """Return a factory writing files under src/ with their pending markers.
+
+    The factory takes {file name: content} and returns the source paths,
+    as get_pending_files() lists them.
+    """
+
+    def factory(sources: dict[str, str]) -> list[str]:
+        pending_dir = project / ".build" / "checkpoints" / "pending"
+        pending_dir.mkdir(parents=True, exist_ok=True)
+        (project / "src").mkdir(exist_ok=True)
+        paths = []
+        for name, content in sources.items():
+            path = project / "src" / name
+            path.write_text(content)
+            (pending_dir / f"{name}.pending").touch()
+            paths.append(str(path))
+        return paths
+
+    return factory
+
+
+@pytest.fixture
+def cli(project: Path, fast_polling, monkeypatch):
+    """Return a runner for the script's command line; it returns the exit code."""
+    import submit_batch_verification
+
+    def run(*argv: str) -> int:
+        monkeypatch.setattr(sys, "argv", ["submit-batch-verification.py", *argv])
+        return submit_batch_verification.main()
+
+    return run
+
+
+@pytest.fixture
+def fast_polling(monkeypatch) -> None:
+    """Poll again almost at once and resubmit without backoff."""
+    import submit_batch_verification
+
+    monkeypatch.setattr(submit_batch_verification, "MIN_POLL_INTERVAL", 0.0)
+    monkeypatch.setattr(submit_batch_verification, "MAX_POLL_INTERVAL", 0.01)
+    monkeypatch.setattr(submit_batch_verification, "RESUBMIT_BACKOFF_SECONDS", 0.0)
+
+
+@pytest.fixture
+def synthetic_client(project: Path, fast_polling):
+    """Return a factory for offline clients on a fresh SyntheticTransport.
+
+    Keyword arguments go to SyntheticTransport except ``client_kwargs``,
+    which go to BatchAPIClient. Polling is fast (see fast_polling). Open
+    clients with ``async with`` inside the test's event loop; teardown
+    only closes their databases.
+    """
+    from submit_batch_verification import BatchAPIClient, SyntheticTransport
+
+    clients = []
+
+    def factory(client_kwargs: dict | None = None, **transport_kwargs) -> BatchAPIClient:
+        transport_kwargs.setdefault("polls_to_complete", 1)
+        client = BatchAPIClient(
+            transport=SyntheticTransport(**transport_kwargs), **(client_kwargs or {})
+        )
+        clients.append(client)
+        return client
+
+    yield factory
+    for client in clients:
+        asyncio.run(client.aclose())
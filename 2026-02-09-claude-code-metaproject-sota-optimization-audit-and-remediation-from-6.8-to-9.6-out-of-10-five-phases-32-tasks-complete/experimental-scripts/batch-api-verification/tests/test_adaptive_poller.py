@@ -0,0 +1,167 @@
+"""
+Unit tests for the multi-batch adaptive poller
+
+Tests cover:
+- BatchProgress.eta_seconds from the completion rate, from history, or unknown
+- next_poll_delay: ETA fraction, fallback interval, poll bounds
+- Poll history: ended batches only, median of the recent window
+- poll_group: batches on their own schedules, results in batch_ids order,
+  timeout
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import submit_batch_verification
+from submit_batch_verification import (
+    ETA_POLL_FRACTION,
+    MAX_POLL_INTERVAL,
+    MIN_POLL_INTERVAL,
+    POLL_HISTORY_WINDOW,
+    WAVE_1_AGENTS,
+    BatchAPIClient,
+    BatchProgress,
+    BatchStatus,
+    SyntheticTransport,
+)
+
+
+def timestamp(seconds_ago: float = 0.0) -> str:
+    moment = datetime.now(tz=timezone.utc) - timedelta(seconds=seconds_ago)
+    return moment.isoformat().replace("+00:00", "Z")
+
+
+def status(
+    done: int,
+    processing: int,
+    created_at: str | None = None,
+    ended_at: str | None = None,
+) -> BatchStatus:
+    return BatchStatus(
+        id="msgbatch_1",
+        type="message_batch",
+        processing_status="ended" if ended_at else "in_progress",
+        request_counts={"processing": processing, "succeeded": done},
+        created_at=created_at or timestamp(),
+        expires_at=timestamp(-86400),
+        ended_at=ended_at,
+    )
+
+
+class TestEtaSeconds:
+    def test_from_completion_rate(self) -> None:
+        progress = BatchProgress(batch_id="msgbatch_1")
+        progress.observe(status(10, 90), now=0.0)
+        progress.observe(status(30, 70), now=10.0)
+        # 2 requests/s with 70 left
+        assert progress.eta_seconds(None) == 35.0
+        assert progress.total == 100 and progress.poll_count == 2
+
+    def test_from_history_without_progress(self) -> None:
+        progress = BatchProgress(batch_id="msgbatch_1")
+        progress.observe(status(0, 10, created_at=timestamp(100)), now=0.0)
+        progress.observe(status(0, 10, created_at=timestamp(100)), now=5.0)
+        assert progress.eta_seconds(300.0) == pytest.approx(200.0, abs=5)
+        assert progress.eta_seconds(50.0) == 0.0
+
+    def test_unknown(self) -> None:
+        progress = BatchProgress(batch_id="msgbatch_1")
+        assert progress.eta_seconds(300.0) is None
+        progress.observe(status(0, 10), now=0.0)
+        assert progress.eta_seconds(None) is None
+
+
+class TestNextPollDelay:
+    @pytest.fixture
+    def client(self, project):
+        client = BatchAPIClient(transport=SyntheticTransport())
+        yield client
+        asyncio.run(client.aclose())
+
+    def progress(self, eta: float | None, monkeypatch) -> BatchProgress:
+        progress = BatchProgress(batch_id="msgbatch_1")
+        monkeypatch.setattr(progress, "eta_seconds", lambda historical: eta)
+        return progress
+
+    @pytest.mark.parametrize(
+        ("eta", "expected"),
+        [
+            (100.0, 100.0 * ETA_POLL_FRACTION),
+            (None, 60.0),
+            (1.0, MIN_POLL_INTERVAL),
+            (10 * MAX_POLL_INTERVAL, MAX_POLL_INTERVAL),
+        ],
+        ids=["eta", "fallback", "min", "max"],
+    )
+    def test_delay(self, client, monkeypatch, eta, expected) -> None:
+        delays = [
+            client.next_poll_delay(self.progress(eta, monkeypatch), 60.0, None)
+            for _ in range(50)
+        ]
+        assert all(0.9 * expected <= d <= 1.1 * expected for d in delays)
+
+
+class TestPollHistory:
+    def test_median_of_ended_batches(self, synthetic_client) -> None:
+        client = synthetic_client()
+        assert client.load_poll_history() is None
+        client.record_poll_history(status(0, 10))
+        for duration in (100, 200, 600):
+            created = datetime(2026, 2, 8, 12, tzinfo=timezone.utc)
+            ended = created + timedelta(seconds=duration)
+            client.record_poll_history(
+                status(10, 0, created_at=created.isoformat(), ended_at=ended.isoformat())
+            )
+        assert client.load_poll_history() == 200.0
+
+    def test_recent_window(self, synthetic_client) -> None:
+        client = synthetic_client()
+        client.poll_history_path.parent.mkdir(parents=True, exist_ok=True)
+        lines = ['{"duration_seconds": 1000}'] * POLL_HISTORY_WINDOW
+        lines += ["not json"] + ['{"duration_seconds": 10}'] * POLL_HISTORY_WINDOW
+        client.poll_history_path.write_text("\n".join(lines) + "\n")
+        assert client.load_poll_history() == 10.0
+
+
+class TestPollGroup:
+    def test_batches_on_own_schedule(self, synthetic_client, make_sources, monkeypatch) -> None:
+        files = make_sources({"a.py": "a = 1\n"})
+        client = synthetic_client(polls_to_complete=3)
+        polled = []
+        get_batch_status = client.get_batch_status
+
+        async def counting_status(batch_id):
+            polled.append(batch_id)
+            return await get_batch_status(batch_id)
+
+        monkeypatch.setattr(client, "get_batch_status", counting_status)
+
+        async def scenario():
+            async with client:
+                slow = await client.create_batch(WAVE_1_AGENTS[:1], files)
+                quick = await client.create_batch(WAVE_1_AGENTS[1:2], files)
+                # Already polled twice elsewhere, so it ends on its first poll here
+                client.transport._batches[quick.batch_ids[0]]["polls"] = 2
+                batch_ids = [*slow.batch_ids, *quick.batch_ids]
+                return batch_ids, await client.poll_group(batch_ids)
+
+        batch_ids, statuses = asyncio.run(scenario())
+        assert [s.id for s in statuses] == batch_ids
+        assert all(s.processing_status == "ended" for s in statuses)
+        assert polled.count(batch_ids[1]) == 1
+        assert polled.count(batch_ids[0]) > 1
+
+    def test_timeout(self, synthetic_client, make_sources, monkeypatch) -> None:
+        monkeypatch.setattr(submit_batch_verification, "MIN_POLL_INTERVAL", 0.01)
+        files = make_sources({"a.py": "a = 1\n"})
+        client = synthetic_client(polls_to_complete=10_000)
+
+        async def scenario():
+            async with client:
+                group = await client.create_batch(WAVE_1_AGENTS[:1], files)
+                with pytest.raises(TimeoutError, match="did not complete within 0.05s"):
+                    await client.poll_group(group.batch_ids, max_wait_seconds=0.05)
+
+        asyncio.run(scenario())
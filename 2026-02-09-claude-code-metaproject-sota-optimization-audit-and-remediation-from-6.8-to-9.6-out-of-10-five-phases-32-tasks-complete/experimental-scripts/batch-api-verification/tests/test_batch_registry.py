@@ -0,0 +1,212 @@
+"""
+Unit tests for BatchRegistry (durable submit/poll/results state)
+
+Tests cover:
+- Groups, batches and custom_id mappings survive reopening the database
+- Unfinished and unreported group queries follow batch status updates
+- Resubmission attempts and per-request file hashes
+- Migration of registries created before the attempt/retry columns
+- CLI poll and results resume from the registry without batch IDs
+"""
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from batch_models import BatchStatus, RequestCounts
+from batch_storage import BatchRegistry
+
+
+def status(batch_id: str, processing_status: str = "in_progress", **kwargs) -> BatchStatus:
+    return BatchStatus(
+        id=batch_id,
+        type="message_batch",
+        processing_status=processing_status,
+        request_counts=RequestCounts(**kwargs),
+        created_at="2026-01-01T00:00:00Z",
+        expires_at="2026-01-02T00:00:00Z",
+        ended_at="2026-01-01T01:00:00Z" if processing_status == "ended" else None,
+        results_url=(
+            f"https://api.example/{batch_id}/results" if processing_status == "ended" else None
+        ),
+    )
+
+
+@pytest.fixture
+def db_path(tmp_path: Path) -> Path:
+    return tmp_path / "state" / "batch-registry.sqlite3"
+
+
+@pytest.fixture
+def registry(db_path: Path):
+    registry = BatchRegistry(db_path)
+    yield registry
+    registry.close()
+
+
+def record_two_batches(registry: BatchRegistry) -> None:
+    registry.record_group(
+        "bgrp_01", 1, ["security-auditor", "code-reviewer"], {"a.py": "ha", "b.py": "hb"}, 3
+    )
+    registry.record_batch(
+        "bgrp_01",
+        status("msgbatch_1"),
+        [
+            ("security-auditor-0", "security-auditor", 0, ["a.py"]),
+            ("security-auditor-1", "security-auditor", 1, ["b.py"]),
+        ],
+    )
+    registry.record_batch(
+        "bgrp_01",
+        status("msgbatch_2"),
+        [("code-reviewer", "code-reviewer", None, ["a.py", "b.py"])],
+    )
+
+
+class TestRecording:
+    def test_survives_reopen(self, db_path: Path) -> None:
+        registry = BatchRegistry(db_path)
+        record_two_batches(registry)
+        registry.close()
+
+        reopened = BatchRegistry(db_path)
+        try:
+            group = reopened.get_group("bgrp_01")
+            assert group.wave == 1
+            assert group.agents == ["security-auditor", "code-reviewer"]
+            assert group.batch_ids == ["msgbatch_1", "msgbatch_2"]
+            assert group.request_count == 3
+            assert reopened.lookup_request("security-auditor-1") == (
+                "security-auditor",
+                1,
+                ["b.py"],
+            )
+            assert reopened.batch_for_request("code-reviewer") == "msgbatch_2"
+            assert reopened.group_for_batch("msgbatch_2") == "bgrp_01"
+            assert reopened.file_hashes("bgrp_01") == {"a.py": "ha", "b.py": "hb"}
+        finally:
+            reopened.close()
+
+    def test_unknown_ids(self, registry: BatchRegistry) -> None:
+        assert registry.get_group("bgrp_ff") is None
+        assert registry.lookup_request("missing") is None
+        assert registry.batch_processing_status("missing") is None
+        assert registry.request_file_hashes("missing") == {}
+
+    def test_cached_findings(self, registry: BatchRegistry) -> None:
+        registry.record_group("bgrp_02", 1, ["security-auditor"], {"a.py": "ha"}, 0)
+        findings = [{"file": "a.py", "line": 3, "severity": "HIGH"}]
+        registry.record_cached_findings("bgrp_02", [("security-auditor", "a.py", findings)])
+        assert registry.cached_findings("bgrp_02") == [("security-auditor", "a.py", findings)]
+
+
+class TestGroupState:
+    def test_unfinished_until_every_batch_ends(self, registry: BatchRegistry) -> None:
+        record_two_batches(registry)
+        assert registry.unfinished_group_ids() == ["bgrp_01"]
+        assert registry.unreported_group_ids() == []
+
+        registry.update_batch(status("msgbatch_1", "ended", succeeded=2))
+        assert registry.unfinished_group_ids() == ["bgrp_01"]
+        assert registry.results_url("msgbatch_1") == "https://api.example/msgbatch_1/results"
+
+        registry.update_batch(status("msgbatch_2", "ended", succeeded=1))
+        assert registry.unfinished_group_ids() == []
+        assert registry.unreported_group_ids() == ["bgrp_01"]
+
+        registry.mark_reported("bgrp_01")
+        assert registry.unreported_group_ids() == []
+
+    def test_fully_cached_group_is_unreported(self, registry: BatchRegistry) -> None:
+        registry.record_group("bgrp_03", 1, ["security-auditor"], {"a.py": "ha"}, 0)
+        assert registry.unreported_group_ids() == ["bgrp_03"]
+
+    def test_group_without_batches_yet_is_not_reported(self, registry: BatchRegistry) -> None:
+        # Submission crashed after the group was recorded
+        registry.record_group("bgrp_04", 1, ["security-auditor"], {"a.py": "ha"}, 1)
+        assert registry.unreported_group_ids() == []
+
+
+class TestResubmission:
+    def test_attempts_follow_retry_chain(self, registry: BatchRegistry) -> None:
+        record_two_batches(registry)
+        registry.record_batch(
+            "bgrp_01",
+            status("msgbatch_3"),
+            [("security-auditor-0-r1", "security-auditor", 0, ["a.py"])],
+            retry_of={"security-auditor-0-r1": "security-auditor-0"},
+        )
+        registry.record_batch(
+            "bgrp_01",
+            status("msgbatch_4"),
+            [("security-auditor-0-r2", "security-auditor", 0, ["a.py"])],
+            retry_of={"security-auditor-0-r2": "security-auditor-0-r1"},
+        )
+        assert registry.request_attempt("security-auditor-0") == 0
+        assert registry.request_attempt("security-auditor-0-r2") == 2
+        assert registry.superseded_requests("bgrp_01") == {
+            "security-auditor-0",
+            "security-auditor-0-r1",
+        }
+        assert registry.group_request_ids("bgrp_01")[-1] == "security-auditor-0-r2"
+
+    def test_request_file_hashes(self, registry: BatchRegistry) -> None:
+        record_two_batches(registry)
+        # Without hashes of its own a request falls back to the group's
+        assert registry.request_file_hashes("code-reviewer") == {"a.py": "ha", "b.py": "hb"}
+        registry.record_batch(
+            "bgrp_01",
+            status("msgbatch_3"),
+            [("code-reviewer-r1", "code-reviewer", None, ["a.py"])],
+            retry_of={"code-reviewer-r1": "code-reviewer"},
+            file_hashes={"a.py": "ha2", "b.py": "hb2"},
+        )
+        assert registry.request_file_hashes("code-reviewer-r1") == {"a.py": "ha2"}
+
+
+def test_migrates_old_schema(db_path: Path) -> None:
+    db_path.parent.mkdir(parents=True)
+    conn = sqlite3.connect(db_path)
+    conn.executescript(
+        """
+        CREATE TABLE requests (
+            custom_id TEXT PRIMARY KEY,
+            batch_id TEXT NOT NULL,
+            agent TEXT NOT NULL,
+            shard INTEGER,
+            files TEXT NOT NULL
+        );
+        INSERT INTO requests VALUES ('old', 'msgbatch_0', 'code-reviewer', NULL, '["a.py"]');
+        """
+    )
+    conn.close()
+
+    registry = BatchRegistry(db_path)
+    try:
+        assert registry.lookup_request("old") == ("code-reviewer", None, ["a.py"])
+        assert registry.request_attempt("old") == 0
+    finally:
+        registry.close()
+
+
+def test_cli_resumes_from_registry(cli, mark_pending, project: Path, capsys) -> None:
+    mark_pending({"app.py": "def f():\n    return 1\n"})
+    assert cli("--synthetic", "submit", "--wave", "1") == 0
+    submitted = capsys.readouterr().out
+    assert "Batch group created: bgrp_" in submitted
+
+    # Later invocations find the group through the registry alone
+    assert cli("--synthetic", "poll") == 0
+    assert "Batch completed!" in capsys.readouterr().out
+    assert cli("--synthetic", "results") == 0
+    assert "Report saved to:" in capsys.readouterr().out
+    assert cli("--synthetic", "results") == 0
+    assert "No ended, unreported batches" in capsys.readouterr().out
+
+    registry = BatchRegistry(project / ".build" / "offline" / "batch-registry.sqlite3")
+    try:
+        assert registry.unfinished_group_ids() == []
+        assert registry.unreported_group_ids() == []
+    finally:
+        registry.close()
@@ -0,0 +1,113 @@
+"""
+Unit tests for splitting oversized verification batches into batch groups
+
+Tests cover:
+- shard_requests: request-count and payload-size limits, order, encoding once
+- A single request over the payload limit is rejected
+- submit_batch sends exactly the encoded shard and enforces the count limit
+- create_batch submits every shard and records one group covering them
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from submit_batch_verification import (
+    MAX_REQUESTS_PER_BATCH,
+    WAVE_1_AGENTS,
+    make_custom_id,
+    parse_custom_id,
+)
+
+
+@pytest.fixture
+def client(synthetic_client):
+    return synthetic_client()
+
+
+@pytest.fixture
+def requests(client, make_sources):
+    (path,) = make_sources({"a.py": "a = 1\n"})
+    shards = {agent.name: [[path]] for agent in WAVE_1_AGENTS}
+    return client.build_requests(WAVE_1_AGENTS, shards)
+
+
+def custom_ids(shards) -> list[list[str]]:
+    return [[request.custom_id for request, _ in shard] for shard in shards]
+
+
+class TestShardRequests:
+    def test_single_shard(self, client, requests) -> None:
+        (shard,) = client.shard_requests(requests)
+        assert [request for request, _ in shard] == requests
+        assert all(encoded == client.serializer.encode_request(r) for r, encoded in shard)
+
+    def test_request_count_limit(self, client, requests) -> None:
+        shards = client.shard_requests(requests, max_requests=2)
+        expected = [r.custom_id for r in requests]
+        assert custom_ids(shards) == [expected[:2], expected[2:]]
+
+    def test_payload_limit(self, client, requests) -> None:
+        sizes = [len(client.serializer.encode_request(r)) + 1 for r in requests]
+        # Room for two requests plus the envelope, not three
+        limit = len(b'{"requests":[]}') + sizes[0] + sizes[1]
+        shards = client.shard_requests(requests, max_payload_bytes=limit)
+        assert [len(shard) for shard in shards] == [2, 1]
+        for shard in shards:
+            body = b'{"requests":[' + b",".join(e for _, e in shard) + b"]}"
+            assert len(body) <= limit
+
+    def test_oversized_request(self, client, requests) -> None:
+        with pytest.raises(ValueError, match="over the 100 byte batch limit"):
+            client.shard_requests(requests, max_payload_bytes=100)
+
+    def test_empty(self, client) -> None:
+        assert client.shard_requests([]) == []
+
+
+def test_submit_batch_limits(client) -> None:
+    async def scenario():
+        async with client:
+            await client.submit_batch([])
+
+    with pytest.raises(ValueError, match=f"1-{MAX_REQUESTS_PER_BATCH} requests"):
+        asyncio.run(scenario())
+
+
+def test_create_batch_groups_shards(client, make_sources, monkeypatch) -> None:
+    files = make_sources({"a.py": "a = 1\n"})
+    shard_requests = client.shard_requests
+    monkeypatch.setattr(
+        client, "shard_requests", lambda requests: shard_requests(requests, max_requests=2)
+    )
+    bodies = []
+    handle = client.transport.handle_async_request
+
+    async def recording_handle(request):
+        if request.method == "POST":
+            bodies.append(json.loads(await request.aread()))
+        return await handle(request)
+
+    monkeypatch.setattr(client.transport, "handle_async_request", recording_handle)
+
+    async def scenario():
+        async with client:
+            group = await client.create_batch(WAVE_1_AGENTS, files)
+            stored = client.registry.get_group(group.id)
+            return group, stored, client.registry.group_request_ids(group.id)
+
+    group, stored, request_ids = asyncio.run(scenario())
+    assert len(group.batch_ids) == 2 == len(set(group.batch_ids))
+    assert sorted(stored.batch_ids) == sorted(group.batch_ids)
+    assert [len(body["requests"]) for body in bodies] == [2, 1]
+    sent = [r["custom_id"] for body in bodies for r in body["requests"]]
+    assert sorted(sent) == sorted(request_ids)
+    assert sorted(parse_custom_id(c)[0] for c in sent) == sorted(a.name for a in WAVE_1_AGENTS)
+
+
+def test_custom_ids_round_trip() -> None:
+    assert parse_custom_id(make_custom_id("code-reviewer")) == ("code-reviewer", None)
+    assert parse_custom_id(make_custom_id("code-reviewer", 12)) == ("code-reviewer", 12)
+    assert make_custom_id("code-reviewer") != make_custom_id("code-reviewer")
+    assert parse_custom_id("legacy-id") == ("legacy-id", None)
@@ -0,0 +1,133 @@
+"""
+Unit tests for usage-based cost accounting
+
+Tests cover:
+- Model pricing lookup by alias and dated snapshot ID
+- Batch discount and prompt-cache write/read multipliers
+- CostTracker totals, per-key aggregation and unpriced models
+- The JSONL cost ledger written for every reported group
+"""
+
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from batch_storage import (
+    BATCH_DISCOUNT,
+    MODEL_PRICING,
+    CostTracker,
+    ModelPricing,
+    extract_usage,
+    pricing_for_model,
+    sum_usage,
+)
+from submit_batch_verification import WAVE_1_AGENTS, report_target
+
+USAGE = {
+    "input_tokens": 1_000_000,
+    "output_tokens": 100_000,
+    "cache_creation_input_tokens": 0,
+    "cache_read_input_tokens": 0,
+}
+
+
+class TestPricing:
+    def test_snapshot_resolves_to_alias(self) -> None:
+        assert pricing_for_model("claude-sonnet-4-5-20250929") is MODEL_PRICING["claude-sonnet-4-5"]
+        assert pricing_for_model("claude-haiku-4-5") is MODEL_PRICING["claude-haiku-4-5"]
+        assert pricing_for_model("claude-unknown-1") is None
+
+    def test_batch_discount(self) -> None:
+        pricing = ModelPricing(input_per_mtok=3.0, output_per_mtok=15.0)
+        assert pricing.cost(USAGE) == pytest.approx(4.5)
+        assert pricing.cost(USAGE, BATCH_DISCOUNT) == pytest.approx(2.25)
+
+    def test_cache_multipliers(self) -> None:
+        pricing = ModelPricing(input_per_mtok=10.0, output_per_mtok=0.0)
+        writes = {"cache_creation_input_tokens": 1_000_000}
+        reads = {"cache_read_input_tokens": 1_000_000}
+        assert pricing.cost(writes) == pytest.approx(12.5)
+        assert pricing.cost(reads) == pytest.approx(1.0)
+
+
+class TestUsage:
+    def test_extract_usage_fills_missing_counts(self) -> None:
+        usage = extract_usage({"usage": {"input_tokens": 10, "cache_read_input_tokens": None}})
+        assert usage == {
+            "input_tokens": 10,
+            "output_tokens": 0,
+            "cache_creation_input_tokens": 0,
+            "cache_read_input_tokens": 0,
+        }
+        assert extract_usage({})["output_tokens"] == 0
+
+    def test_sum_usage(self) -> None:
+        assert sum_usage([None, {}]) is None
+        total = sum_usage([USAGE, None, {"input_tokens": 5}])
+        assert total["input_tokens"] == 1_000_005
+        assert total["output_tokens"] == 100_000
+
+
+class TestCostTracker:
+    def test_totals(self) -> None:
+        costs = CostTracker()
+        costs.add("msgbatch_1", "security-auditor", "security-auditor", "claude-sonnet-4-5", USAGE)
+        costs.add("sync", "code-reviewer", "code-reviewer", "claude-sonnet-4-5", USAGE, True)
+        assert costs.batch_cost == pytest.approx(4.5)
+        assert costs.sync_cost == pytest.approx(9.0)
+        # The synchronous request pays full price
+        assert costs.cost == pytest.approx(6.75)
+        assert costs.synchronous_requests == 1
+        assert costs.unpriced_requests == 0
+
+    def test_totals_by(self) -> None:
+        costs = CostTracker()
+        for custom_id, batch_id in (("a-0", "msgbatch_1"), ("a-1", "msgbatch_2")):
+            costs.add(batch_id, custom_id, "security-auditor", "claude-haiku-4-5", USAGE)
+        by_agent = costs.totals_by("agent")["security-auditor"]
+        assert by_agent["requests"] == 2
+        assert by_agent["input_tokens"] == 2_000_000
+        assert by_agent["cost"] == pytest.approx(2 * 1.5 * BATCH_DISCOUNT)
+        assert set(costs.totals_by("batch_id")) == {"msgbatch_1", "msgbatch_2"}
+
+    def test_unpriced_model(self) -> None:
+        costs = CostTracker()
+        entry = costs.add("msgbatch_1", "x", "code-reviewer", "claude-unknown-1", USAGE)
+        assert entry["priced"] is False and entry["cost"] == 0.0
+        assert costs.unpriced_requests == 1
+
+    def test_write_ledger(self, tmp_path: Path) -> None:
+        ledger = tmp_path / "logs" / "cost-ledger.jsonl"
+        CostTracker().write_ledger(ledger, "bgrp_01")
+        assert not ledger.exists()
+
+        costs = CostTracker()
+        costs.add("msgbatch_1", "x", "code-reviewer", "claude-sonnet-4-5", USAGE)
+        costs.write_ledger(ledger, "bgrp_01")
+        costs.write_ledger(ledger, "bgrp_02")
+        entries = [json.loads(line) for line in ledger.read_text().splitlines()]
+        assert [e["group_id"] for e in entries] == ["bgrp_01", "bgrp_02"]
+        assert entries[0]["mode"] == "batch" and entries[0]["input_tokens"] == 1_000_000
+
+
+def test_report_costs_from_result_usage(synthetic_client, mark_pending) -> None:
+    files = mark_pending({"a.py": "a = 1\n" * 50})
+    client = synthetic_client()
+
+    async def scenario():
+        async with client:
+            group = await client.create_batch(WAVE_1_AGENTS, files)
+            await client.complete_group(group.id)
+            await report_target(client, group.id)
+            return group
+
+    group = asyncio.run(scenario())
+    entries = [json.loads(line) for line in client.cost_ledger_path.read_text().splitlines()]
+    assert len(entries) == len(WAVE_1_AGENTS)
+    assert {e["group_id"] for e in entries} == {group.id}
+    assert {e["batch_id"] for e in entries} == set(group.batch_ids)
+    for entry in entries:
+        assert entry["priced"] and entry["input_tokens"] > 0
+        assert entry["cost"] == pytest.approx(entry["sync_cost"] * BATCH_DISCOUNT)
@@ -0,0 +1,151 @@
+"""
+Unit tests for latency-aware dispatch (synchronous vs batch execution)
+
+Tests cover:
+- plan_dispatch: urgent agents, deadlines against batch turnaround history
+- run_synchronous: one result per request, concurrency cap
+- HTTP errors and timeouts become "errored" results
+- run_verification_dag merges synchronous and batch results in one report
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from submit_batch_verification import (
+    ASSUMED_BATCH_LATENCY_SECONDS,
+    WAVE_1_AGENTS,
+    BatchAPIClient,
+    HTTPClientConfig,
+    parse_custom_id,
+    plan_dispatch,
+    run_verification_dag,
+)
+
+NAMES = [agent.name for agent in WAVE_1_AGENTS]
+
+
+def names(agents) -> list[str]:
+    return [agent.name for agent in agents]
+
+
+def api_error(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(400, json={"error": {"type": "invalid_request_error", "message": "bad"}})
+
+
+def unparsable_error(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(400, text="not json")
+
+
+def timeout(request: httpx.Request) -> httpx.Response:
+    raise httpx.ReadTimeout("slow", request=request)
+
+
+class TestPlanDispatch:
+    def test_no_deadline(self) -> None:
+        sync, batch = plan_dispatch(WAVE_1_AGENTS, [NAMES[1]], None, None)
+        assert names(sync) == [NAMES[1]]
+        assert names(batch) == [NAMES[0], NAMES[2]]
+
+    def test_deadline_met_by_history(self) -> None:
+        sync, batch = plan_dispatch(WAVE_1_AGENTS, (), 600, 300.0)
+        assert sync == [] and names(batch) == NAMES
+
+    def test_deadline_missed_by_history(self) -> None:
+        sync, batch = plan_dispatch(WAVE_1_AGENTS, (), 600, 900.0)
+        assert names(sync) == NAMES and batch == []
+
+    def test_assumed_latency_without_history(self) -> None:
+        deadline = ASSUMED_BATCH_LATENCY_SECONDS - 1
+        assert plan_dispatch(WAVE_1_AGENTS, (), deadline, None)[1] == []
+        assert names(plan_dispatch(WAVE_1_AGENTS, (), deadline + 1, None)[1]) == NAMES
+
+
+class TestRunSynchronous:
+    def test_one_result_per_request(self, synthetic_client, make_sources) -> None:
+        files = make_sources({"a.py": "a = 1\n", "b.py": "b = 2\n"})
+        client = synthetic_client()
+
+        async def scenario():
+            async with client:
+                return await client.run_synchronous(WAVE_1_AGENTS, files)
+
+        run = asyncio.run(scenario())
+        assert sorted(parse_custom_id(r.custom_id)[0] for r in run.results) == sorted(NAMES)
+        assert all(r.result["type"] == "succeeded" for r in run.results)
+        assert all(run.files_by_custom_id[r.custom_id] == files for r in run.results)
+        assert run.cache_hits == []
+
+    def test_concurrency_cap(self, synthetic_client, make_sources, monkeypatch) -> None:
+        files = make_sources({"a.py": "a = 1\n"})
+        client = synthetic_client(latency_seconds=0.01)
+        in_flight, peak = 0, 0
+        send_message = client.send_message
+
+        async def counting_send(request, timeout_seconds):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            try:
+                return await send_message(request, timeout_seconds)
+            finally:
+                in_flight -= 1
+
+        monkeypatch.setattr(client, "send_message", counting_send)
+
+        async def scenario():
+            async with client:
+                return await client.run_synchronous(WAVE_1_AGENTS, files, max_concurrency=1)
+
+        assert len(asyncio.run(scenario()).results) == len(NAMES)
+        assert peak == 1
+
+    @pytest.mark.parametrize(
+        ("handler", "error_type"),
+        [
+            (api_error, "invalid_request_error"),
+            (unparsable_error, "api_error"),
+            (timeout, "timeout_error"),
+        ],
+        ids=["api-error", "unparsable-error", "timeout"],
+    )
+    def test_failures_become_errored_results(self, project, handler, error_type) -> None:
+        (project / "a.py").write_text("a = 1\n")
+        client = BatchAPIClient(
+            api_key="test",
+            http_config=HTTPClientConfig(max_retries=0),
+            transport=httpx.MockTransport(handler),
+        )
+
+        async def scenario():
+            async with client:
+                return await client.run_synchronous(WAVE_1_AGENTS[:1], ["a.py"])
+
+        (result,) = asyncio.run(scenario()).results
+        assert result.result["type"] == "errored"
+        assert result.result["error"]["type"] == error_type
+
+
+def test_dag_merges_sync_and_batch_results(synthetic_client, mark_pending, monkeypatch) -> None:
+    files = mark_pending({"a.py": "a = 1\n"})
+    client = synthetic_client()
+    batches = []
+    create_batch = client.create_batch
+
+    async def recording_create_batch(agents, *args, **kwargs):
+        batches.append(names(agents))
+        return await create_batch(agents, *args, **kwargs)
+
+    monkeypatch.setattr(client, "create_batch", recording_create_batch)
+
+    async def scenario():
+        async with client:
+            return await run_verification_dag(
+                client, WAVE_1_AGENTS, files, urgent_agents=[NAMES[0]]
+            )
+
+    (report,) = asyncio.run(scenario())
+    assert batches == [NAMES[1:]]
+    text = report.read_text()
+    assert all(name in text for name in NAMES)
@@ -0,0 +1,93 @@
+"""
+Unit tests for token-budget bin-packing of pending files
+
+Tests cover:
+- estimate_file_tokens: ~4 bytes per token, 0 for unreadable files
+- pack_files: every file once, shards within budget, minimum shard count,
+  balanced loads, oversized files alone, invalid budgets
+- plan_file_shards: one shard without a budget
+- Packed agents get one -shardNNN request per shard, each citing its files
+"""
+
+import asyncio
+
+import pytest
+
+from submit_batch_verification import WAVE_1_AGENTS, parse_custom_id
+
+
+@pytest.fixture
+def client(synthetic_client):
+    return synthetic_client()
+
+
+@pytest.fixture
+def sized_files(make_sources):
+    """Return a factory writing files of the given estimated token sizes."""
+
+    def factory(*tokens: int) -> list[str]:
+        return make_sources({f"f{i}.py": "#" * (4 * size) for i, size in enumerate(tokens)})
+
+    return factory
+
+
+def loads(client, shards: list[list[str]]) -> list[int]:
+    return [sum(client.estimate_file_tokens(f) for f in shard) for shard in shards]
+
+
+class TestEstimateFileTokens:
+    def test_estimate(self, client, sized_files) -> None:
+        (path,) = sized_files(250)
+        assert client.estimate_file_tokens(path) == 250
+
+    def test_missing_file(self, client, project) -> None:
+        assert client.estimate_file_tokens(str(project / "missing.py")) == 0
+
+
+class TestPackFiles:
+    def test_every_file_once_within_budget(self, client, sized_files) -> None:
+        files = sized_files(300, 200, 500, 100, 400, 250, 50)
+        shards = client.pack_files(files, 600)
+        assert sorted(f for shard in shards for f in shard) == sorted(files)
+        assert all(load <= 600 for load in loads(client, shards))
+        # 1800 tokens need at least 3 shards of 600
+        assert len(shards) == 3
+
+    def test_balanced(self, client, sized_files) -> None:
+        shards = client.pack_files(sized_files(400, 400, 300, 300, 200, 200), 1000)
+        assert sorted(loads(client, shards)) == [900, 900]
+
+    def test_oversized_file_alone(self, client, sized_files) -> None:
+        large, *small = sized_files(2000, 100, 100)
+        shards = client.pack_files([large, *small], 500)
+        assert [large] in shards
+        assert sorted(f for shard in shards if shard != [large] for f in shard) == sorted(small)
+
+    def test_single_shard_under_budget(self, client, sized_files) -> None:
+        files = sized_files(10, 20)
+        assert [sorted(s) for s in client.pack_files(files, 1000)] == [sorted(files)]
+
+    def test_empty_and_invalid(self, client, sized_files) -> None:
+        assert client.pack_files([], 100) == []
+        with pytest.raises(ValueError, match="must be positive"):
+            client.pack_files(sized_files(1), 0)
+
+
+def test_plan_without_budget(client, sized_files) -> None:
+    files = sized_files(5000, 5000)
+    assert client.plan_file_shards(files) == [files]
+    assert len(client.plan_file_shards(files, 6000)) == 2
+
+
+def test_packed_requests(client, sized_files) -> None:
+    files = sized_files(300, 300, 300)
+    agent = WAVE_1_AGENTS[0]
+
+    async def scenario():
+        async with client:
+            group = await client.create_batch([agent], files, context_budget_tokens=600)
+            return group, client.registry.group_request_ids(group.id)
+
+    group, request_ids = asyncio.run(scenario())
+    assert group.request_count == 2
+    assert sorted(parse_custom_id(c) for c in request_ids) == [(agent.name, 0), (agent.name, 1)]
@@ -0,0 +1,153 @@
+"""
+Unit tests for the content-addressed findings cache
+
+Tests cover:
+- FindingsCache keys: agent, prompt hash, model and content hash
+- Per-file split of a result's findings by exact repo-relative path
+- Results with unmatched or ambiguous findings are not cached
+- Unchanged files are served from the cache on the next submission
+"""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from batch_storage import FindingsCache, hash_file_content
+from submit_batch_verification import (
+    AGENTS_BY_NAME,
+    WAVE_1_AGENTS,
+    findings_prompt_hash,
+    report_target,
+)
+
+AGENT = "security-auditor"
+FINDING = {"severity": "HIGH", "description": "Hardcoded secret"}
+
+
+def parsed(*files: str, status: str = "PASS") -> dict:
+    return {"status": status, "findings": [{**FINDING, "file": f} for f in files]}
+
+
+@pytest.fixture
+def cache(tmp_path: Path):
+    cache = FindingsCache(tmp_path / "findings-cache.sqlite3")
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def client(synthetic_client):
+    return synthetic_client()
+
+
+class TestFindingsCache:
+    def test_key_parts(self, cache: FindingsCache) -> None:
+        cache.put(AGENT, "p1", "model-a", "c1", [FINDING])
+        assert cache.get(AGENT, "p1", "model-a", "c1") == [FINDING]
+        assert cache.get("code-reviewer", "p1", "model-a", "c1") is None
+        assert cache.get(AGENT, "p2", "model-a", "c1") is None
+        assert cache.get(AGENT, "p1", "model-b", "c1") is None
+        assert cache.get(AGENT, "p1", "model-a", "c2") is None
+
+    def test_clean_file_is_a_hit(self, cache: FindingsCache) -> None:
+        cache.put(AGENT, "p1", "model-a", "c1", [])
+        assert cache.get(AGENT, "p1", "model-a", "c1") == []
+
+    def test_replace(self, cache: FindingsCache) -> None:
+        cache.put(AGENT, "p1", "model-a", "c1", [FINDING])
+        cache.put(AGENT, "p1", "model-a", "c1", [])
+        assert cache.get(AGENT, "p1", "model-a", "c1") == []
+
+    def test_hash_file_content(self, tmp_path: Path) -> None:
+        path = tmp_path / "a.py"
+        path.write_text("x = 1\n")
+        assert hash_file_content(str(path)) == hash_file_content(str(path))
+        assert len(hash_file_content(str(path))) == 64
+        assert hash_file_content(str(tmp_path / "missing.py")) is None
+
+
+class TestCacheFileFindings:
+    @pytest.fixture
+    def files(self, make_sources) -> list[str]:
+        return make_sources({"src/a.py": "a = 1\n", "src/b.py": "b = 2\n"})
+
+    def hashes(self, files: list[str]) -> dict[str, str | None]:
+        return {f: hash_file_content(f) for f in files}
+
+    def cached(self, client, file_path: str):
+        agent = AGENTS_BY_NAME[AGENT]
+        return client.findings_cache.get(
+            AGENT, findings_prompt_hash(agent), agent.model, hash_file_content(file_path)
+        )
+
+    def test_split_per_file(self, client, files, project: Path) -> None:
+        # Absolute, relative and "./"-prefixed paths all name the same file
+        result = parsed(str(project / "src/a.py"), "src/a.py", "./src/a.py")
+        assert client.cache_file_findings("id", AGENT, files, self.hashes(files), result) == 2
+        assert len(self.cached(client, files[0])) == 3
+        assert self.cached(client, files[1]) == []
+
+    def test_unmatched_finding_skips_result(self, client, files) -> None:
+        # A bare file name is not an exact match for src/a.py
+        result = parsed("src/a.py", "a.py")
+        assert client.cache_file_findings("id", AGENT, files, self.hashes(files), result) == 0
+        assert self.cached(client, files[0]) is None
+        assert self.cached(client, files[1]) is None
+
+    def test_finding_without_file_skips_result(self, client, files) -> None:
+        result = {"status": "PASS", "findings": [FINDING]}
+        assert client.cache_file_findings("id", AGENT, files, self.hashes(files), result) == 0
+
+    def test_ambiguous_finding_skips_result(self, client, files) -> None:
+        # The same file packed twice under different spellings
+        both = [files[0], "src/a.py"]
+        hashes = {f: hash_file_content(files[0]) for f in both}
+        assert client.cache_file_findings("id", AGENT, both, hashes, parsed("src/a.py")) == 0
+
+    def test_failed_result_not_cached(self, client, files) -> None:
+        result = parsed(status="FAIL")
+        assert client.cache_file_findings("id", AGENT, files, self.hashes(files), result) == 0
+
+    def test_unreadable_file_not_cached(self, client, files) -> None:
+        hashes = {files[0]: None, files[1]: hash_file_content(files[1])}
+        assert client.cache_file_findings("id", AGENT, files, hashes, parsed()) == 1
+        assert self.cached(client, files[1]) == []
+
+    def test_repo_path(self, client, project: Path) -> None:
+        assert client.repo_path(str(project / "src" / ".." / "src/a.py")) == "src/a.py"
+        assert client.repo_path("./src//a.py") == "src/a.py"
+        assert client.repo_path("/elsewhere/a.py") == "/elsewhere/a.py"
+
+
+class TestCachedSubmission:
+    async def verify(self, client, files: list[str], **kwargs):
+        group = await client.create_batch(WAVE_1_AGENTS, files, **kwargs)
+        if group.batch_ids:
+            await client.complete_group(group.id)
+        await report_target(client, group.id)
+        return group
+
+    def test_unchanged_files_served_from_cache(self, synthetic_client, mark_pending) -> None:
+        files = mark_pending({"a.py": "a = 1\n", "b.py": "b = 2\n"})
+        client = synthetic_client()
+
+        async def scenario():
+            async with client:
+                groups = [await self.verify(client, files), await self.verify(client, files)]
+                Path(files[0]).write_text("a = 3\n")
+                groups.append(await self.verify(client, files))
+                groups.append(await self.verify(client, files, use_cache=False))
+                return [
+                    (group.request_count, client.registry.cached_findings(group.id))
+                    for group in groups
+                ]
+
+        first, second, third, uncached = asyncio.run(scenario())
+        agents = len(WAVE_1_AGENTS)
+        assert first == (agents, [])
+        assert second[0] == 0 and len(second[1]) == 2 * agents
+        # Only the changed file is sent again
+        assert third[0] == agents
+        assert [file_path for _, file_path, _ in third[1]] == [files[1]] * agents
+        assert uncached == (agents, [])
@@ -0,0 +1,123 @@
+"""
+Unit tests for tolerant findings extraction (extract_findings_json)
+
+Tests cover:
+- Bare, fenced and prose-wrapped JSON responses
+- Braces in prose, non-matching JSON objects and nested findings objects
+- Truncated and missing JSON fail without raising
+- parse_agent_findings status, errors and per-method parse counts
+"""
+
+import json
+
+import pytest
+
+from submit_batch_verification import (
+    BatchIndividualResult,
+    extract_findings_json,
+    find_agent_findings,
+)
+
+FINDINGS = {
+    "findings": [
+        {"file": "src/a.py", "line": 3, "severity": "HIGH", "finding": "Hardcoded secret"}
+    ],
+    "summary": {"total": 1, "high": 1},
+    "score": 8,
+    "coverage": 90,
+}
+BODY = json.dumps(FINDINGS, indent=2)
+
+
+class TestExtractFindingsJson:
+    @pytest.mark.parametrize(
+        ("text", "method"),
+        [
+            (BODY, "json"),
+            (f"```json\n{BODY}\n```", "fenced"),
+            (f"Here are the findings:\n```\n{BODY}\n```\nLet me know!", "fenced"),
+            (f"Here are the findings: {BODY} Hope this helps.", "embedded"),
+            (f"Checked {{files}} and {{x: 1}} first.\n{BODY}", "embedded"),
+            (f'{{"note": "not findings"}}\n{BODY}', "embedded"),
+            (json.dumps({"result": FINDINGS}), "json"),
+        ],
+        ids=["bare", "fenced", "fenced-prose", "embedded", "braces", "other-object", "nested"],
+    )
+    def test_recovers(self, text: str, method: str) -> None:
+        assert extract_findings_json(text) == (FINDINGS, method)
+
+    @pytest.mark.parametrize(
+        "text",
+        ["", "No issues found.", BODY[: len(BODY) // 2], '{"findings": "none"}'],
+        ids=["empty", "prose", "truncated", "invalid-schema"],
+    )
+    def test_fails(self, text: str) -> None:
+        assert extract_findings_json(text) == (None, "failed")
+
+    def test_find_agent_findings_breadth_first(self) -> None:
+        # The shallower match wins over one nested deeper but listed first
+        nested = {**FINDINGS, "findings": []}
+        assert find_agent_findings([{"a": nested}, FINDINGS]) == FINDINGS
+        assert find_agent_findings("text") is None
+
+
+def succeeded(*blocks: dict, stop_reason: str = "end_turn") -> BatchIndividualResult:
+    message = {
+        "content": list(blocks),
+        "stop_reason": stop_reason,
+        "usage": {"input_tokens": 10, "output_tokens": 20},
+    }
+    return BatchIndividualResult(
+        custom_id="security-auditor", result={"type": "succeeded", "message": message}
+    )
+
+
+def text(value: str) -> dict:
+    return {"type": "text", "text": value}
+
+
+class TestParseAgentFindings:
+    @pytest.fixture
+    def client(self, synthetic_client):
+        return synthetic_client()
+
+    def test_split_text_blocks(self, client) -> None:
+        half = len(BODY) // 2
+        parsed = client.parse_agent_findings(succeeded(text(BODY[:half]), text(BODY[half:])))
+        assert parsed["status"] == "PASS" and parsed["recovered"] == 0
+        assert parsed["findings"] == FINDINGS["findings"]
+        assert parsed["usage"]["output_tokens"] == 20
+
+    def test_recovered_response(self, client) -> None:
+        parsed = client.parse_agent_findings(succeeded(text(f"Sure!\n```json\n{BODY}\n```")))
+        assert parsed["status"] == "PASS" and parsed["recovered"] == 1
+        assert client.parse_stats == {"fenced": 1}
+
+    def test_unparsable_response(self, client) -> None:
+        parsed = client.parse_agent_findings(succeeded(text("I could not review the files.")))
+        assert parsed["status"] == "FAIL"
+        assert parsed["error"] == "No findings JSON matching the agent schema in response"
+        assert client.parse_stats == {"failed": 1}
+
+    def test_truncated_response(self, client) -> None:
+        result = succeeded(text(BODY[:40]), stop_reason="max_tokens")
+        parsed = client.parse_agent_findings(result)
+        assert parsed["error"] == "Response truncated at max_tokens (20 tokens)"
+
+    @pytest.mark.parametrize(
+        ("result", "error"),
+        [
+            (
+                {"type": "errored", "error": {"type": "error", "error": {"message": "Overloaded"}}},
+                "Overloaded",
+            ),
+            ({"type": "expired"}, "Request expired"),
+            ({"type": "canceled"}, "Request canceled"),
+            ({"type": "mystery"}, "Unknown result type: mystery"),
+        ],
+    )
+    def test_failed_results(self, client, result: dict, error: str) -> None:
+        parsed = client.parse_agent_findings(
+            BatchIndividualResult(custom_id="security-auditor", result=result)
+        )
+        assert parsed["status"] == "FAIL" and parsed["error"] == error
@@ -0,0 +1,199 @@
+"""
+Unit tests for the record/replay and synthetic transports
+
+Tests cover:
+- A recorded cassette replays the same submit/poll/results exchange,
+  without the API key
+- ReplayTransport: recorded order per path, last response repeats, 404
+  for unrecorded paths
+- SyntheticTransport: batch lifecycle and state kept across instances
+- Offline runs keep their state under .build/offline/
+- --synthetic-polls and --synthetic-error-rate configure the synthetic API
+- cmd_poll reports HTTP errors instead of raising
+"""
+
+import asyncio
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+
+from submit_batch_verification import (
+    WAVE_1_AGENTS,
+    BatchAPIClient,
+    RecordingTransport,
+    ReplayTransport,
+    SyntheticTransport,
+    state_dir,
+)
+
+BATCHES_URL = "https://api.anthropic.com/v1/messages/batches"
+API_KEY = "sk-ant-test-secret"
+
+
+async def verify(client: BatchAPIClient, files: list[str]) -> tuple[list[str], int]:
+    group = await client.create_batch(WAVE_1_AGENTS, files)
+    statuses = await client.complete_group(group.id)
+    results = [r async for r in client.iter_group_results(group.batch_ids)]
+    return [s.processing_status for s in statuses], len(results)
+
+
+def test_record_then_replay(project: Path, fast_polling, make_sources) -> None:
+    files = make_sources({"a.py": "a = 1\n"})
+    cassette = project / "cassettes" / "run.jsonl"
+    recording = BatchAPIClient(
+        api_key=API_KEY,
+        transport=RecordingTransport(cassette, SyntheticTransport(polls_to_complete=2)),
+    )
+
+    async def record():
+        async with recording:
+            return await verify(recording, files)
+
+    recorded = asyncio.run(record())
+    assert recorded == (["ended"], len(WAVE_1_AGENTS))
+    text = cassette.read_text()
+    assert API_KEY not in text
+    paths = [json.loads(line)["path"] for line in text.splitlines()]
+    assert paths[0] == "/v1/messages/batches"
+    assert paths[-1].endswith("/results")
+
+    replaying = BatchAPIClient(transport=ReplayTransport(cassette))
+
+    async def replay():
+        async with replaying:
+            return await verify(replaying, files)
+
+    assert asyncio.run(replay()) == recorded
+    # The recorded run used the real state directory, the replay the offline one
+    assert (project / ".build" / "batch-registry.sqlite3").exists()
+    assert (project / ".build" / "offline" / "batch-registry.sqlite3").exists()
+
+
+class TestReplayTransport:
+    @pytest.fixture
+    def transport(self, tmp_path: Path) -> ReplayTransport:
+        cassette = tmp_path / "cassette.jsonl"
+        exchanges = [
+            {"method": "GET", "path": "/v1/x", "status": 200, "headers": {}, "body": "first"},
+            {"method": "GET", "path": "/v1/x", "status": 200, "headers": {}, "body": "last"},
+            {"method": "POST", "path": "/v1/x", "status": 429, "headers": {}, "body": ""},
+        ]
+        cassette.write_text("".join(json.dumps(e) + "\n" for e in exchanges) + "\n")
+        return ReplayTransport(cassette)
+
+    def get(self, transport: ReplayTransport, method: str, path: str) -> httpx.Response:
+        async def send():
+            async with httpx.AsyncClient(transport=transport) as http:
+                return await http.request(method, f"https://api.example{path}")
+
+        return asyncio.run(send())
+
+    def test_recorded_order_then_last_repeats(self, transport: ReplayTransport) -> None:
+        bodies = [self.get(transport, "GET", "/v1/x").text for _ in range(3)]
+        assert bodies == ["first", "last", "last"]
+
+    def test_matches_method(self, transport: ReplayTransport) -> None:
+        assert self.get(transport, "POST", "/v1/x").status_code == 429
+
+    def test_unrecorded_path(self, transport: ReplayTransport) -> None:
+        response = self.get(transport, "GET", "/v1/y")
+        assert response.status_code == 404
+        assert response.json()["error"]["type"] == "not_found_error"
+
+
+class TestSyntheticTransport:
+    def send(self, transport: SyntheticTransport, method: str, url: str, **kwargs):
+        async def send():
+            async with httpx.AsyncClient(transport=transport) as http:
+                return await http.request(method, url, **kwargs)
+
+        return asyncio.run(send())
+
+    def create(self, transport: SyntheticTransport, count: int = 2) -> str:
+        requests = [
+            {"custom_id": f"r{i}", "params": {"model": "m", "messages": []}}
+            for i in range(count)
+        ]
+        return self.send(transport, "POST", BATCHES_URL, json={"requests": requests}).json()["id"]
+
+    def test_lifecycle(self) -> None:
+        transport = SyntheticTransport(polls_to_complete=2)
+        batch_id = self.create(transport)
+        first = self.send(transport, "GET", f"{BATCHES_URL}/{batch_id}").json()
+        assert first["processing_status"] == "in_progress"
+        assert first["request_counts"]["succeeded"] == 1
+        second = self.send(transport, "GET", f"{BATCHES_URL}/{batch_id}").json()
+        assert second["processing_status"] == "ended"
+        lines = self.send(transport, "GET", second["results_url"]).text.splitlines()
+        assert [json.loads(line)["custom_id"] for line in lines] == ["r0", "r1"]
+
+    def test_cancel_keeps_completed_results(self) -> None:
+        transport = SyntheticTransport(polls_to_complete=2)
+        batch_id = self.create(transport)
+        self.send(transport, "GET", f"{BATCHES_URL}/{batch_id}")
+        status = self.send(transport, "POST", f"{BATCHES_URL}/{batch_id}/cancel").json()
+        assert status["request_counts"]["canceled"] == 1
+        results = self.send(transport, "GET", f"{BATCHES_URL}/{batch_id}/results").text
+        assert [json.loads(line)["result"]["type"] for line in results.splitlines()] == [
+            "succeeded",
+            "canceled",
+        ]
+
+    def test_unknown_batch(self) -> None:
+        response = self.send(SyntheticTransport(), "GET", f"{BATCHES_URL}/msgbatch_missing")
+        assert response.status_code == 404
+
+    def test_state_kept_across_instances(self, tmp_path: Path) -> None:
+        state_path = tmp_path / "synthetic-batches.json"
+        batch_id = self.create(SyntheticTransport(polls_to_complete=1, state_path=state_path))
+        later = SyntheticTransport(polls_to_complete=1, state_path=state_path)
+        status = self.send(later, "GET", f"{BATCHES_URL}/{batch_id}").json()
+        assert status["processing_status"] == "ended"
+        # New batches never reuse an ID from the saved state
+        assert self.create(later) != batch_id
+
+
+class TestOfflineState:
+    def test_state_dir(self, tmp_path: Path) -> None:
+        assert state_dir(tmp_path, offline=False) == tmp_path / ".build"
+        assert state_dir(tmp_path, offline=True) == tmp_path / ".build" / "offline"
+
+    def test_offline_client_paths(self, synthetic_client, project: Path) -> None:
+        client = synthetic_client()
+        offline = project / ".build" / "offline"
+        assert client.offline
+        assert client.registry.db_path == offline / "batch-registry.sqlite3"
+        assert client.findings_cache.db_path == offline / "findings-cache.sqlite3"
+        assert client.reports_dir == offline / "production-reports"
+        assert client.cost_ledger_path.is_relative_to(offline)
+        assert client.poll_history_path.is_relative_to(offline)
+
+    def test_cli_run_stays_offline(self, cli, mark_pending, project: Path) -> None:
+        mark_pending({"app.py": "def f():\n    return 1\n"})
+        assert cli("--synthetic", "submit", "--wave", "1") == 0
+        assert cli("--synthetic", "poll") == 0
+        assert cli("--synthetic", "results") == 0
+        assert not (project / ".ignorar").exists()
+        assert sorted(p.name for p in (project / ".build").iterdir()) == [
+            "checkpoints",
+            "offline",
+        ]
+
+    def test_cli_synthetic_options(self, cli, mark_pending, project: Path) -> None:
+        mark_pending({"app.py": "def f():\n    return 1\n"})
+        options = ("--synthetic", "--synthetic-polls", "5", "--synthetic-error-rate", "1")
+        assert cli(*options, "submit", "--wave", "1") == 0
+        assert cli(*options, "poll", "--resubmit-attempts", "0") == 0
+        state_path = project / ".build" / "offline" / "synthetic-batches.json"
+        batches = json.loads(state_path.read_text()).values()
+        assert batches and all(b["polls"] == 5 for b in batches)
+        assert all(b["errored"] == len(b["requests"]) for b in batches)
+
+
+def test_cmd_poll_reports_http_errors(cli, capsys) -> None:
+    assert cli("--synthetic", "poll", "msgbatch_missing") == 1
+    out = capsys.readouterr().out
+    assert "ERROR:" in out and "404" in out
+    assert "Resume with:" in out
@@ -0,0 +1,151 @@
+"""
+Unit tests for adaptive output token budgets
+
+Tests cover:
+- output_token_budget: configured ceiling without enough history, high
+  percentile with margin, rounding, floor and ceiling
+- truncated_retry_budget: only max_tokens stops, grown up to MAX_OUTPUT_TOKENS
+- Per-agent budgets from the cost ledger; fixed budgets when disabled
+- Truncated responses are retried with a larger budget, synchronously and
+  through batch resubmission
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from submit_batch_verification import (
+    MAX_OUTPUT_TOKENS,
+    OUTPUT_BUDGET_FLOOR,
+    OUTPUT_BUDGET_MIN_SAMPLES,
+    OUTPUT_BUDGET_STEP,
+    OUTPUT_BUDGET_WINDOW,
+    WAVE_1_AGENTS,
+    BatchIndividualResult,
+    output_token_budget,
+    parse_custom_id,
+    truncated_retry_budget,
+)
+
+AGENT = WAVE_1_AGENTS[0]
+
+
+class TestOutputTokenBudget:
+    def test_ceiling_without_history(self) -> None:
+        samples = [100] * (OUTPUT_BUDGET_MIN_SAMPLES - 1)
+        assert output_token_budget(samples, 8000) == 8000
+
+    def test_percentile_with_margin(self) -> None:
+        # p95 of 1..100 is ~95, so the budget is 95 * 25 * 1.25 rounded up
+        budget = output_token_budget([25 * i for i in range(1, 101)], 8000)
+        assert budget % OUTPUT_BUDGET_STEP == 0
+        assert 2969 <= budget < 2969 + OUTPUT_BUDGET_STEP
+
+    def test_one_outlier_ignored(self) -> None:
+        samples = [1500] * 99 + [7900]
+        assert output_token_budget(samples, 8000) < 2500
+
+    def test_floor_and_ceiling(self) -> None:
+        samples = [10] * OUTPUT_BUDGET_MIN_SAMPLES
+        assert output_token_budget(samples, 8000) == OUTPUT_BUDGET_FLOOR
+        assert output_token_budget([7000] * OUTPUT_BUDGET_MIN_SAMPLES, 8000) == 8000
+
+
+def result(stop_reason: str, output_tokens: int, result_type: str = "succeeded"):
+    message = {"content": [], "stop_reason": stop_reason, "usage": {"output_tokens": output_tokens}}
+    return BatchIndividualResult(
+        custom_id=AGENT.name, result={"type": result_type, "message": message}
+    )
+
+
+class TestTruncatedRetryBudget:
+    @pytest.mark.parametrize(
+        ("body", "expected"),
+        [
+            (result("max_tokens", 1500), 3000),
+            (result("max_tokens", 6000), MAX_OUTPUT_TOKENS),
+            (result("max_tokens", MAX_OUTPUT_TOKENS), None),
+            (result("end_turn", 1500), None),
+            (result("max_tokens", 1500, result_type="errored"), None),
+        ],
+        ids=["doubled", "capped", "at-cap", "complete", "errored"],
+    )
+    def test_budget(self, body, expected) -> None:
+        assert truncated_retry_budget(body) == expected
+
+
+class TestOutputBudgets:
+    def write_ledger(self, client, agent: str, counts: list[int]) -> None:
+        client.cost_ledger_path.parent.mkdir(parents=True, exist_ok=True)
+        lines = [json.dumps({"agent": agent, "output_tokens": n}) for n in counts]
+        client.cost_ledger_path.write_text("\n".join([*lines, "not json", "{}"]) + "\n")
+
+    def test_history_window(self, synthetic_client) -> None:
+        client = synthetic_client()
+        counts = list(range(1, OUTPUT_BUDGET_WINDOW + 51))
+        self.write_ledger(client, AGENT.name, [0, *counts])
+        history = client.load_output_token_history()
+        assert history == {AGENT.name: counts[-OUTPUT_BUDGET_WINDOW:]}
+
+    def test_budgets_from_ledger(self, synthetic_client) -> None:
+        client = synthetic_client()
+        self.write_ledger(client, AGENT.name, [1000] * OUTPUT_BUDGET_MIN_SAMPLES)
+        budgets = client.output_budgets(WAVE_1_AGENTS)
+        assert budgets[AGENT.name] == 1280
+        assert all(budgets[a.name] == a.max_tokens for a in WAVE_1_AGENTS[1:])
+
+    def test_fixed_budgets(self, synthetic_client) -> None:
+        client = synthetic_client({"adaptive_max_tokens": False})
+        self.write_ledger(client, AGENT.name, [1000] * OUTPUT_BUDGET_MIN_SAMPLES)
+        assert client.output_budgets([AGENT]) == {AGENT.name: AGENT.max_tokens}
+
+
+@pytest.fixture
+def truncating_client(synthetic_client, monkeypatch):
+    """Offline client whose responses are cut off unless max_tokens is 4000."""
+    client = synthetic_client()
+    message = client.transport._message
+    requested = []
+
+    def truncating_message(params):
+        requested.append(params["max_tokens"])
+        response = message(params)
+        if params["max_tokens"] != 4000:
+            response["stop_reason"] = "max_tokens"
+            response["usage"]["output_tokens"] = 2000
+        return response
+
+    monkeypatch.setattr(client.transport, "_message", truncating_message)
+    return client, requested
+
+
+def test_sync_truncation_retried(truncating_client, make_sources) -> None:
+    client, requested = truncating_client
+    files = make_sources({"a.py": "a = 1\n"})
+
+    async def scenario():
+        async with client:
+            return await client.run_synchronous([AGENT], files)
+
+    (final,) = asyncio.run(scenario()).results
+    assert requested == [AGENT.max_tokens, 4000]
+    assert final.result["message"]["stop_reason"] == "end_turn"
+
+
+def test_batch_truncation_resubmitted(truncating_client, make_sources) -> None:
+    client, requested = truncating_client
+    files = make_sources({"a.py": "a = 1\n"})
+
+    async def scenario():
+        async with client:
+            group = await client.create_batch([AGENT], files)
+            statuses = await client.complete_group(group.id)
+            # The follow-up batch holds the retried request
+            results = [r async for r in client.iter_results(statuses[-1].id)]
+            return results, client.registry.superseded_requests(group.id)
+
+    (final,), superseded = asyncio.run(scenario())
+    assert requested[:2] == [AGENT.max_tokens, 4000]
+    assert final.result["message"]["stop_reason"] == "end_turn"
+    assert [parse_custom_id(c)[0] for c in superseded] == [AGENT.name]
@@ -0,0 +1,77 @@
+"""
+Unit tests for the prompt-caching-aware request layout
+
+Tests cover:
+- Every request starts with the same static system prompt and, per shard,
+  the same file-content block, each marked as a cache breakpoint
+- Only the agent instructions differ, in the user message
+- The file-content block holds each file's source, in order
+- Without prompt caching the request is a single user message
+"""
+
+import pytest
+
+from submit_batch_verification import (
+    VERIFICATION_SYSTEM_PROMPT,
+    WAVE_1_AGENTS,
+    CacheControl,
+)
+
+
+@pytest.fixture
+def client(synthetic_client):
+    return synthetic_client()
+
+
+@pytest.fixture
+def files(make_sources) -> list[str]:
+    return make_sources({"a.py": "a = 1\n", "b.py": "b = 2\n", "c.py": "c = 3\n"})
+
+
+class TestCachedLayout:
+    def test_shared_prefix(self, client, files) -> None:
+        shards = {agent.name: [files] for agent in WAVE_1_AGENTS}
+        requests = client.build_requests(WAVE_1_AGENTS, shards)
+        systems = [request.params.system for request in requests]
+        assert all(system == systems[0] for system in systems)
+        system_block, content_block = systems[0]
+        assert system_block.text == VERIFICATION_SYSTEM_PROMPT
+        assert system_block.cache_control == content_block.cache_control == CacheControl()
+        # Agents share one block object, built once per shard
+        assert all(request.params.system[1] is content_block for request in requests)
+
+    def test_instructions_in_user_message(self, client, files) -> None:
+        shards = {agent.name: [files] for agent in WAVE_1_AGENTS}
+        requests = client.build_requests(WAVE_1_AGENTS, shards)
+        for agent, request in zip(WAVE_1_AGENTS, requests, strict=True):
+            (message,) = request.params.messages
+            assert message.role == "user"
+            assert message.content == agent.prompt_template.format(
+                files="\n".join(f"- {f}" for f in files)
+            )
+
+    def test_content_block(self, client, files) -> None:
+        block = client.file_content_block(files[::-1])
+        sources = ["c = 3", "b = 2", "a = 1"]
+        positions = [block.text.index(source) for source in sources]
+        assert positions == sorted(positions)
+        assert block.text.startswith(f'<file path="{files[2]}">\n')
+
+    def test_unreadable_file(self, client, project) -> None:
+        block = client.file_content_block([str(project / "missing.py")])
+        assert "<unreadable>" in block.text
+
+    def test_block_per_shard(self, client, files) -> None:
+        agents = WAVE_1_AGENTS[:2]
+        shards = {agent.name: [files[:2], files[2:]] for agent in agents}
+        requests = client.build_requests(agents, shards)
+        blocks = {id(request.params.system[1]) for request in requests}
+        assert len(requests) == 4 and len(blocks) == 2
+
+
+def test_uncached_layout(client, files) -> None:
+    shards = {agent.name: [files] for agent in WAVE_1_AGENTS}
+    for request in client.build_requests(WAVE_1_AGENTS, shards, prompt_caching=False):
+        assert request.params.system is None
+        (message,) = request.params.messages
+        assert all(f"- {f}" in message.content for f in files)
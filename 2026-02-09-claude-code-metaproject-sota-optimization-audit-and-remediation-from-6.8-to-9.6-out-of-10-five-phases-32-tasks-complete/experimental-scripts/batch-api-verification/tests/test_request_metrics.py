@@ -0,0 +1,165 @@
+"""
+Unit tests for per-request HTTP metrics
+
+Tests cover:
+- endpoint_name for every Batch API operation
+- percentiles of empty, single and larger samples
+- RequestMetrics summary and Prometheus histogram/counter rendering
+- InstrumentedTransport records one sample per exchange, including failures
+- The --metrics option writes JSON or Prometheus text when the client closes
+"""
+
+import asyncio
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+
+from batch_transports import (
+    LATENCY_BUCKETS,
+    InstrumentedTransport,
+    RequestMetrics,
+    RequestSample,
+    endpoint_name,
+    percentiles,
+)
+
+BATCHES_URL = "https://api.anthropic.com/v1/messages/batches"
+
+
+def sample(endpoint: str = "get_batch", status: int | None = 200, duration: float = 0.1):
+    return RequestSample(
+        endpoint=endpoint,
+        status=status,
+        duration_seconds=duration,
+        ttfb_seconds=duration / 2 if status is not None else None,
+        connect_seconds=None,
+        bytes_sent=10,
+        bytes_received=100 if status is not None else 0,
+    )
+
+
+class TestEndpointName:
+    @pytest.mark.parametrize(
+        ("method", "url", "expected"),
+        [
+            ("POST", BATCHES_URL, "create_batch"),
+            ("GET", BATCHES_URL, "other"),
+            ("GET", f"{BATCHES_URL}/msgbatch_1", "get_batch"),
+            ("GET", f"{BATCHES_URL}/msgbatch_1/results", "download_results"),
+            ("POST", f"{BATCHES_URL}/msgbatch_1/cancel", "cancel_batch"),
+            ("POST", "https://api.anthropic.com/v1/messages", "send_message"),
+            ("GET", "https://api.anthropic.com/v1/models", "other"),
+        ],
+    )
+    def test_endpoints(self, method: str, url: str, expected: str) -> None:
+        assert endpoint_name(httpx.Request(method, url)) == expected
+
+
+class TestPercentiles:
+    def test_empty_and_single(self) -> None:
+        assert percentiles([]) == {}
+        assert percentiles([0.25]) == {"p50": 0.25, "p90": 0.25, "p95": 0.25, "p99": 0.25}
+
+    def test_sample(self) -> None:
+        result = percentiles([float(i) for i in range(1, 101)])
+        assert result == {"p50": 50.5, "p90": 90.1, "p95": 95.05, "p99": 99.01}
+
+
+class TestRequestMetrics:
+    @pytest.fixture
+    def metrics(self) -> RequestMetrics:
+        metrics = RequestMetrics()
+        for duration in (0.1, 0.3, 2.0):
+            metrics.record(sample(duration=duration))
+        metrics.record(sample(status=429))
+        metrics.record(sample(status=None))
+        metrics.record(sample("create_batch"))
+        return metrics
+
+    def test_summary(self, metrics: RequestMetrics) -> None:
+        summary = metrics.summary()
+        assert list(summary) == ["get_batch", "create_batch"]
+        entry = summary["get_batch"]
+        assert entry["requests"] == 5
+        assert entry["status_codes"] == {"200": 3, "429": 1, "error": 1}
+        assert entry["bytes_sent"] == 50 and entry["bytes_received"] == 400
+        assert entry["duration_seconds"]["max"] == 2.0
+        assert "connect_seconds" not in entry
+        assert entry["new_connections"] == 0
+
+    def test_prometheus(self, metrics: RequestMetrics) -> None:
+        lines = metrics.to_prometheus().splitlines()
+        metric = "batch_api_request_duration_seconds_bucket"
+        buckets = [line for line in lines if line.startswith(f'{metric}{{endpoint="get_batch"')]
+        counts = [int(line.rsplit(" ", 1)[1]) for line in buckets]
+        assert len(counts) == len(LATENCY_BUCKETS) + 1
+        assert counts == sorted(counts) and counts[-1] == 5
+        assert 'batch_api_requests_total{endpoint="get_batch",status="error"} 1' in lines
+        assert 'batch_api_bytes_sent_total{endpoint="create_batch"} 10' in lines
+
+    @pytest.mark.parametrize("suffix", [".prom", ".json"])
+    def test_write(self, metrics: RequestMetrics, tmp_path: Path, suffix: str) -> None:
+        path = tmp_path / "logs" / f"http-metrics{suffix}"
+        metrics.write(path)
+        text = path.read_text()
+        if suffix == ".prom":
+            assert text.startswith("# HELP batch_api_request_duration_seconds")
+        else:
+            assert json.loads(text)["get_batch"]["requests"] == 5
+
+
+class TestInstrumentedTransport:
+    def send(self, handler, method: str, url: str, **kwargs) -> RequestMetrics:
+        metrics = RequestMetrics()
+        transport = InstrumentedTransport(httpx.MockTransport(handler), metrics)
+
+        async def send():
+            async with httpx.AsyncClient(transport=transport) as http:
+                await http.request(method, url, **kwargs)
+
+        asyncio.run(send())
+        return metrics
+
+    def test_records_exchange(self) -> None:
+        metrics = self.send(
+            lambda request: httpx.Response(200, content=b"x" * 64),
+            "POST",
+            BATCHES_URL,
+            content=b"y" * 16,
+        )
+        (recorded,) = metrics.samples
+        assert recorded.endpoint == "create_batch" and recorded.status == 200
+        assert recorded.bytes_sent == 16 and recorded.bytes_received == 64
+        assert recorded.duration_seconds >= recorded.ttfb_seconds >= 0
+        assert recorded.connect_seconds is None
+
+    def test_records_failure(self) -> None:
+        metrics = RequestMetrics()
+
+        def refuse(request: httpx.Request) -> httpx.Response:
+            raise httpx.ConnectError("refused", request=request)
+
+        transport = InstrumentedTransport(httpx.MockTransport(refuse), metrics)
+
+        async def send():
+            async with httpx.AsyncClient(transport=transport) as http:
+                with pytest.raises(httpx.ConnectError):
+                    await http.get(f"{BATCHES_URL}/msgbatch_1")
+
+        asyncio.run(send())
+        (recorded,) = metrics.samples
+        assert recorded.status is None and recorded.ttfb_seconds is None
+
+
+@pytest.mark.parametrize("suffix", [".prom", ".json"])
+def test_metrics_option(cli, mark_pending, project: Path, suffix: str) -> None:
+    mark_pending({"app.py": "def f():\n    return 1\n"})
+    path = project / f"http-metrics{suffix}"
+    assert cli("--synthetic", "--metrics", str(path), "submit", "--wave", "1") == 0
+    text = path.read_text()
+    if suffix == ".prom":
+        assert 'batch_api_requests_total{endpoint="create_batch",status="200"} 1' in text
+    else:
+        assert json.loads(text)["create_batch"]["status_codes"] == {"200": 1}
@@ -0,0 +1,176 @@
+"""
+Unit tests for selective resubmission of failed batch items
+
+Tests cover:
+- is_resubmittable: expired, canceled and transient errors only
+- complete_group resubmits only failed requests, linked to the originals,
+  and reports the follow-up results in their place
+- Requests that keep failing stop after max_attempts follow-ups
+- request_with_retry: 429/5xx and transport errors, Retry-After
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+import submit_batch_verification
+from submit_batch_verification import (
+    WAVE_1_AGENTS,
+    BatchAPIClient,
+    BatchIndividualResult,
+    HTTPClientConfig,
+    is_resubmittable,
+    report_target,
+    retry_delay,
+)
+
+
+def result(**body) -> BatchIndividualResult:
+    return BatchIndividualResult(custom_id="security-auditor", result=body)
+
+
+def api_error(error_type: str) -> dict:
+    return {"type": "error", "error": {"type": error_type, "message": "x"}}
+
+
+class TestIsResubmittable:
+    @pytest.mark.parametrize(
+        ("body", "expected"),
+        [
+            ({"type": "expired"}, True),
+            ({"type": "canceled"}, True),
+            ({"type": "errored", "error": api_error("overloaded_error")}, True),
+            ({"type": "errored", "error": api_error("api_error")}, True),
+            ({"type": "errored", "error": api_error("invalid_request_error")}, False),
+            ({"type": "errored", "error": {"type": "authentication_error"}}, False),
+            ({"type": "succeeded", "message": {}}, False),
+        ],
+    )
+    def test_result_types(self, body, expected) -> None:
+        assert is_resubmittable(result(**body)) is expected
+
+
+class TestCompleteGroup:
+    def run(self, client, files, **kwargs):
+        async def scenario():
+            async with client:
+                group = await client.create_batch(WAVE_1_AGENTS, files)
+                statuses = await client.complete_group(group.id, **kwargs)
+                requests = client.registry.group_request_ids(group.id)
+                attempts = {r: client.registry.request_attempt(r) for r in requests}
+                superseded = client.registry.superseded_requests(group.id)
+                return statuses, attempts, superseded
+
+        return asyncio.run(scenario())
+
+    def test_only_failed_requests_resubmitted(
+        self, synthetic_client, make_sources, monkeypatch
+    ) -> None:
+        files = make_sources({"a.py": "a = 1\n"})
+        client = synthetic_client(error_rate=1.0)
+        submit_batch = client.submit_batch
+        submitted = []
+
+        async def submit_then_recover(shard):
+            submitted.append(len(shard))
+            status = await submit_batch(shard)
+            client.transport.error_rate = 0.0
+            return status
+
+        monkeypatch.setattr(client, "submit_batch", submit_then_recover)
+        statuses, attempts, superseded = self.run(client, files)
+
+        assert submitted == [len(WAVE_1_AGENTS), len(WAVE_1_AGENTS)]
+        assert [s.request_counts.errored for s in statuses] == [len(WAVE_1_AGENTS), 0]
+        assert sorted(attempts.values()) == [0] * len(WAVE_1_AGENTS) + [1] * len(WAVE_1_AGENTS)
+        assert superseded == {r for r, attempt in attempts.items() if attempt == 0}
+
+    def test_partial_failure(self, synthetic_client, make_sources) -> None:
+        files = make_sources({"a.py": "a = 1\n"})
+        # With seed 0, one of the three first requests fails
+        client = synthetic_client(error_rate=0.5)
+        statuses, attempts, superseded = self.run(client, files, max_attempts=1)
+        failed = statuses[0].request_counts.errored
+        assert 0 < failed < len(WAVE_1_AGENTS)
+        assert len(superseded) == failed
+        assert sum(1 for attempt in attempts.values() if attempt == 1) == failed
+
+    def test_stops_after_max_attempts(self, synthetic_client, make_sources) -> None:
+        files = make_sources({"a.py": "a = 1\n"})
+        client = synthetic_client(error_rate=1.0)
+        statuses, attempts, _ = self.run(client, files, max_attempts=2)
+        assert len(statuses) == 3
+        assert sorted(set(attempts.values())) == [0, 1, 2]
+
+    def test_report_uses_follow_up_results(self, synthetic_client, make_sources, capsys) -> None:
+        files = make_sources({"a.py": "a = 1\n"})
+        client = synthetic_client(error_rate=1.0)
+
+        async def scenario():
+            async with client:
+                group = await client.create_batch(WAVE_1_AGENTS, files)
+                client.transport.error_rate = 0.0
+                await client.complete_group(group.id)
+                await report_target(client, group.id)
+
+        asyncio.run(scenario())
+        out = capsys.readouterr().out
+        assert f"Results downloaded: {len(WAVE_1_AGENTS)}" in out
+        assert "Status: FAIL" not in out
+
+
+class TestRequestWithRetry:
+    @pytest.fixture(autouse=True)
+    def no_delay(self, monkeypatch) -> None:
+        monkeypatch.setattr(submit_batch_verification, "retry_delay", lambda *args: 0.0)
+
+    def send(self, project, responses, max_retries: int = 4):
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            response = responses[min(len(calls), len(responses)) - 1]
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        client = BatchAPIClient(
+            api_key="test",
+            http_config=HTTPClientConfig(max_retries=max_retries),
+            transport=httpx.MockTransport(handler),
+        )
+
+        async def scenario():
+            async with client:
+                return await client.request_with_retry("GET", "https://api.example/v1/x")
+
+        return asyncio.run(scenario()), calls
+
+    def test_retries_retryable_status(self, project) -> None:
+        responses = [httpx.Response(529), httpx.Response(429), httpx.Response(200, json={})]
+        response, calls = self.send(project, responses)
+        assert response.status_code == 200 and len(calls) == 3
+
+    def test_retries_transport_error(self, project) -> None:
+        responses = [httpx.ConnectError("refused"), httpx.Response(200, json={})]
+        response, calls = self.send(project, responses)
+        assert response.status_code == 200 and len(calls) == 2
+
+    def test_non_retryable_status(self, project) -> None:
+        with pytest.raises(httpx.HTTPStatusError):
+            self.send(project, [httpx.Response(400), httpx.Response(200)])
+
+    def test_gives_up_after_max_retries(self, project) -> None:
+        with pytest.raises(httpx.HTTPStatusError):
+            self.send(project, [httpx.Response(503)], max_retries=2)
+
+
+class TestRetryDelay:
+    def test_retry_after(self) -> None:
+        assert retry_delay(0, httpx.Response(429, headers={"retry-after": "7"})) == 7.0
+        assert retry_delay(0, httpx.Response(429, headers={"retry-after": "9999"})) == 60.0
+
+    def test_jittered_backoff(self) -> None:
+        assert all(0 <= retry_delay(3) <= 8 for _ in range(100))
+        assert 0 <= retry_delay(1, httpx.Response(503)) <= 2
@@ -0,0 +1,201 @@
+"""
+Unit tests for the compressed results archive
+
+Tests cover:
+- Frames of ARCHIVE_FRAME_LINES lines; one lookup reads one frame
+- Lookup by custom_id, agent and file; batch iteration in download order
+- Aborted writes and downloads leave nothing indexed
+- Lines holding U+2028, U+0085 and other separators read back whole
+- zstd archives when zstandard is installed, and without it
+- Downloaded batches are read back from the archive, not the network
+- The show command
+"""
+
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+import batch_storage
+from batch_storage import ResultsArchive, compress_frame, decompress_frame
+from submit_batch_verification import WAVE_1_AGENTS
+
+
+def line(custom_id: str) -> str:
+    return json.dumps({"custom_id": custom_id, "result": {"type": "succeeded", "message": {}}})
+
+
+@pytest.fixture
+def zlib_only(monkeypatch) -> None:
+    monkeypatch.setattr(batch_storage, "zstandard", None)
+
+
+@pytest.fixture
+def archive(tmp_path: Path, zlib_only, monkeypatch):
+    monkeypatch.setattr(batch_storage, "ARCHIVE_FRAME_LINES", 3)
+    archive = ResultsArchive(tmp_path / "results-archive")
+    yield archive
+    archive.close()
+
+
+def write_batch(archive: ResultsArchive, batch_id: str, count: int) -> list[str]:
+    writer = archive.writer(batch_id)
+    custom_ids = [f"{batch_id}-r{i}" for i in range(count)]
+    for index, custom_id in enumerate(custom_ids):
+        agent = "security-auditor" if index % 2 else "code-reviewer"
+        writer.add(line(custom_id), custom_id, agent, [f"src/m{index % 3}.py"], "succeeded")
+    writer.close()
+    return custom_ids
+
+
+class TestResultsArchive:
+    def test_one_frame_per_lookup(self, archive: ResultsArchive, monkeypatch) -> None:
+        custom_ids = write_batch(archive, "msgbatch_1", 7)
+        assert archive.codec == "zlib"
+        decompressed = []
+
+        def counting_decompress(data: bytes, codec: str) -> bytes:
+            decompressed.append(data)
+            return decompress_frame(data, codec)
+
+        monkeypatch.setattr(batch_storage, "decompress_frame", counting_decompress)
+        assert json.loads(archive.get(custom_ids[4]))["custom_id"] == custom_ids[4]
+        assert len(decompressed) == 1
+        # 7 lines in frames of 3
+        assert len(list(archive.iter_batch("msgbatch_1"))) == 7
+        assert len(decompressed) == 1 + 3
+
+    def test_iter_batch_in_order(self, archive: ResultsArchive) -> None:
+        custom_ids = write_batch(archive, "msgbatch_1", 7)
+        write_batch(archive, "msgbatch_2", 2)
+        lines = list(archive.iter_batch("msgbatch_1"))
+        assert [json.loads(x)["custom_id"] for x in lines] == custom_ids
+        with pytest.raises(KeyError):
+            list(archive.iter_batch("msgbatch_missing"))
+
+    def test_find(self, archive: ResultsArchive) -> None:
+        custom_ids = write_batch(archive, "msgbatch_1", 7)
+        by_agent = archive.find(agent="security-auditor")
+        assert [c for c, _, _ in by_agent] == custom_ids[1::2]
+        by_file = archive.find(file_path="src/m0.py")
+        assert [c for c, _, _ in by_file] == custom_ids[::3]
+        both = archive.find(agent="security-auditor", file_path="src/m0.py")
+        assert both == [(custom_ids[3], "msgbatch_1", "succeeded")]
+        assert archive.get("missing") is None
+
+    def test_abort_leaves_nothing(self, archive: ResultsArchive) -> None:
+        writer = archive.writer("msgbatch_1")
+        writer.add(line("r0"), "r0", "code-reviewer", [], "succeeded")
+        writer.abort()
+        assert not archive.has_batch("msgbatch_1")
+        assert not writer.path.exists()
+        assert archive.get("r0") is None
+
+    def test_unicode_line_separators(self, archive: ResultsArchive) -> None:
+        writer = archive.writer("msgbatch_1")
+        lines = []
+        for index, separator in enumerate(["\u2028", "\u2029", "\x85", "\x1c", "\x1e"]):
+            result = {"type": "succeeded", "message": {"text": f"a{separator}b"}}
+            body = {"custom_id": f"r{index}", "result": result}
+            lines.append(json.dumps(body, ensure_ascii=False))
+            writer.add(lines[-1], f"r{index}", "code-reviewer", [], "succeeded")
+        writer.close()
+        assert list(archive.iter_batch("msgbatch_1")) == lines
+        assert [archive.get(f"r{index}") for index in range(len(lines))] == lines
+
+    def test_survives_reopen(self, archive: ResultsArchive) -> None:
+        custom_ids = write_batch(archive, "msgbatch_1", 4)
+        reopened = ResultsArchive(archive.root)
+        try:
+            assert reopened.has_batch("msgbatch_1")
+            assert json.loads(reopened.get(custom_ids[3]))["custom_id"] == custom_ids[3]
+        finally:
+            reopened.close()
+
+
+class TestCodecs:
+    def test_zlib_round_trip(self) -> None:
+        assert decompress_frame(compress_frame(b"x" * 1000, "zlib"), "zlib") == b"x" * 1000
+
+    def test_zstd_round_trip(self) -> None:
+        pytest.importorskip("zstandard")
+        assert decompress_frame(compress_frame(b"x" * 1000, "zstd"), "zstd") == b"x" * 1000
+
+    def test_zstd_archive_without_zstandard(self, tmp_path: Path, zlib_only) -> None:
+        archive = ResultsArchive(tmp_path)
+        try:
+            write_batch(archive, "msgbatch_1", 1)
+            archive._conn.execute("UPDATE archived_batches SET codec = 'zstd'")
+            # Unreadable here, so the batch is downloaded again
+            assert not archive.has_batch("msgbatch_1")
+        finally:
+            archive.close()
+        with pytest.raises(RuntimeError, match="zstandard is required"):
+            decompress_frame(b"", "zstd")
+
+
+class TestDownloads:
+    def test_second_read_comes_from_archive(
+        self, synthetic_client, make_sources, monkeypatch
+    ) -> None:
+        files = make_sources({"a.py": "a = 1\n"})
+        client = synthetic_client()
+        downloads = []
+        handle = client.transport.handle_async_request
+
+        async def counting_handle(request):
+            if request.url.path.endswith("/results"):
+                downloads.append(request.url.path)
+            return await handle(request)
+
+        monkeypatch.setattr(client.transport, "handle_async_request", counting_handle)
+
+        async def scenario():
+            async with client:
+                group = await client.create_batch(WAVE_1_AGENTS, files)
+                await client.complete_group(group.id)
+                (batch_id,) = group.batch_ids
+                first = [r.custom_id async for r in client.iter_results(batch_id)]
+                second = [r.custom_id async for r in client.iter_results(batch_id)]
+                return first, second, client.results_archive.find(agent=WAVE_1_AGENTS[0].name)
+
+        first, second, by_agent = asyncio.run(scenario())
+        assert first == second and len(first) == len(WAVE_1_AGENTS)
+        assert len(downloads) == 1
+        assert len(by_agent) == 1
+
+    def test_abandoned_download_not_archived(self, synthetic_client, make_sources) -> None:
+        files = make_sources({"a.py": "a = 1\n"})
+        client = synthetic_client()
+
+        async def scenario():
+            async with client:
+                group = await client.create_batch(WAVE_1_AGENTS, files)
+                # complete_group would read (and archive) the results itself
+                await client.poll_group(group.batch_ids)
+                (batch_id,) = group.batch_ids
+                results = client.iter_results(batch_id)
+                await anext(results)
+                await results.aclose()
+                return client.results_archive.has_batch(batch_id)
+
+        assert asyncio.run(scenario()) is False
+
+
+def test_show_command(cli, mark_pending, capsys) -> None:
+    mark_pending({"app.py": "def f():\n    return 1\n"})
+    assert cli("--synthetic", "submit", "--wave", "1") == 0
+    assert cli("--synthetic", "poll") == 0
+    assert cli("--synthetic", "results") == 0
+    capsys.readouterr()
+
+    assert cli("--synthetic", "show", "--agent", "security-auditor") == 0
+    (listed,) = capsys.readouterr().out.splitlines()
+    custom_id, _, result_type = listed.split()
+    assert custom_id.startswith("security-auditor") and result_type == "succeeded"
+
+    assert cli("--synthetic", "show", custom_id) == 0
+    assert json.loads(capsys.readouterr().out)["custom_id"] == custom_id
+    assert cli("--synthetic", "show", "missing") == 1
+    assert "not in the results archive" in capsys.readouterr().out
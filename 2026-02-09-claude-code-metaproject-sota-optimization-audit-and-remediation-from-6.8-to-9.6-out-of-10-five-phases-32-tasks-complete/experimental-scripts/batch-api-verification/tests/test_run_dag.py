@@ -0,0 +1,113 @@
+"""
+Unit tests for the `run` command's dependency DAG
+
+Tests cover:
+- validate_agent_dag: unknown dependencies and cycles
+- Shipped agents declare no dependencies, so `run` submits wave 2 before
+  wave 1 ends
+- A dependent batch is only submitted after its predecessor is reported
+- Independent agents start without waiting for each other
+"""
+
+import asyncio
+import dataclasses
+
+import pytest
+
+import submit_batch_verification
+from submit_batch_verification import (
+    ALL_AGENTS,
+    AGENTS_BY_NAME,
+    WAVE_1_AGENTS,
+    WAVE_2_AGENTS,
+    run_verification_dag,
+    validate_agent_dag,
+)
+
+
+def agent(name: str, wave: int, depends_on: tuple[str, ...] = ()):
+    """A real agent configuration under another name."""
+    return dataclasses.replace(
+        AGENTS_BY_NAME["best-practices-enforcer"], name=name, wave=wave, depends_on=depends_on
+    )
+
+
+@pytest.fixture
+def events(monkeypatch) -> list[tuple[str, tuple[str, ...]]]:
+    """Record ("submitted" | "reported", agent names) in order."""
+    recorded: list[tuple[str, tuple[str, ...]]] = []
+    create_batch = submit_batch_verification.BatchAPIClient.create_batch
+    report_target = submit_batch_verification.report_target
+
+    async def recording_create_batch(self, agents, *args, **kwargs):
+        recorded.append(("submitted", tuple(a.name for a in agents)))
+        return await create_batch(self, agents, *args, **kwargs)
+
+    async def recording_report_target(client, target, findings=None, costs=None, agents=None):
+        path = await report_target(client, target, findings, costs, agents)
+        recorded.append(("reported", tuple(a.name for a in agents)))
+        return path
+
+    monkeypatch.setattr(
+        submit_batch_verification.BatchAPIClient, "create_batch", recording_create_batch
+    )
+    monkeypatch.setattr(submit_batch_verification, "report_target", recording_report_target)
+    return recorded
+
+
+def run_dag(client, agents, files) -> list:
+    async def main():
+        async with client:
+            return await run_verification_dag(client, agents, files)
+
+    return asyncio.run(main())
+
+
+class TestValidateAgentDag:
+    def test_shipped_agents(self) -> None:
+        validate_agent_dag(ALL_AGENTS)
+
+    def test_unknown_dependency(self) -> None:
+        with pytest.raises(ValueError, match="unknown agents"):
+            validate_agent_dag([agent("a", 1, depends_on=("missing",))])
+
+    def test_cycle(self) -> None:
+        with pytest.raises(ValueError, match="Dependency cycle"):
+            validate_agent_dag([agent("a", 1, depends_on=("b",)), agent("b", 1, depends_on=("a",))])
+
+
+class TestWaveOrdering:
+    def test_no_wave_barrier(self) -> None:
+        # No shipped agent reads another agent's findings
+        assert all(a.depends_on == () for a in ALL_AGENTS)
+
+    def test_wave_2_submitted_before_wave_1_ends(
+        self, synthetic_client, make_sources, events, capsys
+    ) -> None:
+        files = make_sources({"src/app.py": "def f(x):\n    return x\n"})
+        reports = run_dag(synthetic_client(polls_to_complete=3), ALL_AGENTS, files)
+        wave_1 = tuple(a.name for a in WAVE_1_AGENTS)
+        wave_2 = tuple(a.name for a in WAVE_2_AGENTS)
+        assert events[:2] == [("submitted", wave_1), ("submitted", wave_2)]
+        assert events.index(("submitted", wave_2)) < events.index(("reported", wave_1))
+        assert len(reports) == 2
+
+
+class TestDependencies:
+    def test_dependent_waits_for_predecessor(
+        self, synthetic_client, make_sources, events, capsys
+    ) -> None:
+        files = make_sources({"src/app.py": "def f(x):\n    return x\n"})
+        agents = [agent("first", 1), agent("second", 2, depends_on=("first",))]
+        run_dag(synthetic_client(polls_to_complete=3), agents, files)
+        assert events.index(("submitted", ("second",))) > events.index(("reported", ("first",)))
+
+    def test_independent_agents_start_together(
+        self, synthetic_client, make_sources, events, capsys
+    ) -> None:
+        files = make_sources({"src/app.py": "def f(x):\n    return x\n"})
+        agents = [agent("first", 1), agent("other", 2), agent("second", 2, depends_on=("first",))]
+        run_dag(synthetic_client(polls_to_complete=3), agents, files)
+        submitted = [names for kind, names in events if kind == "submitted"]
+        assert submitted[:2] == [("first",), ("other",)]
+        assert events.index(("submitted", ("second",))) > events.index(("reported", ("first",)))
@@ -0,0 +1,116 @@
+"""
+Unit tests for the batch payload serialization backends
+
+Tests cover:
+- orjson and pydantic encode the same requests to the same JSON, for the
+  prompt-caching, plain and structured-output layouts
+- Both backends validate every built request and decoded result
+- get_serializer: unknown names and the fallback when orjson is missing
+"""
+
+import json
+
+import pytest
+from pydantic import ValidationError
+
+import submit_batch_verification
+from submit_batch_verification import (
+    ALL_AGENTS,
+    OrjsonSerializer,
+    PydanticSerializer,
+    get_serializer,
+)
+
+SERIALIZERS = [PydanticSerializer, OrjsonSerializer]
+
+RESULT_LINE = json.dumps(
+    {
+        "custom_id": "security-auditor",
+        "result": {
+            "type": "succeeded",
+            "message": {"content": [{"type": "text", "text": "{}"}], "usage": {}},
+        },
+    }
+)
+
+
+@pytest.fixture
+def files(make_sources) -> list[str]:
+    return make_sources({"src/a.py": "a = 1\n", "src/b.py": 'b = "ü"\n'})
+
+
+def build(synthetic_client, files, **kwargs):
+    prompt_caching = kwargs.pop("prompt_caching", True)
+    client = synthetic_client(client_kwargs=kwargs)
+    shards = {agent.name: [files] for agent in ALL_AGENTS}
+    return client, client.build_requests(ALL_AGENTS, shards, prompt_caching=prompt_caching)
+
+
+class TestEncodingParity:
+    @pytest.mark.parametrize(
+        "options",
+        [
+            {},
+            {"prompt_caching": False},
+            {"structured_output": True},
+        ],
+        ids=["prompt-caching", "plain", "structured"],
+    )
+    def test_same_json(self, synthetic_client, files, options) -> None:
+        _, requests = build(synthetic_client, files, **options)
+        for request in requests:
+            pydantic_line = PydanticSerializer().encode_request(request)
+            orjson_line = OrjsonSerializer().encode_request(request)
+            assert json.loads(orjson_line) == json.loads(pydantic_line)
+
+    def test_client_uses_backend(self, synthetic_client, files) -> None:
+        client, requests = build(synthetic_client, files, serializer="orjson")
+        assert isinstance(client.serializer, OrjsonSerializer)
+        assert json.loads(client.serializer.encode_request(requests[0]))["custom_id"]
+
+
+@pytest.mark.parametrize("serializer_class", SERIALIZERS)
+class TestValidation:
+    def test_build_request(self, serializer_class) -> None:
+        request = serializer_class().build_request(
+            "code-reviewer",
+            {"max_tokens": 100, "messages": [{"role": "user", "content": "hi"}]},
+        )
+        assert request.params.messages[0].role == "user"
+
+    def test_build_rejects_invalid_params(self, serializer_class) -> None:
+        serializer = serializer_class()
+        with pytest.raises(ValidationError):
+            serializer.build_request("x", {"model": "gpt-4", "messages": []})
+        with pytest.raises(ValidationError):
+            serializer.build_request(
+                "x", {"max_tokens": 0, "messages": [{"role": "user", "content": "hi"}]}
+            )
+        with pytest.raises(ValidationError):
+            serializer.build_request("x", {"messages": [{"role": "system", "content": "hi"}]})
+
+    def test_decode_result(self, serializer_class) -> None:
+        serializer = serializer_class()
+        result = serializer.decode_result(RESULT_LINE)
+        assert result.custom_id == "security-auditor"
+        assert serializer.decode_result(RESULT_LINE.encode()) == result
+
+    def test_decode_rejects_invalid_result(self, serializer_class) -> None:
+        with pytest.raises(ValidationError):
+            serializer_class().decode_result('{"custom_id": 1, "result": {}}')
+        with pytest.raises(ValidationError):
+            serializer_class().decode_result('{"custom_id": "x"')
+
+
+class TestGetSerializer:
+    def test_by_name(self) -> None:
+        assert isinstance(get_serializer("pydantic"), PydanticSerializer)
+        assert isinstance(get_serializer("orjson"), OrjsonSerializer)
+
+    def test_unknown_name(self) -> None:
+        with pytest.raises(ValueError, match="serializer must be one of"):
+            get_serializer("msgspec")
+
+    def test_orjson_missing(self, monkeypatch) -> None:
+        monkeypatch.setattr(submit_batch_verification, "orjson", None)
+        assert type(get_serializer("orjson")) is PydanticSerializer
@@ -0,0 +1,108 @@
+"""
+Unit tests for the shared pooled HTTP client
+
+Tests cover:
+- One AsyncClient serves create, poll and download; reopened after close
+- Authentication and version headers on every request
+- live_transport pool limits and the HTTP/1.1 fallback without h2
+- http_config_from_args maps the CLI options
+"""
+
+import argparse
+import asyncio
+
+import httpx
+
+import batch_transports
+from submit_batch_verification import (
+    WAVE_1_AGENTS,
+    BatchAPIClient,
+    HTTPClientConfig,
+    http_config_from_args,
+    live_transport,
+)
+
+
+def test_one_client_for_every_call(synthetic_client, make_sources, monkeypatch) -> None:
+    files = make_sources({"a.py": "a = 1\n"})
+    client = synthetic_client()
+    seen = []
+    handle = client.transport.handle_async_request
+
+    async def recording_handle(request):
+        seen.append((client.http, request.headers))
+        return await handle(request)
+
+    monkeypatch.setattr(client.transport, "handle_async_request", recording_handle)
+
+    async def scenario():
+        async with client:
+            group = await client.create_batch(WAVE_1_AGENTS, files)
+            await client.complete_group(group.id)
+            first = client.http
+        closed = client._http
+        async with client:
+            return first, closed, client.http
+
+    first, closed, reopened = asyncio.run(scenario())
+    # create, poll and download at least
+    assert len(seen) >= 3
+    assert all(http is first for http, _ in seen)
+    assert closed is None and reopened is not first
+    assert all(h["anthropic-version"] == client.anthropic_version for _, h in seen)
+    assert all("x-api-key" in h for _, h in seen)
+
+
+def test_api_key_header(project) -> None:
+    keys = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        keys.append(request.headers["x-api-key"])
+        return httpx.Response(200, json={})
+
+    client = BatchAPIClient(api_key="sk-test", transport=httpx.MockTransport(handler))
+
+    async def scenario():
+        async with client:
+            await client.http.get("https://api.example/v1/x")
+            await client.http.get("https://api.example/v1/y")
+
+    asyncio.run(scenario())
+    assert keys == ["sk-test", "sk-test"]
+
+
+class TestLiveTransport:
+    def test_pool_limits(self) -> None:
+        config = HTTPClientConfig(
+            max_connections=7, max_keepalive_connections=3, keepalive_expiry_seconds=30.0
+        )
+        pool = live_transport(config)._pool
+        assert pool._max_connections == 7
+        assert pool._max_keepalive_connections == 3
+        assert pool._keepalive_expiry == 30.0
+
+    def test_http1_fallback_without_h2(self, monkeypatch) -> None:
+        monkeypatch.setattr(batch_transports.importlib.util, "find_spec", lambda name: None)
+        assert live_transport(HTTPClientConfig(http2=True))._pool._http2 is False
+
+    def test_http1_requested(self) -> None:
+        assert live_transport(HTTPClientConfig(http2=False))._pool._http2 is False
+
+
+def test_http_config_from_args() -> None:
+    args = argparse.Namespace(
+        no_http2=True,
+        timeout=12.5,
+        max_connections=4,
+        max_keepalive_connections=2,
+        keepalive_expiry=60.0,
+        max_retries=0,
+    )
+    assert http_config_from_args(args) == HTTPClientConfig(
+        http2=False,
+        timeout_seconds=12.5,
+        max_connections=4,
+        max_keepalive_connections=2,
+        keepalive_expiry_seconds=60.0,
+        max_retries=0,
+    )
@@ -0,0 +1,163 @@
+"""
+Unit tests for streaming JSONL results downloads
+
+Tests cover:
+- iter_results yields each line as it arrives, across chunk boundaries
+- Blank lines are skipped; download_results collects the stream
+- Only "\n" ends a line; U+2028 and other separators inside JSON strings do not
+- Retryable failures before the first line are retried
+- A stream broken mid-file is not retried and nothing is archived
+- A batch without results_url is rejected
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+import submit_batch_verification
+from submit_batch_verification import BatchAPIClient, HTTPClientConfig
+
+BATCH_ID = "msgbatch_1"
+RESULTS_URL = f"https://api.example/v1/messages/batches/{BATCH_ID}/results"
+
+
+def status(results_url: str | None = RESULTS_URL) -> dict:
+    return {
+        "id": BATCH_ID,
+        "type": "message_batch",
+        "processing_status": "ended" if results_url else "in_progress",
+        "request_counts": {"succeeded": 3},
+        "created_at": "2026-02-08T12:00:00Z",
+        "expires_at": "2026-02-09T12:00:00Z",
+        "results_url": results_url,
+    }
+
+
+def line(index: int) -> bytes:
+    result = {"type": "succeeded", "message": {"content": [], "usage": {}}}
+    return json.dumps({"custom_id": f"code-reviewer-r{index}", "result": result}).encode()
+
+
+class ChunkedStream(httpx.AsyncByteStream):
+    """Response body sent chunk by chunk, optionally failing at the end."""
+
+    def __init__(self, chunks: list[bytes], error: Exception | None = None) -> None:
+        self.chunks = chunks
+        self.error = error
+        self.sent = 0
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            self.sent += 1
+            yield chunk
+        if self.error is not None:
+            raise self.error
+
+
+@pytest.fixture(autouse=True)
+def no_delay(monkeypatch) -> None:
+    monkeypatch.setattr(submit_batch_verification, "retry_delay", lambda *args: 0.0)
+
+
+def make_client(results, batch_status: dict | None = None) -> tuple[BatchAPIClient, list]:
+    """Client whose results downloads are answered from ``results`` in turn."""
+    downloads = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if not request.url.path.endswith("/results"):
+            return httpx.Response(200, json=batch_status or status())
+        downloads.append(request)
+        response = results[min(len(downloads), len(results)) - 1]
+        return response() if callable(response) else response
+
+    client = BatchAPIClient(
+        api_key="test",
+        http_config=HTTPClientConfig(max_retries=2),
+        transport=httpx.MockTransport(handler),
+    )
+    return client, downloads
+
+
+def run(client: BatchAPIClient, scenario):
+    async def wrapped():
+        async with client:
+            return await scenario()
+
+    return asyncio.run(wrapped())
+
+
+def test_yields_lines_as_they_arrive(project) -> None:
+    body = b"\n".join(line(i) for i in range(3)) + b"\n\n"
+    # Split mid-line so lines span chunks
+    stream = ChunkedStream([body[i : i + 50] for i in range(0, len(body), 50)])
+    client, _ = make_client([httpx.Response(200, stream=stream)])
+
+    async def scenario():
+        results = client.iter_results(BATCH_ID)
+        first = await anext(results)
+        sent_at_first = stream.sent
+        rest = [result async for result in results]
+        return first, sent_at_first, rest
+
+    first, sent_at_first, rest = run(client, scenario)
+    assert first.custom_id == "code-reviewer-r0"
+    assert sent_at_first < len(stream.chunks)
+    assert [r.custom_id for r in rest] == ["code-reviewer-r1", "code-reviewer-r2"]
+
+
+def test_unicode_line_separators(project) -> None:
+    text = "Secret on line 3\u2028second line\u2029\x85\x1c"
+    result = {"type": "succeeded", "message": {"content": [{"type": "text", "text": text}]}}
+    raw = json.dumps({"custom_id": "code-reviewer-r0", "result": result}, ensure_ascii=False)
+    body = raw.encode() + b"\n" + line(1) + b"\n"
+    stream = ChunkedStream([body[i : i + 7] for i in range(0, len(body), 7)])
+    client, _ = make_client([httpx.Response(200, stream=stream)])
+
+    results = run(client, lambda: client.download_results(BATCH_ID))
+    assert [r.custom_id for r in results] == ["code-reviewer-r0", "code-reviewer-r1"]
+    assert results[0].result["message"]["content"][0]["text"] == text
+
+
+def test_download_results_collects(project) -> None:
+    body = b"\n".join(line(i) for i in range(3))
+    client, _ = make_client([httpx.Response(200, content=body)])
+    results = run(client, lambda: client.download_results(BATCH_ID))
+    assert len(results) == 3
+
+
+def test_retries_before_first_line(project) -> None:
+    def broken() -> httpx.Response:
+        raise httpx.ConnectError("refused")
+
+    client, downloads = make_client(
+        [httpx.Response(503), broken, httpx.Response(200, content=line(0))]
+    )
+    results = run(client, lambda: client.download_results(BATCH_ID))
+    assert len(results) == 1 and len(downloads) == 3
+
+
+def test_broken_stream_not_retried(project) -> None:
+    stream = ChunkedStream([line(0) + b"\n"], error=httpx.ReadError("reset"))
+    client, downloads = make_client([httpx.Response(200, stream=stream)])
+    received = []
+
+    async def scenario():
+        with pytest.raises(httpx.ReadError):
+            async for result in client.iter_results(BATCH_ID):
+                received.append(result)
+        return client.results_archive.has_batch(BATCH_ID)
+
+    assert run(client, scenario) is False
+    assert len(received) == 1 and len(downloads) == 1
+
+
+def test_no_results_url(project) -> None:
+    client, _ = make_client([], batch_status=status(results_url=None))
+
+    async def scenario():
+        with pytest.raises(ValueError, match="has no results_url yet"):
+            await client.download_results(BATCH_ID)
+
+    run(client, scenario)
@@ -0,0 +1,133 @@
+"""
+Unit tests for structured output through the findings tool
+
+Tests cover:
+- findings_prompt_hash separates plain and structured modes and follows
+  changes to the tool schema and system prompt
+- structured_prompt_template drops the prose schema and names report_fields
+- Structured requests carry FINDINGS_TOOL with a forced tool_choice
+- Tool-call responses parse with method "tool"; text is the fallback
+"""
+
+import asyncio
+import json
+
+import pytest
+
+import submit_batch_verification
+from submit_batch_verification import (
+    FINDINGS_TOOL,
+    FINDINGS_TOOL_NAME,
+    OUTPUT_SCHEMA_HEADING,
+    VERIFICATION_TOOL_SYSTEM_PROMPT,
+    WAVE_1_AGENTS,
+    BatchIndividualResult,
+    findings_prompt_hash,
+    structured_prompt_template,
+)
+
+AGENT = WAVE_1_AGENTS[0]
+FINDINGS = {"findings": [], "summary": {"total": 0}}
+
+
+class TestFindingsPromptHash:
+    def test_modes_differ(self) -> None:
+        assert findings_prompt_hash(AGENT) != findings_prompt_hash(AGENT, True)
+        assert findings_prompt_hash(AGENT) == findings_prompt_hash(AGENT, False)
+
+    def test_follows_tool_schema(self, monkeypatch) -> None:
+        before = findings_prompt_hash(AGENT, True)
+        changed = {**FINDINGS_TOOL, "description": "Record findings."}
+        monkeypatch.setattr(submit_batch_verification, "FINDINGS_TOOL", changed)
+        assert findings_prompt_hash(AGENT, True) != before
+        assert findings_prompt_hash(AGENT) == findings_prompt_hash(AGENT, False)
+
+    def test_follows_tool_system_prompt(self, monkeypatch) -> None:
+        before = findings_prompt_hash(AGENT, True)
+        plain = findings_prompt_hash(AGENT)
+        monkeypatch.setattr(
+            submit_batch_verification,
+            "VERIFICATION_TOOL_SYSTEM_PROMPT",
+            VERIFICATION_TOOL_SYSTEM_PROMPT + " Be brief.",
+        )
+        assert findings_prompt_hash(AGENT, True) != before
+        assert findings_prompt_hash(AGENT) == plain
+
+
+class TestStructuredPromptTemplate:
+    @pytest.mark.parametrize("agent", WAVE_1_AGENTS, ids=lambda agent: agent.name)
+    def test_schema_replaced_by_tool(self, agent) -> None:
+        template = structured_prompt_template(agent)
+        assert OUTPUT_SCHEMA_HEADING in agent.prompt_template
+        assert OUTPUT_SCHEMA_HEADING not in template
+        assert "{files}" in template and FINDINGS_TOOL_NAME in template
+        assert all(field in template for field in agent.report_fields)
+
+
+class TestBuildRequests:
+    def build(self, synthetic_client, make_sources, structured_output: bool):
+        (path,) = make_sources({"a.py": "a = 1\n"})
+        client = synthetic_client({"structured_output": structured_output})
+        shards = {agent.name: [[path]] for agent in WAVE_1_AGENTS}
+        return client.build_requests(WAVE_1_AGENTS, shards)
+
+    def test_structured(self, synthetic_client, make_sources) -> None:
+        for request in self.build(synthetic_client, make_sources, True):
+            assert request.params.tools == [FINDINGS_TOOL]
+            assert request.params.tool_choice == {"type": "tool", "name": FINDINGS_TOOL_NAME}
+            assert request.params.system[0].text == VERIFICATION_TOOL_SYSTEM_PROMPT
+
+    def test_plain(self, synthetic_client, make_sources) -> None:
+        for request in self.build(synthetic_client, make_sources, False):
+            assert request.params.tools is None and request.params.tool_choice is None
+            assert OUTPUT_SCHEMA_HEADING in request.params.messages[0].content
+
+
+def succeeded(*blocks: dict) -> BatchIndividualResult:
+    message = {"content": list(blocks), "stop_reason": "tool_use", "usage": {}}
+    return BatchIndividualResult(
+        custom_id="security-auditor", result={"type": "succeeded", "message": message}
+    )
+
+
+def tool_use(tool_input, name: str = FINDINGS_TOOL_NAME) -> dict:
+    return {"type": "tool_use", "id": "toolu_1", "name": name, "input": tool_input}
+
+
+class TestParseToolUse:
+    @pytest.fixture
+    def client(self, synthetic_client):
+        return synthetic_client({"structured_output": True})
+
+    def test_tool_call(self, client) -> None:
+        parsed = client.parse_agent_findings(succeeded(tool_use(FINDINGS)))
+        assert parsed["status"] == "PASS" and parsed["recovered"] == 0
+        assert client.parse_stats == {"tool": 1}
+
+    def test_text_fallback(self, client) -> None:
+        result = succeeded(
+            tool_use({"note": "no findings key"}),
+            tool_use(FINDINGS, name="other_tool"),
+            {"type": "text", "text": f"```json\n{json.dumps(FINDINGS)}\n```"},
+        )
+        parsed = client.parse_agent_findings(result)
+        assert parsed["status"] == "PASS" and parsed["recovered"] == 1
+        assert client.parse_stats == {"fenced": 1}
+
+
+def test_synthetic_run(synthetic_client, make_sources) -> None:
+    files = make_sources({"a.py": "a = 1\n"})
+    client = synthetic_client({"structured_output": True})
+
+    async def scenario():
+        async with client:
+            group = await client.create_batch(WAVE_1_AGENTS, files)
+            await client.complete_group(group.id)
+            return [
+                client.parse_agent_findings(result)
+                async for result in client.iter_group_results(group.batch_ids)
+            ]
+
+    parsed = asyncio.run(scenario())
+    assert [p["status"] for p in parsed] == ["PASS"] * len(WAVE_1_AGENTS)
+    assert client.parse_stats == {"tool": len(WAVE_1_AGENTS)}
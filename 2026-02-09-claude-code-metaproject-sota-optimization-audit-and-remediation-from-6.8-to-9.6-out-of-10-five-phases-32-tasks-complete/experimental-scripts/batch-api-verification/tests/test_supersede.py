@@ -0,0 +1,150 @@
+"""
+Unit tests for superseding in-flight requests whose files changed
+
+Tests cover:
+- stale_files compares current content with the hashes a request was built from
+- supersede_stale cancels in-flight batches and submits a delta batch
+- Each file is hashed once per round, however many requests cover it
+- At most SUPERSEDE_MAX_ROUNDS delta batches per group
+- complete_group reports current results after a mid-flight change
+- Requests canceled along with stale ones are resubmitted outside the
+  retry budget, even with max_attempts 0
+"""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+import submit_batch_verification
+from submit_batch_verification import SUPERSEDE_MAX_ROUNDS, WAVE_1_AGENTS, report_target
+
+
+@pytest.fixture
+def files(make_sources) -> list[str]:
+    return make_sources({"a.py": "a = 1\n", "b.py": "b = 2\n"})
+
+
+@pytest.fixture
+def client(synthetic_client):
+    # Batches stay in progress long enough to be superseded
+    return synthetic_client(polls_to_complete=3)
+
+
+def run(client, scenario):
+    async def wrapped():
+        async with client:
+            return await scenario()
+
+    return asyncio.run(wrapped())
+
+
+def test_stale_files(client, files) -> None:
+    async def scenario():
+        group = await client.create_batch(WAVE_1_AGENTS[:1], files)
+        (custom_id,) = client.registry.group_request_ids(group.id)
+        before = client.stale_files(custom_id)
+        Path(files[1]).write_text("b = 3\n")
+        Path(files[0]).unlink()
+        return before, client.stale_files(custom_id)
+
+    assert run(client, scenario) == ([], files)
+
+
+def test_supersede_cancels_and_resubmits(client, files) -> None:
+    async def scenario():
+        group = await client.create_batch(WAVE_1_AGENTS, files)
+        nothing = await client.supersede_stale(group.id)
+        Path(files[0]).write_text("a = 3\n")
+        delta = await client.supersede_stale(group.id)
+        return group, nothing, delta, {
+            "original": client.registry.batch_processing_status(group.batch_ids[0]),
+            "superseded": client.registry.superseded_requests(group.id),
+            "requests": client.registry.group_request_ids(group.id),
+        }
+
+    group, nothing, delta, state = run(client, scenario)
+    assert nothing == []
+    assert len(delta) == 1 and delta[0] not in group.batch_ids
+    assert state["original"] == "ended"
+    assert len(state["superseded"]) == len(WAVE_1_AGENTS)
+    assert len(state["requests"]) == 2 * len(WAVE_1_AGENTS)
+    assert client.supersede_rounds[group.id] == 1
+
+
+def test_files_hashed_once_per_round(client, files, monkeypatch) -> None:
+    hashed = []
+    hash_file_content = submit_batch_verification.hash_file_content
+
+    def counting_hash(file_path):
+        hashed.append(file_path)
+        return hash_file_content(file_path)
+
+    async def scenario():
+        group = await client.create_batch(WAVE_1_AGENTS, files)
+        Path(files[0]).write_text("a = 3\n")
+        monkeypatch.setattr(submit_batch_verification, "hash_file_content", counting_hash)
+        await client.supersede_stale(group.id)
+
+    run(client, scenario)
+    assert sorted(hashed) == sorted(files)
+
+
+def test_rounds_capped(client, files) -> None:
+    async def scenario():
+        group = await client.create_batch(WAVE_1_AGENTS[:1], files)
+        deltas = []
+        for round_number in range(SUPERSEDE_MAX_ROUNDS + 2):
+            Path(files[0]).write_text(f"a = {round_number}\n")
+            deltas.append(await client.supersede_stale(group.id))
+        return group, deltas
+
+    group, deltas = run(client, scenario)
+    assert [len(d) for d in deltas] == [1] * SUPERSEDE_MAX_ROUNDS + [0, 0]
+    assert client.supersede_rounds[group.id] == SUPERSEDE_MAX_ROUNDS
+
+
+def test_complete_group_reports_current_results(client, files, capsys) -> None:
+    async def scenario():
+        group = await client.create_batch(WAVE_1_AGENTS, files)
+        Path(files[1]).write_text("b = 3\n")
+        await client.complete_group(group.id)
+        await report_target(client, group.id)
+
+    run(client, scenario)
+    out = capsys.readouterr().out
+    assert f"Results downloaded: {len(WAVE_1_AGENTS)}" in out
+    assert "Stale:" not in out
+
+
+def test_report_marks_stale_after_cap(client, files, capsys, monkeypatch) -> None:
+    monkeypatch.setattr(submit_batch_verification, "SUPERSEDE_MAX_ROUNDS", 0)
+
+    async def scenario():
+        group = await client.create_batch(WAVE_1_AGENTS[:1], files)
+        Path(files[1]).write_text("b = 3\n")
+        await client.complete_group(group.id)
+        await report_target(client, group.id)
+
+    run(client, scenario)
+    assert "Stale: 1 file(s) changed since submission" in capsys.readouterr().out
+
+
+def test_collateral_cancellations_recovered(client, make_sources, capsys) -> None:
+    # One request per file, in the same batch
+    files = make_sources({"a.py": "a = 1\n" * 40, "b.py": "b = 2\n" * 40})
+
+    async def scenario():
+        group = await client.create_batch(WAVE_1_AGENTS[:1], files, context_budget_tokens=80)
+        Path(files[0]).write_text("a = 3\n" * 40)
+        statuses = await client.complete_group(group.id, max_attempts=0)
+        await report_target(client, group.id)
+        requests = client.registry.group_request_ids(group.id)
+        return statuses, {r: client.registry.request_attempt(r) for r in requests}
+
+    statuses, attempts = run(client, scenario)
+    out = capsys.readouterr().out
+    assert len(statuses) == 3
+    assert len(attempts) == 4 and set(attempts.values()) == {0}
+    assert "Results downloaded: 2" in out
+    assert "Status: FAIL" not in out and "Stale:" not in out
@@ -20,12 +20,20 @@ Cost comparison:
 
 from __future__ import annotations
 
+import argparse
+import ast
 import asyncio
+import hashlib
 import json
+import math
+import os
+import re
 import sys
 import time
-from collections.abc import Sequence
-from dataclasses import dataclass, field
+from collections.abc import Collection, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass, field, replace
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
@@ -55,6 +63,396 @@ class FlaggedSection:
     agent: str  # Agent that flagged it
 
 
+# Severities from lowest to highest
+SEVERITY_ORDER = ("LOW", "MEDIUM", "HIGH", "CRITICAL")
+
+# Sections are not merged into a span longer than this (lines), so one deep
+# dive never receives an unbounded slice of a file
+MAX_MERGED_SECTION_LINES = 60
+
+
+def merge_flagged_sections(
+    sections: Sequence[FlaggedSection],
+    max_lines: int = MAX_MERGED_SECTION_LINES,
+) -> list[FlaggedSection]:
+    """Coalesce overlapping or adjacent sections of the same file and agent.
+
+    Sections are sorted by start line and merged greedily. A section that
+    lies inside the previous one is always absorbed; one that would extend
+    it is merged only while the span stays within max_lines, and a section
+    already longer than that is kept as it is. A merged section keeps every
+    distinct reason and the highest severity, so no flag is lost.
+
+    Args:
+        sections: Sections from the cheap scan
+        max_lines: Longest merged span, in lines
+
+    Returns:
+        Merged sections, ordered by agent, file and start line
+    """
+    merged: list[FlaggedSection] = []
+    ordered = sorted(sections, key=lambda s: (s.agent, str(s.file_path), s.line_start, s.line_end))
+    for section in ordered:
+        last = merged[-1] if merged else None
+        if (
+            last is not None
+            and last.agent == section.agent
+            and last.file_path == section.file_path
+            and section.line_start <= last.line_end + 1
+            and (
+                section.line_end <= last.line_end
+                or section.line_end - last.line_start + 1 <= max_lines
+            )
+        ):
+            last.line_end = max(last.line_end, section.line_end)
+            if section.reason not in last.reason.split("; "):
+                last.reason = f"{last.reason}; {section.reason}"
+            last.severity = max(last.severity, section.severity, key=SEVERITY_ORDER.index)
+            continue
+        # Copy, so merging never mutates the caller's sections
+        merged.append(replace(section))
+    return merged
+
+
+@dataclass(frozen=True)
+class ScanRule:
+    """Declarative cheap-scan heuristic: keywords plus same-line conditions."""
+
+    name: str
+    keywords: tuple[str, ...]  # Literal substrings that trigger the rule
+    reason: str
+    severity: str  # "CRITICAL" | "HIGH" | "MEDIUM" | "LOW"
+    context_lines: int = 0  # Lines flagged on each side of the matching line
+    ignore_case: bool = False
+    # Each group is an any-of: the matching line must contain one entry of every group
+    requires: tuple[tuple[str, ...], ...] = ()
+    agents: tuple[str, ...] | None = None  # Agents that use the rule (None = all)
+
+    def applies_to(self, agent_name: str) -> bool:
+        """Whether the rule is part of an agent's cheap scan."""
+        return self.agents is None or agent_name in self.agents
+
+    def accepts_line(self, line: str) -> bool:
+        """Whether a keyword hit on this line satisfies the rule's conditions."""
+        return all(any(token in line for token in group) for group in self.requires)
+
+
+SCAN_RULES: tuple[ScanRule, ...] = (
+    ScanRule(
+        name="sql-injection",
+        keywords=("select", "insert", "update", "delete"),
+        reason="Potential SQL injection (dynamic query construction)",
+        severity="CRITICAL",
+        context_lines=5,
+        ignore_case=True,
+        requires=(('f"', "%", ".format("),),
+    ),
+    ScanRule(
+        name="hardcoded-secret",
+        keywords=("password", "api_key", "secret", "token"),
+        reason="Potential hardcoded secret",
+        severity="HIGH",
+        context_lines=3,
+        ignore_case=True,
+        requires=(("=",), ('"',)),
+    ),
+    ScanRule(
+        name="legacy-type-hints",
+        keywords=("List[", "Dict[", "Optional[", "Union["),
+        reason="Legacy type hints (use list[...], X | None)",
+        severity="MEDIUM",
+        agents=("best-practices-enforcer",),
+    ),
+    ScanRule(
+        name="print-call",
+        keywords=("print(",),
+        reason="print() instead of structlog",
+        severity="LOW",
+        agents=("best-practices-enforcer",),
+    ),
+)
+
+
+# Line boundaries str.splitlines() recognises besides "\n"
+OTHER_LINE_BREAKS = re.compile("[\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
+
+
+class ScanRuleMatcher:
+    """Every scan rule's keywords compiled into a single multi-pattern matcher.
+
+    One regex alternation of all keywords runs once over a lower-cased file
+    buffer (case-sensitive keywords are re-checked against the original),
+    so adding rules adds alternatives, not passes. A lookahead reports
+    every position, so overlapping keywords are all found.
+    """
+
+    def __init__(self, rules: Sequence[ScanRule]) -> None:
+        """Compile the rule table.
+
+        Args:
+            rules: Rule table, in reporting order
+        """
+        self.rules = tuple(rules)
+        # Lower-cased keyword -> (rule index, keyword as written if case-sensitive)
+        targets: dict[str, list[tuple[int, str | None]]] = {}
+        for index, rule in enumerate(self.rules):
+            for keyword in rule.keywords:
+                targets.setdefault(keyword.lower(), []).append(
+                    (index, None if rule.ignore_case else keyword)
+                )
+        # Only the longest keyword starting at a position is reported, so it
+        # also fires the rules of every keyword that is a prefix of it
+        self.targets = {
+            keyword: [t for other, ts in targets.items() if keyword.startswith(other) for t in ts]
+            for keyword in targets
+        }
+        alternation = "|".join(re.escape(k) for k in sorted(targets, key=len, reverse=True))
+        self.pattern = re.compile(f"(?=({alternation}))")
+        self.pattern_ignore_case = re.compile(f"(?=({alternation}))", re.IGNORECASE)
+
+    def match(self, content: str) -> list[tuple[ScanRule, int]]:
+        """Run the matcher over a whole file buffer.
+
+        Match offsets are mapped to line numbers incrementally, and each
+        rule reports a line at most once. Lines are numbered as by
+        str.splitlines().
+
+        Args:
+            content: File content
+
+        Returns:
+            (rule, 1-based line number) pairs ordered by line, then rule order
+        """
+        if OTHER_LINE_BREAKS.search(content):
+            content = "\n".join(content.splitlines())
+        lowered = content.lower()
+        if len(lowered) == len(content):
+            buffer, pattern = lowered, self.pattern
+        else:
+            # Some non-ASCII case mappings change length, which would shift offsets
+            buffer, pattern = content, self.pattern_ignore_case
+
+        hits: set[tuple[int, int]] = set()
+        line_number = 1
+        position = 0
+        for match in pattern.finditer(buffer):
+            offset = match.start()
+            line_number += content.count("\n", position, offset)
+            position = offset
+            for rule_index, keyword in self.targets[match.group(1).lower()]:
+                if (line_number, rule_index) in hits:
+                    continue
+                if keyword is not None and not content.startswith(keyword, offset):
+                    continue
+                rule = self.rules[rule_index]
+                if rule.requires:
+                    line_start = content.rfind("\n", 0, offset) + 1
+                    line_end = content.find("\n", offset)
+                    line = content[line_start : line_end if line_end != -1 else None]
+                    if not rule.accepts_line(line):
+                        continue
+                hits.add((line_number, rule_index))
+
+        return [(self.rules[rule_index], line) for line, rule_index in sorted(hits)]
+
+
+@dataclass
+class FunctionMetrics:
+    """Complexity metrics of one function or method."""
+
+    name: str  # Qualified with enclosing classes/functions, e.g. "Cls.method"
+    line_start: int
+    line_end: int
+    cyclomatic_complexity: int
+    function_length: int  # Lines from the def to the end of the body
+    nesting_depth: int  # Deepest block nesting inside the body
+
+
+# Agents whose cheap scan includes the complexity analyzer
+COMPLEXITY_AGENTS = ("code-reviewer",)
+
+_SCOPE_NODES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+_BLOCK_NODES = (
+    ast.If,
+    ast.For,
+    ast.AsyncFor,
+    ast.While,
+    ast.With,
+    ast.AsyncWith,
+    ast.Try,
+    ast.TryStar,
+    ast.Match,
+)
+_BRANCH_NODES = (
+    ast.If,
+    ast.IfExp,
+    ast.For,
+    ast.AsyncFor,
+    ast.While,
+    ast.ExceptHandler,
+    ast.match_case,
+)
+
+
+def _function_nodes(function: ast.AST) -> Sequence[ast.AST]:
+    """Nodes of a function's own body, excluding nested function and class scopes."""
+    nodes: list[ast.AST] = []
+    stack = [stmt for stmt in function.body if not isinstance(stmt, _SCOPE_NODES)]
+    while stack:
+        node = stack.pop()
+        nodes.append(node)
+        stack.extend(c for c in ast.iter_child_nodes(node) if not isinstance(c, _SCOPE_NODES))
+    return nodes
+
+
+def _cyclomatic_complexity(function: ast.AST) -> int:
+    """McCabe complexity: 1 + branch points (boolean operators count per operand)."""
+    complexity = 1
+    for node in _function_nodes(function):
+        if isinstance(node, _BRANCH_NODES):
+            complexity += 1
+        elif isinstance(node, ast.comprehension):
+            complexity += 1 + len(node.ifs)
+        elif isinstance(node, ast.BoolOp):
+            complexity += len(node.values) - 1
+    return complexity
+
+
+def _nesting_depth(statements: Sequence[ast.stmt], depth: int = 0) -> int:
+    """Deepest block nesting in a statement list; an elif does not nest deeper."""
+    deepest = depth
+    for stmt in statements:
+        if not isinstance(stmt, _BLOCK_NODES):
+            continue
+        inner = depth + 1
+        deepest = max(deepest, inner)
+        blocks: list[tuple[Sequence[ast.stmt], int]] = [(getattr(stmt, "body", []), inner)]
+        orelse = getattr(stmt, "orelse", [])
+        if isinstance(stmt, ast.If) and len(orelse) == 1 and isinstance(orelse[0], ast.If):
+            blocks.append((orelse, depth))  # elif
+        else:
+            blocks.append((orelse, inner))
+        blocks.append((getattr(stmt, "finalbody", []), inner))
+        blocks.extend((handler.body, inner) for handler in getattr(stmt, "handlers", []))
+        blocks.extend((case.body, inner) for case in getattr(stmt, "cases", []))
+        for body, body_depth in blocks:
+            deepest = max(deepest, _nesting_depth(body, body_depth))
+    return deepest
+
+
+def measure_functions(content: str) -> list[FunctionMetrics]:
+    """Compute complexity metrics for every function in a module.
+
+    Args:
+        content: Python source
+
+    Returns:
+        Metrics per function (nested functions and methods included), in
+        source order; empty if the source does not parse
+    """
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError):
+        return []
+
+    metrics: list[FunctionMetrics] = []
+    stack: list[tuple[ast.AST, str]] = [(tree, "")]
+    while stack:
+        parent, prefix = stack.pop()
+        for node in ast.iter_child_nodes(parent):
+            if isinstance(node, _SCOPE_NODES):
+                name = f"{prefix}{node.name}"
+                stack.append((node, f"{name}."))
+                if isinstance(node, ast.ClassDef):
+                    continue
+                metrics.append(
+                    FunctionMetrics(
+                        name=name,
+                        line_start=node.lineno,
+                        line_end=node.end_lineno or node.lineno,
+                        cyclomatic_complexity=_cyclomatic_complexity(node),
+                        function_length=(node.end_lineno or node.lineno) - node.lineno + 1,
+                        nesting_depth=_nesting_depth(node.body),
+                    )
+                )
+            else:
+                stack.append((node, prefix))
+    return sorted(metrics, key=lambda m: (m.line_start, m.name))
+
+
+@dataclass
+class FileScan:
+    """Rule hits in one source file from the cheap scan."""
+
+    file_path: Path
+    chars: int = 0
+    line_count: int = 0
+    hits: list[tuple[ScanRule, int]] = field(default_factory=list)
+    content_hash: str | None = None  # Set when complexity analysis was requested
+    functions: list[FunctionMetrics] | None = None  # None when cached or not requested
+    error: str | None = None  # Set when the file could not be read or scanned
+
+
+def scan_source_file(
+    file_path: Path,
+    matcher: ScanRuleMatcher,
+    cached_hashes: Collection[str] | None = None,
+) -> FileScan:
+    """Read one file, run the rule matcher and optionally measure complexity.
+
+    Args:
+        file_path: Source file to scan
+        matcher: Compiled scan rules
+        cached_hashes: Content hashes whose metrics are already cached
+            (None = skip complexity analysis)
+
+    Returns:
+        FileScan with the hits, or with error set
+    """
+    try:
+        content = file_path.read_text()
+        scan = FileScan(
+            file_path=file_path,
+            chars=len(content),
+            line_count=len(content.splitlines()),
+            hits=matcher.match(content),
+        )
+        if cached_hashes is not None:
+            scan.content_hash = hashlib.sha256(content.encode()).hexdigest()
+            if scan.content_hash not in cached_hashes:
+                scan.functions = measure_functions(content)
+        return scan
+    except Exception as e:
+        return FileScan(file_path=file_path, error=str(e))
+
+
+# Matcher and cached hashes of a scan worker process, set once by its initializer
+_worker_matcher: ScanRuleMatcher | None = None
+_worker_cached_hashes: Collection[str] | None = None
+
+
+def _init_scan_worker(rules: tuple[ScanRule, ...], cached_hashes: Collection[str] | None) -> None:
+    global _worker_matcher, _worker_cached_hashes
+    _worker_matcher = ScanRuleMatcher(rules)
+    _worker_cached_hashes = cached_hashes
+
+
+def _scan_shard(files: list[Path]) -> list[FileScan]:
+    return [
+        scan_source_file(file_path, _worker_matcher, _worker_cached_hashes) for file_path in files
+    ]
+
+
+# Complexity cache entries kept (most recently used content hashes)
+COMPLEXITY_CACHE_MAX_ENTRIES = 5000
+
+
+# Change sets smaller than this are scanned serially (pool start-up dominates)
+PARALLEL_SCAN_MIN_FILES = 64
+# Shards per worker, so uneven file sizes still balance across the pool
+SCAN_SHARDS_PER_WORKER = 4
+
+
 @dataclass
 class ScanResult:
     """Result from Phase 1 cheap scan."""
@@ -99,13 +497,18 @@ class HybridResult:
 class HybridVerificationOrchestrator:
     """Orchestrates hybrid two-phase verification with cost optimization."""
 
-    def __init__(self, project_root: Path) -> None:
+    def __init__(self, project_root: Path, scan_workers: int | None = None) -> None:
         """Initialize the hybrid orchestrator.
 
         Args:
             project_root: Root directory of the Claude Code project
+            scan_workers: Processes for the cheap scan (None = one per core,
+                1 = always serial; less than 1 raises ValueError)
         """
+        if scan_workers is not None and scan_workers < 1:
+            raise ValueError(f"scan_workers must be at least 1, got {scan_workers}")
         self.project_root = project_root
+        self.scan_workers = scan_workers or os.cpu_count() or 1
         self.pending_dir = project_root / ".build" / "checkpoints" / "pending"
         self.logs_dir = project_root / ".build" / "logs" / "hybrid-verification"
         self.logs_dir.mkdir(parents=True, exist_ok=True)
@@ -125,6 +528,12 @@ class HybridVerificationOrchestrator:
             "security_pattern_match": True,  # Any match → flag
         }
 
+        # Cheap-scan heuristics, compiled once into a single matcher
+        self.scan_matcher = ScanRuleMatcher(SCAN_RULES)
+
+        # Function metrics per file content hash (see measure_functions)
+        self.complexity_cache_path = project_root / ".build" / "cache" / "complexity-metrics.json"
+
     def get_pending_files(self) -> list[Path]:
         """Get list of pending Python files requiring verification.
 
@@ -167,137 +576,266 @@ class HybridVerificationOrchestrator:
         output_cost = (output_tokens / 1_000_000) * pricing["output"]
         return input_cost + output_cost
 
-    async def run_cheap_scan(
+    def scan_model(self, agent_name: str) -> str:
+        """Cheap model used for an agent's Phase 1 scan."""
+        return "sonnet" if agent_name in ["best-practices-enforcer", "code-reviewer"] else "haiku"
+
+    def load_complexity_cache(self) -> dict[str, list[FunctionMetrics]]:
+        """Load cached function metrics keyed by file content hash.
+
+        Returns:
+            Cache contents (empty if missing or unreadable)
+        """
+        if not self.complexity_cache_path.exists():
+            return {}
+        try:
+            raw = json.loads(self.complexity_cache_path.read_text())
+            return {
+                content_hash: [FunctionMetrics(**m) for m in functions]
+                for content_hash, functions in raw.items()
+            }
+        except (ValueError, TypeError, AttributeError) as e:
+            logger.warning("complexity_cache_unreadable", error=str(e))
+            return {}
+
+    def save_complexity_cache(self, cache: dict[str, list[FunctionMetrics]]) -> None:
+        """Write the function metrics cache, keeping the newest entries.
+
+        Args:
+            cache: Content hash to metrics, least recently used first
+        """
+        entries = list(cache.items())[-COMPLEXITY_CACHE_MAX_ENTRIES:]
+        self.complexity_cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self.complexity_cache_path.write_text(
+            json.dumps({h: [asdict(m) for m in functions] for h, functions in entries})
+        )
+
+    def complexity_violations(self, metrics: FunctionMetrics) -> list[str]:
+        """Describe which complexity_thresholds a function exceeds.
+
+        Args:
+            metrics: Function metrics
+
+        Returns:
+            One description per exceeded threshold (empty = under all)
+        """
+        thresholds = self.complexity_thresholds
+        violations = []
+        if metrics.cyclomatic_complexity > thresholds["cyclomatic_complexity"]:
+            violations.append(
+                f"cyclomatic complexity {metrics.cyclomatic_complexity}"
+                f" > {thresholds['cyclomatic_complexity']}"
+            )
+        if metrics.function_length > thresholds["function_length"]:
+            violations.append(f"{metrics.function_length} lines > {thresholds['function_length']}")
+        if metrics.nesting_depth > thresholds["nesting_depth"]:
+            violations.append(
+                f"nesting depth {metrics.nesting_depth} > {thresholds['nesting_depth']}"
+            )
+        return violations
+
+    async def scan_source_files(
         self,
-        agent_name: str,
+        files: list[Path],
+        cached_hashes: Collection[str] | None = None,
+    ) -> list[FileScan]:
+        """Run the rule matcher over files, in parallel for large change sets.
+
+        Files are split into contiguous shards across a process pool of up
+        to scan_workers processes; results come back in input order. Small
+        change sets, scan_workers=1, or a pool that cannot start are scanned
+        serially.
+
+        Args:
+            files: Source files to scan
+            cached_hashes: Content hashes with cached function metrics
+                (None = skip complexity analysis)
+
+        Returns:
+            One FileScan per file, in the order given
+        """
+        workers = min(self.scan_workers, len(files))
+        if workers > 1 and len(files) >= PARALLEL_SCAN_MIN_FILES:
+            shard_size = math.ceil(len(files) / (workers * SCAN_SHARDS_PER_WORKER))
+            shards = [files[i : i + shard_size] for i in range(0, len(files), shard_size)]
+            loop = asyncio.get_running_loop()
+            try:
+                with ProcessPoolExecutor(
+                    max_workers=workers,
+                    initializer=_init_scan_worker,
+                    initargs=(self.scan_matcher.rules, cached_hashes),
+                ) as pool:
+                    shard_scans = await asyncio.gather(
+                        *(loop.run_in_executor(pool, _scan_shard, shard) for shard in shards)
+                    )
+                logger.info("parallel_scan_completed", workers=workers, shards=len(shards))
+                return [scan for shard in shard_scans for scan in shard]
+            except (OSError, BrokenProcessPool) as e:
+                logger.warning("parallel_scan_unavailable", error=str(e))
+
+        return [
+            scan_source_file(file_path, self.scan_matcher, cached_hashes) for file_path in files
+        ]
+
+    async def run_shared_scan(
+        self,
+        agent_names: Sequence[str],
         pending_files: list[Path],
-    ) -> ScanResult:
-        """Execute Phase 1: Cheap scan with Haiku/Sonnet.
+    ) -> dict[str, ScanResult]:
+        """Execute Phase 1 for several agents with one pass over the files.
 
-        This phase does broad pattern matching and flags suspicious sections
-        for deep dive without doing expensive full analysis.
+        Each file is read and matched once; every rule hit is fanned out as
+        a FlaggedSection to each of the given agents the rule applies to.
+        For COMPLEXITY_AGENTS, functions over complexity_thresholds are
+        flagged too; their metrics are cached per file content hash, so
+        unchanged files are not parsed again. Each agent's sections are
+        then merged per file (merge_flagged_sections), so overlapping
+        windows cost one deep dive instead of several.
 
         Args:
-            agent_name: Name of the verification agent
+            agent_names: Verification agents to scan for
             pending_files: List of files to scan
 
         Returns:
-            ScanResult with flagged sections
+            ScanResult per agent name
         """
         start_time = time.time()
 
-        # Select model for cheap scan
-        model = "sonnet" if agent_name in ["best-practices-enforcer", "code-reviewer"] else "haiku"
-
         logger.info(
             "cheap_scan_started",
-            agent=agent_name,
-            model=model,
+            agents=list(agent_names),
             files_count=len(pending_files),
         )
 
-        flagged_sections: list[FlaggedSection] = []
+        flagged_by_agent: dict[str, list[FlaggedSection]] = {name: [] for name in agent_names}
 
-        # Read files and perform cheap pattern matching
-        total_chars = 0
+        # Extract .pending suffix to get actual Python file paths
+        source_files: list[Path] = []
         for file_path in pending_files:
-            try:
-                # Extract .pending suffix to get actual Python file path
-                actual_file = self.project_root / file_path.stem
-                if not actual_file.exists():
-                    logger.warning("file_not_found", file=str(actual_file))
-                    continue
-
-                content = actual_file.read_text()
-                total_chars += len(content)
-
-                # Cheap heuristics to flag sections
-                lines = content.splitlines()
-                for i, line in enumerate(lines, start=1):
-                    # Flag 1: Complex SQL patterns (potential injection)
-                    if any(pattern in line.lower() for pattern in ["select", "insert", "update", "delete"]):
-                        if "f\"" in line or "%" in line or ".format(" in line:
-                            flagged_sections.append(
-                                FlaggedSection(
-                                    file_path=actual_file,
-                                    line_start=max(1, i - 5),
-                                    line_end=min(len(lines), i + 5),
-                                    reason="Potential SQL injection (dynamic query construction)",
-                                    severity="CRITICAL",
-                                    agent=agent_name,
-                                )
-                            )
-
-                    # Flag 2: Hardcoded secrets
-                    if any(keyword in line.lower() for keyword in ["password", "api_key", "secret", "token"]):
-                        if "=" in line and '"' in line:
-                            flagged_sections.append(
-                                FlaggedSection(
-                                    file_path=actual_file,
-                                    line_start=max(1, i - 3),
-                                    line_end=min(len(lines), i + 3),
-                                    reason="Potential hardcoded secret",
-                                    severity="HIGH",
-                                    agent=agent_name,
-                                )
-                            )
-
-                    # Flag 3: Legacy type hints (best-practices)
-                    if agent_name == "best-practices-enforcer":
-                        if any(pattern in line for pattern in ["List[", "Dict[", "Optional[", "Union["]):
-                            flagged_sections.append(
-                                FlaggedSection(
-                                    file_path=actual_file,
-                                    line_start=i,
-                                    line_end=i,
-                                    reason="Legacy type hints (use list[...], X | None)",
-                                    severity="MEDIUM",
-                                    agent=agent_name,
-                                )
-                            )
-
-                    # Flag 4: print() statements (should be structlog)
-                    if "print(" in line and agent_name == "best-practices-enforcer":
-                        flagged_sections.append(
+            actual_file = self.project_root / file_path.stem
+            if not actual_file.exists():
+                logger.warning("file_not_found", file=str(actual_file))
+                continue
+            source_files.append(actual_file)
+
+        complexity_agents = [name for name in agent_names if name in COMPLEXITY_AGENTS]
+        complexity_cache = self.load_complexity_cache() if complexity_agents else {}
+        cached_hashes = set(complexity_cache) if complexity_agents else None
+        cache_hits = 0
+
+        # Read files and perform cheap pattern matching (one pass per file for all rules)
+        total_chars = 0
+        for file_scan in await self.scan_source_files(source_files, cached_hashes):
+            if file_scan.error is not None:
+                logger.error(
+                    "scan_file_error", file=str(file_scan.file_path), error=file_scan.error
+                )
+                continue
+            total_chars += file_scan.chars
+
+            if file_scan.content_hash is not None:
+                if file_scan.functions is None:
+                    cache_hits += 1
+                    # Move to the end so the entry survives cache trimming
+                    functions = complexity_cache.pop(file_scan.content_hash)
+                else:
+                    functions = file_scan.functions
+                complexity_cache[file_scan.content_hash] = functions
+                for metrics in functions:
+                    violations = self.complexity_violations(metrics)
+                    if not violations:
+                        continue
+                    for agent_name in complexity_agents:
+                        flagged_by_agent[agent_name].append(
                             FlaggedSection(
-                                file_path=actual_file,
-                                line_start=i,
-                                line_end=i,
-                                reason="print() instead of structlog",
-                                severity="LOW",
+                                file_path=file_scan.file_path,
+                                line_start=metrics.line_start,
+                                line_end=metrics.line_end,
+                                reason=(
+                                    f"Complex function {metrics.name}(): " + ", ".join(violations)
+                                ),
+                                severity="MEDIUM",
                                 agent=agent_name,
                             )
                         )
 
-            except Exception as e:
-                logger.error("scan_file_error", file=str(file_path), error=str(e))
+            for rule, line_number in file_scan.hits:
+                for agent_name in agent_names:
+                    if not rule.applies_to(agent_name):
+                        continue
+                    flagged_by_agent[agent_name].append(
+                        FlaggedSection(
+                            file_path=file_scan.file_path,
+                            line_start=max(1, line_number - rule.context_lines),
+                            line_end=min(file_scan.line_count, line_number + rule.context_lines),
+                            reason=rule.reason,
+                            severity=rule.severity,
+                            agent=agent_name,
+                        )
+                    )
 
-        duration = time.time() - start_time
+        if complexity_agents:
+            self.save_complexity_cache(complexity_cache)
+            logger.info(
+                "complexity_analysis_completed",
+                files=len(source_files),
+                cache_hits=cache_hits,
+            )
 
-        # Estimate cost
-        input_tokens = self.estimate_tokens(str(total_chars))
-        output_tokens = len(flagged_sections) * 50  # ~50 tokens per flagged section
-        cost = self.estimate_cost(model, input_tokens, output_tokens)
+        # The pass is shared, so each agent is charged an equal share of it
+        duration = (time.time() - start_time) / max(len(agent_names), 1)
 
-        result = ScanResult(
-            agent_name=agent_name,
-            model_used=model,
-            duration_seconds=duration,
-            flagged_sections=flagged_sections,
-            total_findings=len(flagged_sections),
-            cost_estimate=cost,
-        )
+        results: dict[str, ScanResult] = {}
+        for agent_name, raw_sections in flagged_by_agent.items():
+            # Estimate cost (every agent's cheap model still reviews the scan)
+            model = self.scan_model(agent_name)
+            input_tokens = self.estimate_tokens(str(total_chars))
+            output_tokens = len(raw_sections) * 50  # ~50 tokens per flagged section
+            cost = self.estimate_cost(model, input_tokens, output_tokens)
 
-        logger.info(
-            "cheap_scan_completed",
-            agent=agent_name,
-            model=model,
-            flagged_count=len(flagged_sections),
-            cost_usd=round(cost, 4),
-            duration_seconds=round(duration, 2),
-        )
+            # One deep dive per merged section instead of per raw hit
+            flagged_sections = merge_flagged_sections(raw_sections)
+
+            results[agent_name] = ScanResult(
+                agent_name=agent_name,
+                model_used=model,
+                duration_seconds=duration,
+                flagged_sections=flagged_sections,
+                total_findings=len(flagged_sections),
+                cost_estimate=cost,
+            )
+
+            logger.info(
+                "cheap_scan_completed",
+                agent=agent_name,
+                model=model,
+                flagged_count=len(flagged_sections),
+                raw_flagged_count=len(raw_sections),
+                cost_usd=round(cost, 4),
+                duration_seconds=round(duration, 2),
+            )
 
-        return result
+        return results
+
+    async def run_cheap_scan(
+        self,
+        agent_name: str,
+        pending_files: list[Path],
+    ) -> ScanResult:
+        """Execute Phase 1: Cheap scan with Haiku/Sonnet.
+
+        This phase does broad pattern matching and flags suspicious sections
+        for deep dive without doing expensive full analysis.
+
+        Args:
+            agent_name: Name of the verification agent
+            pending_files: List of files to scan
+
+        Returns:
+            ScanResult with flagged sections
+        """
+        results = await self.run_shared_scan([agent_name], pending_files)
+        return results[agent_name]
 
     async def run_deep_dive(
         self,
@@ -393,12 +931,14 @@ class HybridVerificationOrchestrator:
         self,
         agent_name: str,
         pending_files: list[Path],
+        scan_result: ScanResult | None = None,
     ) -> HybridResult:
         """Execute full hybrid verification (Phase 1 + Phase 2).
 
         Args:
             agent_name: Name of the verification agent
             pending_files: List of files to verify
+            scan_result: Phase 1 result from a shared scan (None = scan now)
 
         Returns:
             HybridResult with aggregated findings and cost
@@ -406,7 +946,8 @@ class HybridVerificationOrchestrator:
         logger.info("hybrid_verification_started", agent=agent_name)
 
         # Phase 1: Cheap scan
-        scan_result = await self.run_cheap_scan(agent_name, pending_files)
+        if scan_result is None:
+            scan_result = await self.run_cheap_scan(agent_name, pending_files)
 
         # Phase 2: Deep dive on flagged sections (only if any)
         deep_dive_results: list[DeepDiveResult] = []
@@ -523,9 +1064,14 @@ class HybridVerificationOrchestrator:
             "test-generator",
         ]
 
+        # Phase 1 once for all agents; flags are fanned out per agent
+        scan_results = await self.run_shared_scan(agents, pending_files)
+
         results: list[HybridResult] = []
         for agent_name in agents:
-            result = await self.run_hybrid_verification(agent_name, pending_files)
+            result = await self.run_hybrid_verification(
+                agent_name, pending_files, scan_results[agent_name]
+            )
             self.log_hybrid_result(result, session_id)
             results.append(result)
 
@@ -583,10 +1129,37 @@ class HybridVerificationOrchestrator:
         return summary
 
 
+def positive_int(value: str) -> int:
+    """Parse a CLI integer that must be at least 1.
+
+    Args:
+        value: Raw argument text
+
+    Returns:
+        The parsed integer (argparse reports anything else as a usage error)
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}") from None
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
 async def main() -> int:
     """Main entry point for the hybrid verification orchestrator."""
+    parser = argparse.ArgumentParser(description="Hybrid model verification orchestrator")
+    parser.add_argument(
+        "--scan-workers",
+        type=positive_int,
+        default=None,
+        help="Processes for the cheap scan (default: one per core; 1 = serial)",
+    )
+    args = parser.parse_args()
+
     project_root = Path.cwd()
-    orchestrator = HybridVerificationOrchestrator(project_root)
+    orchestrator = HybridVerificationOrchestrator(project_root, scan_workers=args.scan_workers)
 
     try:
         summary = await orchestrator.orchestrate_hybrid()
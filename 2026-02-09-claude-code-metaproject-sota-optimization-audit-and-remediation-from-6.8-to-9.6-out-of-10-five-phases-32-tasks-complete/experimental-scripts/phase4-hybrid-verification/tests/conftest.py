@@ -0,0 +1,42 @@
+"""
+Pytest configuration for hybrid-verification.py unit tests.
+
+The script name is not a valid module name, so it is loaded from its path
+once and registered as ``hybrid_verification`` for the test modules.
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPT_PATH = Path(__file__).resolve().parent.parent / "hybrid-verification.py"
+
+if "hybrid_verification" not in sys.modules:
+    spec = importlib.util.spec_from_file_location("hybrid_verification", SCRIPT_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["hybrid_verification"] = module
+    spec.loader.exec_module(module)
+
+
+@pytest.fixture
+def make_project(tmp_path: Path):
+    """Return a factory writing source files and their pending markers.
+
+    The factory takes {relative path: content} and returns the pending
+    marker paths, in the same order, as get_pending_files() would list them.
+    """
+
+    def factory(sources: dict[str, str]) -> list[Path]:
+        pending_dir = tmp_path / ".build" / "checkpoints" / "pending"
+        pending_dir.mkdir(parents=True, exist_ok=True)
+        pending = []
+        for name, content in sources.items():
+            (tmp_path / name).write_text(content)
+            marker = pending_dir / f"{name}.pending"
+            marker.touch()
+            pending.append(marker)
+        return pending
+
+    return factory
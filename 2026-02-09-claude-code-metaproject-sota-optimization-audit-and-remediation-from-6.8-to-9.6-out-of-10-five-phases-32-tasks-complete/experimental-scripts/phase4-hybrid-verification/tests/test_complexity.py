@@ -0,0 +1,190 @@
+"""
+Unit tests for the complexity analyzer (complexity_thresholds enforcement)
+
+Tests cover:
+- measure_functions: cyclomatic complexity, length, nesting depth, names
+- complexity_violations against the orchestrator thresholds
+- Cheap scan flags over-threshold functions for code-reviewer only
+- Metrics cache: reuse by content hash, trimming, unreadable cache files
+"""
+
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+import hybrid_verification
+from hybrid_verification import FunctionMetrics, HybridVerificationOrchestrator, measure_functions
+
+BRANCHY = '''
+class Handler:
+    def handle(self, a, b):
+        if a:
+            for item in b:
+                while item:
+                    with open(item) as f:
+                        try:
+                            if f and a or b:
+                                pass
+                        except ValueError:
+                            pass
+        elif b:
+            pass
+        elif a:
+            pass
+        return [y for y in b if y]
+'''
+
+
+def long_function(name: str, lines: int) -> str:
+    body = "".join(f"    x{i} = {i}\n" for i in range(lines - 2))
+    return f"def {name}():\n{body}    return None\n"
+
+
+def metrics_by_name(source: str) -> dict[str, FunctionMetrics]:
+    return {m.name: m for m in measure_functions(source)}
+
+
+class TestMeasureFunctions:
+    def test_simple_function(self) -> None:
+        (metrics,) = measure_functions("def f(x):\n    return x\n")
+        assert metrics == FunctionMetrics(
+            name="f",
+            line_start=1,
+            line_end=2,
+            cyclomatic_complexity=1,
+            function_length=2,
+            nesting_depth=0,
+        )
+
+    def test_branchy_method(self) -> None:
+        metrics = metrics_by_name(BRANCHY)["Handler.handle"]
+        # if, for, while, inner if, and+or, except, 2 x elif, comprehension + its if
+        assert metrics.cyclomatic_complexity == 12
+        # if > for > while > with > try > if; elif branches stay at depth 1
+        assert metrics.nesting_depth == 6
+        assert (metrics.line_start, metrics.line_end, metrics.function_length) == (3, 17, 15)
+
+    def test_elif_chain_does_not_nest(self) -> None:
+        source = "def f(x):\n" + "".join(
+            f"    {'if' if i == 0 else 'elif'} x == {i}:\n        pass\n" for i in range(8)
+        )
+        metrics = metrics_by_name(source)["f"]
+        assert metrics.nesting_depth == 1
+        assert metrics.cyclomatic_complexity == 9
+
+    def test_nested_scopes_measured_separately(self) -> None:
+        source = (
+            "def outer(x):\n"
+            "    def inner(y):\n"
+            "        if y:\n"
+            "            return 1\n"
+            "        return 2\n"
+            "    return inner(x)\n"
+        )
+        metrics = metrics_by_name(source)
+        assert list(metrics) == ["outer", "outer.inner"]
+        assert metrics["outer"].cyclomatic_complexity == 1
+        assert metrics["outer.inner"].cyclomatic_complexity == 2
+
+    def test_async_function_and_match(self) -> None:
+        source = (
+            "async def f(x):\n"
+            "    async for y in x:\n"
+            "        match y:\n"
+            "            case 1:\n"
+            "                pass\n"
+            "            case _:\n"
+            "                pass\n"
+        )
+        metrics = metrics_by_name(source)["f"]
+        assert metrics.cyclomatic_complexity == 4
+        assert metrics.nesting_depth == 2
+
+    def test_syntax_error(self) -> None:
+        assert measure_functions("def broken(:\n") == []
+
+
+class TestComplexityViolations:
+    def test_under_thresholds(self, tmp_path) -> None:
+        orchestrator = HybridVerificationOrchestrator(tmp_path, scan_workers=1)
+        assert orchestrator.complexity_violations(FunctionMetrics("f", 1, 30, 10, 30, 4)) == []
+
+    def test_every_threshold(self, tmp_path) -> None:
+        orchestrator = HybridVerificationOrchestrator(tmp_path, scan_workers=1)
+        assert orchestrator.complexity_violations(FunctionMetrics("f", 1, 31, 11, 31, 5)) == [
+            "cyclomatic complexity 11 > 10",
+            "31 lines > 30",
+            "nesting depth 5 > 4",
+        ]
+
+
+class TestComplexityScan:
+    @pytest.fixture
+    def orchestrator(self, tmp_path: Path) -> HybridVerificationOrchestrator:
+        return HybridVerificationOrchestrator(tmp_path, scan_workers=1)
+
+    @pytest.fixture
+    def pending(self, make_project) -> list[Path]:
+        return make_project(
+            {
+                "handler.py": BRANCHY,
+                "long.py": long_function("long", 40),
+                "short.py": long_function("short", 10),
+            }
+        )
+
+    def test_flags_only_over_threshold_functions(self, orchestrator, pending) -> None:
+        results = asyncio.run(orchestrator.run_shared_scan(["code-reviewer"], pending))
+        sections = {
+            (s.file_path.name, s.line_start, s.line_end): s
+            for s in results["code-reviewer"].flagged_sections
+        }
+        assert set(sections) == {("handler.py", 3, 17), ("long.py", 1, 40)}
+        handler = sections[("handler.py", 3, 17)]
+        assert handler.reason == (
+            "Complex function Handler.handle(): cyclomatic complexity 12 > 10, nesting depth 6 > 4"
+        )
+        assert handler.severity == "MEDIUM"
+
+    def test_other_agents_skip_analysis(self, orchestrator, pending, monkeypatch) -> None:
+        def fail(content):
+            raise AssertionError("complexity analyzed for a non-complexity agent")
+
+        monkeypatch.setattr(hybrid_verification, "measure_functions", fail)
+        results = asyncio.run(orchestrator.run_shared_scan(["security-auditor"], pending))
+        assert results["security-auditor"].flagged_sections == []
+        assert not orchestrator.complexity_cache_path.exists()
+
+    def test_cache_reused_for_unchanged_files(self, orchestrator, pending, monkeypatch) -> None:
+        first = asyncio.run(orchestrator.run_shared_scan(["code-reviewer"], pending))
+        cache = json.loads(orchestrator.complexity_cache_path.read_text())
+        assert len(cache) == 3
+
+        def fail(content):
+            raise AssertionError("cached file measured again")
+
+        monkeypatch.setattr(hybrid_verification, "measure_functions", fail)
+        second = asyncio.run(orchestrator.run_shared_scan(["code-reviewer"], pending))
+        assert second["code-reviewer"].flagged_sections == first["code-reviewer"].flagged_sections
+
+    def test_changed_file_measured_again(self, orchestrator, pending, tmp_path) -> None:
+        asyncio.run(orchestrator.run_shared_scan(["code-reviewer"], pending))
+        (tmp_path / "short.py").write_text(long_function("short", 35))
+        results = asyncio.run(orchestrator.run_shared_scan(["code-reviewer"], pending))
+        names = {s.file_path.name for s in results["code-reviewer"].flagged_sections}
+        assert "short.py" in names
+        assert len(json.loads(orchestrator.complexity_cache_path.read_text())) == 4
+
+    def test_cache_trimmed_to_recent_entries(self, orchestrator, monkeypatch) -> None:
+        monkeypatch.setattr(hybrid_verification, "COMPLEXITY_CACHE_MAX_ENTRIES", 2)
+        orchestrator.save_complexity_cache({"a": [], "b": [], "c": []})
+        assert list(orchestrator.load_complexity_cache()) == ["b", "c"]
+
+    def test_unreadable_cache(self, orchestrator) -> None:
+        orchestrator.complexity_cache_path.parent.mkdir(parents=True, exist_ok=True)
+        orchestrator.complexity_cache_path.write_text("[1, 2")
+        assert orchestrator.load_complexity_cache() == {}
+        orchestrator.complexity_cache_path.write_text("[]")
+        assert orchestrator.load_complexity_cache() == {}
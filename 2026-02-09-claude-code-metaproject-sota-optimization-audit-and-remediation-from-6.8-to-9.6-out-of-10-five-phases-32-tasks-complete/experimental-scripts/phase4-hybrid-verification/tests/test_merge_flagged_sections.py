@@ -0,0 +1,120 @@
+"""
+Unit tests for merge_flagged_sections (interval merging before deep dives)
+
+Tests cover:
+- Overlapping and adjacent windows coalesce; separate ones do not
+- Sections inside a longer section are always absorbed
+- The span cap applies only to sections that would extend the range
+- Reasons and the highest severity are kept; inputs are not mutated
+"""
+
+from pathlib import Path
+
+from hybrid_verification import FlaggedSection, merge_flagged_sections
+
+FILE = Path("src/app.py")
+
+
+def section(
+    line_start: int,
+    line_end: int,
+    reason: str = "reason",
+    severity: str = "LOW",
+    agent: str = "security-auditor",
+    file_path: Path = FILE,
+) -> FlaggedSection:
+    return FlaggedSection(
+        file_path=file_path,
+        line_start=line_start,
+        line_end=line_end,
+        reason=reason,
+        severity=severity,
+        agent=agent,
+    )
+
+
+def spans(sections: list[FlaggedSection]) -> list[tuple[int, int]]:
+    return [(s.line_start, s.line_end) for s in sections]
+
+
+class TestMerging:
+    def test_overlapping_windows_merge(self) -> None:
+        merged = merge_flagged_sections([section(1, 11), section(2, 12), section(3, 13)])
+        assert spans(merged) == [(1, 13)]
+
+    def test_adjacent_windows_merge(self) -> None:
+        assert spans(merge_flagged_sections([section(1, 5), section(6, 10)])) == [(1, 10)]
+
+    def test_separate_windows_stay_apart(self) -> None:
+        assert spans(merge_flagged_sections([section(1, 5), section(7, 10)])) == [(1, 5), (7, 10)]
+
+    def test_unsorted_input(self) -> None:
+        assert spans(merge_flagged_sections([section(20, 25), section(1, 5), section(4, 8)])) == [
+            (1, 8),
+            (20, 25),
+        ]
+
+    def test_files_and_agents_are_not_merged_together(self) -> None:
+        merged = merge_flagged_sections(
+            [
+                section(1, 10),
+                section(1, 10, file_path=Path("src/other.py")),
+                section(1, 10, agent="code-reviewer"),
+            ]
+        )
+        assert len(merged) == 3
+
+
+class TestSpanCap:
+    def test_contained_section_absorbed_past_cap(self) -> None:
+        # A long complexity flag with a secret hit inside it
+        merged = merge_flagged_sections(
+            [
+                section(10, 110, "Complex function f()", "MEDIUM"),
+                section(37, 46, "Potential hardcoded secret", "HIGH"),
+            ],
+            max_lines=60,
+        )
+        assert spans(merged) == [(10, 110)]
+        assert merged[0].reason == "Complex function f(); Potential hardcoded secret"
+        assert merged[0].severity == "HIGH"
+
+    def test_extending_section_respects_cap(self) -> None:
+        merged = merge_flagged_sections([section(1, 40), section(30, 70)], max_lines=60)
+        assert spans(merged) == [(1, 40), (30, 70)]
+
+    def test_extending_section_within_cap(self) -> None:
+        merged = merge_flagged_sections([section(1, 40), section(30, 60)], max_lines=60)
+        assert spans(merged) == [(1, 60)]
+
+    def test_over_cap_section_kept_whole(self) -> None:
+        merged = merge_flagged_sections([section(1, 100)], max_lines=60)
+        assert spans(merged) == [(1, 100)]
+
+    def test_contained_after_capped_split(self) -> None:
+        merged = merge_flagged_sections(
+            [section(1, 50), section(45, 80), section(70, 75)], max_lines=60
+        )
+        assert spans(merged) == [(1, 50), (45, 80)]
+
+
+class TestReasonsAndSeverity:
+    def test_distinct_reasons_kept_once(self) -> None:
+        merged = merge_flagged_sections(
+            [section(1, 11, "sql"), section(3, 13, "secret"), section(5, 15, "sql")]
+        )
+        assert merged[0].reason == "sql; secret"
+
+    def test_highest_severity_wins(self) -> None:
+        merged = merge_flagged_sections(
+            [section(1, 5, severity="MEDIUM"), section(3, 8, severity="CRITICAL"), section(6, 9)]
+        )
+        assert merged[0].severity == "CRITICAL"
+
+    def test_inputs_not_mutated(self) -> None:
+        first, second = section(1, 5, "a"), section(3, 8, "b", "HIGH")
+        merge_flagged_sections([first, second])
+        assert (first.line_end, first.reason, first.severity) == (5, "a", "LOW")
+
+    def test_empty(self) -> None:
+        assert merge_flagged_sections([]) == []
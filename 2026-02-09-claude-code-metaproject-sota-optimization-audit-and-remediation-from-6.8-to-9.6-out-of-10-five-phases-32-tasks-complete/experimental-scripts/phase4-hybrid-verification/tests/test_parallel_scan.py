@@ -0,0 +1,135 @@
+"""
+Unit tests for scan_source_files (process-pool cheap scan)
+
+Tests cover:
+- Pool and serial scans return the same FileScans, in input order
+- Small change sets and scan_workers=1 stay serial
+- A pool that cannot start falls back to the serial scan
+- Unreadable files are reported through FileScan.error
+- --scan-workers and scan_workers reject values below 1
+"""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+import hybrid_verification
+from hybrid_verification import (
+    SCAN_RULES,
+    HybridVerificationOrchestrator,
+    ScanRuleMatcher,
+    scan_source_file,
+)
+
+
+def write_sources(root: Path, count: int) -> list[Path]:
+    files = []
+    for index in range(count):
+        path = root / f"module_{index}.py"
+        lines = [f"def f{index}():"]
+        if index % 3 == 0:
+            lines.append(f'    run(f"SELECT {index}")')
+        if index % 5 == 0:
+            lines.append('    token = "abc"')
+        lines.append("    return None")
+        path.write_text("\n".join(lines) + "\n")
+        files.append(path)
+    return files
+
+
+def summary(scans) -> list[tuple]:
+    return [
+        (
+            scan.file_path,
+            scan.chars,
+            scan.line_count,
+            [(rule.name, line) for rule, line in scan.hits],
+            scan.error,
+        )
+        for scan in scans
+    ]
+
+
+@pytest.fixture
+def files(tmp_path: Path) -> list[Path]:
+    return write_sources(tmp_path, 40)
+
+
+@pytest.fixture
+def low_threshold(monkeypatch) -> None:
+    monkeypatch.setattr(hybrid_verification, "PARALLEL_SCAN_MIN_FILES", 8)
+
+
+class TestParallelScan:
+    def test_pool_matches_serial(self, tmp_path, files, low_threshold, monkeypatch) -> None:
+        used_pool = []
+        pool_class = hybrid_verification.ProcessPoolExecutor
+
+        def tracking_pool(*args, **kwargs):
+            used_pool.append(kwargs["max_workers"])
+            return pool_class(*args, **kwargs)
+
+        monkeypatch.setattr(hybrid_verification, "ProcessPoolExecutor", tracking_pool)
+        parallel = HybridVerificationOrchestrator(tmp_path, scan_workers=3)
+        serial = HybridVerificationOrchestrator(tmp_path, scan_workers=1)
+        assert summary(asyncio.run(parallel.scan_source_files(files))) == summary(
+            asyncio.run(serial.scan_source_files(files))
+        )
+        assert used_pool == [3]
+
+    def test_pool_computes_complexity(self, tmp_path, files, low_threshold) -> None:
+        orchestrator = HybridVerificationOrchestrator(tmp_path, scan_workers=2)
+        scans = asyncio.run(orchestrator.scan_source_files(files, cached_hashes=set()))
+        assert all(scan.content_hash and scan.functions for scan in scans)
+
+    def test_small_change_set_is_serial(self, tmp_path, files, monkeypatch) -> None:
+        def no_pool(*args, **kwargs):
+            raise AssertionError("pool started for a small change set")
+
+        monkeypatch.setattr(hybrid_verification, "ProcessPoolExecutor", no_pool)
+        orchestrator = HybridVerificationOrchestrator(tmp_path, scan_workers=4)
+        assert len(asyncio.run(orchestrator.scan_source_files(files[:5]))) == 5
+
+    def test_pool_failure_falls_back(self, tmp_path, files, low_threshold, monkeypatch) -> None:
+        def broken_pool(*args, **kwargs):
+            raise OSError("no semaphores")
+
+        monkeypatch.setattr(hybrid_verification, "ProcessPoolExecutor", broken_pool)
+        orchestrator = HybridVerificationOrchestrator(tmp_path, scan_workers=4)
+        scans = asyncio.run(orchestrator.scan_source_files(files))
+        assert [scan.file_path for scan in scans] == files
+        assert all(scan.error is None for scan in scans)
+
+    @pytest.mark.parametrize("scan_workers", [0, -2])
+    def test_scan_workers_below_one(self, tmp_path, scan_workers) -> None:
+        with pytest.raises(ValueError, match="must be at least 1"):
+            HybridVerificationOrchestrator(tmp_path, scan_workers=scan_workers)
+
+
+class TestScanWorkersOption:
+    def test_valid(self) -> None:
+        assert hybrid_verification.positive_int("4") == 4
+
+    @pytest.mark.parametrize("value", ["0", "-1", "many"])
+    def test_rejected(self, value, monkeypatch, capsys) -> None:
+        monkeypatch.setattr("sys.argv", ["hybrid-verification.py", "--scan-workers", value])
+        with pytest.raises(SystemExit) as exit_info:
+            asyncio.run(hybrid_verification.main())
+        assert exit_info.value.code == 2
+        assert "--scan-workers" in capsys.readouterr().err
+
+
+class TestScanSourceFile:
+    def test_hits_and_counts(self, files) -> None:
+        scan = scan_source_file(files[0], ScanRuleMatcher(SCAN_RULES))
+        assert scan.line_count == 4
+        assert [(rule.name, line) for rule, line in scan.hits] == [
+            ("sql-injection", 2),
+            ("hardcoded-secret", 3),
+        ]
+        assert scan.content_hash is None and scan.functions is None
+
+    def test_unreadable_file(self, tmp_path) -> None:
+        scan = scan_source_file(tmp_path / "missing.py", ScanRuleMatcher(SCAN_RULES))
+        assert scan.error and not scan.hits
@@ -0,0 +1,128 @@
+"""
+Unit tests for ScanRuleMatcher (compiled cheap-scan rules)
+
+Tests cover:
+- Parity with the per-line keyword loop run_cheap_scan used before the
+  rules were compiled, on hand-written and randomly generated sources
+- Case handling: ignore_case rules vs case-sensitive rules
+- Same-line conditions (requires) and one hit per rule and line
+- Line numbering with non-"\\n" line breaks and length-changing case maps
+"""
+
+import random
+
+import pytest
+
+from hybrid_verification import SCAN_RULES, ScanRuleMatcher
+
+AGENTS = ("best-practices-enforcer", "security-auditor", "code-reviewer")
+
+
+def legacy_scan(content: str, agent_name: str) -> list[tuple[int, str]]:
+    """The original per-line loop of run_cheap_scan, as (line, reason) pairs."""
+    hits = []
+    for i, line in enumerate(content.splitlines(), start=1):
+        if any(pattern in line.lower() for pattern in ["select", "insert", "update", "delete"]):
+            if 'f"' in line or "%" in line or ".format(" in line:
+                hits.append((i, "Potential SQL injection (dynamic query construction)"))
+        if any(keyword in line.lower() for keyword in ["password", "api_key", "secret", "token"]):
+            if "=" in line and '"' in line:
+                hits.append((i, "Potential hardcoded secret"))
+        if agent_name == "best-practices-enforcer":
+            if any(pattern in line for pattern in ["List[", "Dict[", "Optional[", "Union["]):
+                hits.append((i, "Legacy type hints (use list[...], X | None)"))
+        if "print(" in line and agent_name == "best-practices-enforcer":
+            hits.append((i, "print() instead of structlog"))
+    return hits
+
+
+def compiled_scan(
+    matcher: ScanRuleMatcher, content: str, agent_name: str
+) -> list[tuple[int, str]]:
+    hits = matcher.match(content)
+    return [(line, rule.reason) for rule, line in hits if rule.applies_to(agent_name)]
+
+
+@pytest.fixture(scope="module")
+def matcher() -> ScanRuleMatcher:
+    return ScanRuleMatcher(SCAN_RULES)
+
+
+SAMPLE_SOURCE = '''from typing import Dict, List, Optional
+
+API_KEY = "sk-live-123"
+password = get_password()
+
+
+def find(user_id: str) -> Optional[Dict[str, str]]:
+    query = f"SELECT * FROM users WHERE id = {user_id}"
+    print(query)
+    cursor.execute("UPDATE users SET name = '%s'" % name)
+    token_count = len(tokens)
+    return None
+'''
+
+# Fragments chosen to hit keyword overlaps, prefixes, case variants and
+# characters whose lower() changes length
+FRAGMENTS = [
+    "SELECT", "sElEcT", "upDATE", "insert", "token", "TOKEN", "Password", "api_KEY",
+    "secretoken", "tokenselect", "list[", "List[", "Dict[", "dICT[", "Optional[",
+    "Union[", "print(", "PRINT(", "=", '"', "%", 'f"', ".format(", " ", "x",
+    "\n", "\n", "\r\n", "\r", "\x0c", "\u2028", "\x85", "İ", "ß", "ǅ",
+]
+
+
+class TestLegacyParity:
+    @pytest.mark.parametrize("agent_name", AGENTS)
+    def test_sample_source(self, matcher: ScanRuleMatcher, agent_name: str) -> None:
+        assert compiled_scan(matcher, SAMPLE_SOURCE, agent_name) == legacy_scan(
+            SAMPLE_SOURCE, agent_name
+        )
+
+    def test_sample_source_hits(self, matcher: ScanRuleMatcher) -> None:
+        hits = compiled_scan(matcher, SAMPLE_SOURCE, "best-practices-enforcer")
+        assert [line for line, _ in hits] == [3, 7, 8, 9, 10]
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_random_sources(self, matcher: ScanRuleMatcher, seed: int) -> None:
+        rng = random.Random(seed)
+        for _ in range(1000):
+            content = "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 40)))
+            for agent_name in AGENTS:
+                assert compiled_scan(matcher, content, agent_name) == legacy_scan(
+                    content, agent_name
+                ), repr(content)
+
+
+class TestMatcher:
+    def test_ignore_case_rule(self, matcher: ScanRuleMatcher) -> None:
+        hits = matcher.match('x = "SeLeCt %s"')
+        assert [rule.name for rule, _ in hits] == ["sql-injection"]
+
+    def test_case_sensitive_rule(self, matcher: ScanRuleMatcher) -> None:
+        assert matcher.match("x: list[int]") == []
+        assert [rule.name for rule, _ in matcher.match("x: List[int]")] == ["legacy-type-hints"]
+
+    def test_requires_on_same_line(self, matcher: ScanRuleMatcher) -> None:
+        assert matcher.match('query = "SELECT 1"\nvalue = 5 % 2') == []
+
+    def test_one_hit_per_rule_and_line(self, matcher: ScanRuleMatcher) -> None:
+        hits = matcher.match('password = token = secret = "x"')
+        assert [(rule.name, line) for rule, line in hits] == [("hardcoded-secret", 1)]
+
+    def test_overlapping_keywords(self, matcher: ScanRuleMatcher) -> None:
+        # "token" inside "secretoken" and a keyword starting inside another
+        hits = matcher.match('secretoken = "deleteselect %s"')
+        assert [rule.name for rule, _ in hits] == ["sql-injection", "hardcoded-secret"]
+
+    def test_other_line_breaks(self, matcher: ScanRuleMatcher) -> None:
+        hits = matcher.match("a = 1\x0cprint(a)\u2028b = 2\rprint(b)")
+        assert [line for _, line in hits] == [2, 4]
+
+    def test_length_changing_lowercase(self, matcher: ScanRuleMatcher) -> None:
+        # "İ".lower() is two characters long, so offsets cannot use the lowered buffer
+        hits = matcher.match('İİ\nİ print(x)\nKEY = "İ" # TOKEN')
+        assert [(rule.name, line) for rule, line in hits] == [
+            ("print-call", 2),
+            ("hardcoded-secret", 3),
+        ]
@@ -0,0 +1,95 @@
+"""
+Unit tests for run_shared_scan (one cheap-scan pass for all agents)
+
+Tests cover:
+- Each agent's flags and cost match a scan run for that agent alone
+- Files are read once per shared scan, not once per agent
+- Agent-specific rules only reach their agents
+- Missing and unreadable files are skipped
+"""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from hybrid_verification import HybridVerificationOrchestrator
+
+AGENTS = [
+    "best-practices-enforcer",
+    "security-auditor",
+    "hallucination-detector",
+    "code-reviewer",
+    "test-generator",
+]
+
+SOURCES = {
+    "db.py": (
+        "from typing import List\n\n\n"
+        "def load(ids: List[int]):\n"
+        '    print("loading")\n'
+        '    return run(f"SELECT * FROM t WHERE id IN {ids}")\n'
+    ),
+    "settings.py": 'API_KEY = "sk-test"\nDEBUG = True\n',
+    "clean.py": "def add(a: int, b: int) -> int:\n    return a + b\n",
+}
+
+
+@pytest.fixture
+def orchestrator(tmp_path: Path) -> HybridVerificationOrchestrator:
+    return HybridVerificationOrchestrator(tmp_path, scan_workers=1)
+
+
+def flags(result) -> list[tuple]:
+    return [
+        (s.file_path.name, s.line_start, s.line_end, s.reason, s.severity, s.agent)
+        for s in result.flagged_sections
+    ]
+
+
+class TestSharedScan:
+    def test_matches_per_agent_scans(self, orchestrator, make_project) -> None:
+        pending = make_project(SOURCES)
+        shared = asyncio.run(orchestrator.run_shared_scan(AGENTS, pending))
+        for agent_name in AGENTS:
+            alone = asyncio.run(orchestrator.run_cheap_scan(agent_name, pending))
+            assert flags(shared[agent_name]) == flags(alone)
+            assert shared[agent_name].cost_estimate == pytest.approx(alone.cost_estimate)
+            assert shared[agent_name].model_used == alone.model_used
+
+    def test_files_scanned_once(self, orchestrator, make_project, monkeypatch) -> None:
+        pending = make_project(SOURCES)
+        calls = []
+        scan = orchestrator.scan_source_files
+
+        async def counting_scan(files, *args):
+            calls.append(list(files))
+            return await scan(files, *args)
+
+        monkeypatch.setattr(orchestrator, "scan_source_files", counting_scan)
+        asyncio.run(orchestrator.run_shared_scan(AGENTS, pending))
+        assert len(calls) == 1
+        assert sorted(path.name for path in calls[0]) == sorted(SOURCES)
+
+    def test_agent_specific_rules(self, orchestrator, make_project) -> None:
+        pending = make_project(SOURCES)
+        results = asyncio.run(orchestrator.run_shared_scan(AGENTS, pending))
+        enforcer, auditor = results["best-practices-enforcer"], results["security-auditor"]
+        enforcer_reasons = " ".join(s.reason for s in enforcer.flagged_sections)
+        auditor_reasons = " ".join(s.reason for s in auditor.flagged_sections)
+        assert "print()" in enforcer_reasons and "Legacy type hints" in enforcer_reasons
+        assert "print()" not in auditor_reasons and "Legacy type hints" not in auditor_reasons
+        assert "SQL injection" in auditor_reasons and "hardcoded secret" in auditor_reasons
+
+    def test_results_for_every_agent(self, orchestrator, make_project) -> None:
+        pending = make_project({"clean.py": SOURCES["clean.py"]})
+        results = asyncio.run(orchestrator.run_shared_scan(AGENTS, pending))
+        assert set(results) == set(AGENTS)
+        assert all(result.total_findings == 0 for result in results.values())
+
+    def test_missing_and_unreadable_files(self, orchestrator, make_project, tmp_path) -> None:
+        pending = make_project(SOURCES)
+        (tmp_path / "clean.py").unlink()
+        (tmp_path / "settings.py").write_bytes(b'API_KEY = "\xff\xfe"\n')
+        results = asyncio.run(orchestrator.run_shared_scan(["security-auditor"], pending))
+        assert {s.file_path.name for s in results["security-auditor"].flagged_sections} == {"db.py"}